@@ -1,5 +1,10 @@
 import streamlit as st
 import pandas as pd
+from analytics import Dataset, IvtSpikeDetector
+
+def detect_ivt_spikes(df):
+    """Days where a package's IVT exceeds its own mean + 2 std (per Advertiser/Channel/Package)."""
+    return IvtSpikeDetector().run(Dataset(df))
 
 def show_IVT():
     st.title("IVT Spike Detection App")
@@ -13,25 +18,9 @@ def show_IVT():
             else:
                 df = pd.read_excel(uploaded_file)
         
-        # Preprocess
-        df['Date'] = pd.to_datetime(df['Date'])
-        
-        # Group by Date, Advertiser, Channel, Package
-        grouped = df.groupby(['Date', 'Advertiser', 'Channel', 'Package'])['IVT (%)'].mean().reset_index()
-        
-        # Calculate baseline mean and std dev for each Advertiser+Channel+Package
-        baseline = grouped.groupby(['Advertiser', 'Channel', 'Package'])['IVT (%)'].agg(['mean', 'std']).reset_index()
-        baseline.rename(columns={'mean': 'baseline_mean', 'std': 'baseline_std'}, inplace=True)
-        
-        # Merge
-        merged = pd.merge(grouped, baseline, on=['Advertiser', 'Channel', 'Package'], how='left')
-        
-        # Spike condition
-        merged['Spike'] = merged['IVT (%)'] > (merged['baseline_mean'] + 2 * merged['baseline_std'])
-        
+        spikes = detect_ivt_spikes(df)
+
         # Show results
-        spikes = merged[merged['Spike']]
-        
         st.subheader("Detected IVT Spikes")
         st.dataframe(spikes)
         
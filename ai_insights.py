@@ -2,9 +2,21 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import datetime
+from analytics import InsightsEngine, RevenueDecomposition, TopBuyers
+from analytics.decomposition import FACTOR_LABELS, FACTORS
+from analytics.insights import REQUIRED_COLUMNS
+from data_store import ALL_ADVERTISERS, current_dataset, load_buyers
+from perf import stage
+from precompute import get_view
+from tables import direction, render_table, threshold_flag
 
 # --- HELPER FUNCTIONS ---
 
+@st.cache_resource(show_spinner=False, max_entries=8)
+def top_buyers(version, data_version, date, advertiser, _buyers, _engine):
+    # Top buyer per package on the movers' day, once per buyer-data / dataset version
+    return _engine.run(_buyers)
+
 def color_arrow(change):
     if change > 0:
         return '<span style="color:green;font-size:1.2em;">↑</span>'
@@ -12,60 +24,52 @@ def color_arrow(change):
         return '<span style="color:red;font-size:1.2em;">↓</span>'
     return ''
 
-def margin_icon(margin):
-    try:
-        margin_val = float(margin)
-        return "🟢" if margin_val >= 20 else "🟠"
-    except:
-        return ""
-
-def ivt_icon(ivt):
-    try:
-        ivt_val = float(ivt)
-        return "🟢" if ivt_val <= 10 else "🟠"
-    except:
-        return ""
+def join_names(names, bold=True):
+    names = [f"<b>{n}</b>" if bold else str(n) for n in names]
+    return names[0] if len(names) == 1 else ", ".join(names[:-1]) + " and " + names[-1]
 
-def buyer_demo_picker(idx):
-    buyers = ["LinkedIn", "DV360", "Amazon", "Criteo", "LinkedIn"]
-    return buyers[idx % len(buyers)]
+def driver_sentence(totals):
+    """Account-wide factor contributions, largest first (from DecompositionResult.totals())."""
+    parts = sorted(FACTORS, key=lambda f: -abs(totals[f"Δ {f}"]))
+    text = ", ".join(f"{FACTOR_LABELS[f]} {'+' if totals[f'Δ {f}'] >= 0 else '-'}${abs(totals[f'Δ {f}']):,.0f}" for f in parts)
+    return f" Across all packages, the change splits into {text}."
 
-def make_comment(row):
-    if row['% Change'] > 18:
-        return "Scaling fast"
-    if row['% Change'] > 10:
-        return "Looks solid"
-    if row['% Change'] > 3:
-        return "Recovering"
-    if row['% Change'] < -18:
-        return "Losing buyer interest"
-    if row['% Change'] < -10:
-        return "Needs attention"
-    if row['% Change'] < -3:
-        return "At risk"
-    return "Stable"
-
-def generate_summary(total_diff, pct_diff, top_gainer, top_loser, df_up, df_down):
+def generate_summary(total_diff, pct_diff, df_up, df_down, others=2, totals=None):
+    """Executive summary from the up/down mover records; safe for any number of movers."""
     trend = "up" if total_diff > 0 else "down"
     summary = (
         f"Yesterday, overall account revenue was <b>{trend} by {abs(pct_diff):.1f}%</b> "
-        f"({'+' if total_diff > 0 else '-'}${abs(total_diff):,.0f}), led mainly by "
-        f"<b>{top_gainer['Package']}</b> ({color_arrow(top_gainer['Δ'])} ${abs(top_gainer['Δ']):,.0f}), due to {top_gainer['Reason'].lower()}. "
+        f"({'+' if total_diff > 0 else '-'}${abs(total_diff):,.0f})"
     )
-    if len(df_up) > 1:
+    if df_up:
+        top_gainer = df_up[0]
         summary += (
-            f"Other strong risers included <b>{df_up[1]['Package']}</b> and <b>{df_up[2]['Package']}</b>, "
-            f"thanks to {df_up[1]['Reason'].lower()} and {df_up[2]['Reason'].lower()}."
+            f", led mainly by <b>{top_gainer['Package']}</b> ({color_arrow(top_gainer['Δ'])} ${abs(top_gainer['Δ']):,.0f}), "
+            f"due to {top_gainer['Reason']}. "
+        )
+    else:
+        summary += ". "
+    risers = df_up[1:1 + others]
+    if risers:
+        summary += (
+            f"Other strong risers included {join_names([r['Package'] for r in risers])}, "
+            f"thanks to {join_names([r['Reason'] for r in risers], bold=False)}."
+        )
+    if df_down:
+        top_loser = df_down[0]
+        summary += (
+            f" On the downside, <b>{top_loser['Package']}</b> had the largest drop "
+            f"({color_arrow(top_loser['Δ'])} -${abs(top_loser['Δ']):,.0f}), with {top_loser['Reason']}."
+        )
+    drops = df_down[1:1 + others]
+    if drops:
+        summary += f" Other key drops: {join_names([r['Package'] for r in drops])}."
+    if totals is not None:
+        summary += driver_sentence(totals)
+    else:
+        summary += (
+            " Most gains came from higher CPM or fill rates, while most losses were linked to margin, IVT, or buyer shifts."
         )
-    summary += (
-        f" On the downside, <b>{top_loser['Package']}</b> had the largest drop "
-        f"({color_arrow(top_loser['Δ'])} -${abs(top_loser['Δ']):,.0f}), with {top_loser['Reason'].lower()}."
-    )
-    if len(df_down) > 1:
-        summary += f" Other key drops: <b>{df_down[1]['Package']}</b> and <b>{df_down[2]['Package']}</b>."
-    summary += (
-        " Most gains came from higher CPM or fill rates, while most losses were linked to margin, IVT, or buyer shifts."
-    )
     return summary
 
 def ai_what_to_do(df_up, df_down):
@@ -81,8 +85,15 @@ def ai_what_to_do(df_up, df_down):
             )
     for row in df_up[:2]:
         if row['CPM'] > 0.4:
+            if row.get('Buyer'):
+                buyer = str(row['Buyer'])
+                # No share when the package had no revenue that day
+                if pd.notna(row.get('Buyer Share')):
+                    buyer += f" ({row['Buyer Share']:.0%} of its revenue)"
+            else:
+                buyer = "its top buyers"
             actions.append(
-                f"**Capitalize on CPM gains** for <b>{row['Package']}</b> by increasing supply to {row['Buyer']}."
+                f"**Capitalize on CPM gains** for <b>{row['Package']}</b> by increasing supply to {buyer}."
             )
     if len(df_down) > 0:
         actions.append(
@@ -101,103 +112,49 @@ def show_ai_insights():
 
     # --- NEW: Only use data from memory/session ---
     if "main_df" in st.session_state:
-        df = st.session_state["main_df"]
+        dataset = current_dataset()
+        df = dataset.df
     else:
         st.info("No data found. Please make sure the Excel file is loaded in the app.")
         return
 
-    required = {'Date', 'Package', 'Gross Revenue', 'eCPM', 'FillRate', 'Margin (%)', 'IVT (%)'}
-    if not required.issubset(df.columns):
+    if not REQUIRED_COLUMNS.issubset(df.columns):
         st.error("Excel must have columns: Date, Package, Gross Revenue, eCPM, FillRate, Margin (%), IVT (%)")
         return
 
-    df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values('Date')
-    dates = sorted(df['Date'].unique())
-    if len(dates) < 2:
+    with stage("movers view", len(df)):
+        result = get_view("ai_insights", dataset, InsightsEngine())
+    if result is None:
         st.warning("Need at least 2 days of data for AI insights.")
         return
+    buyers = load_buyers()
+    if buyers is not None:
+        # Same day and advertiser as the movers (buyer files without an Advertiser column
+        # are narrowed to the advertiser's packages)
+        advertiser = st.session_state.get("selected_advertiser", ALL_ADVERTISERS)
+        advertiser = None if advertiser == ALL_ADVERTISERS else advertiser
+        packages = frozenset(result.day_last["Package"].astype(str)) if advertiser else None
+        engine = TopBuyers(date=result.last_date, advertiser=advertiser, packages=packages)
+        with stage("buyer attribution", len(buyers)):
+            result = result.with_buyers(top_buyers(buyers.version, dataset.version, result.last_date, advertiser, buyers, engine))
+    # Reason = largest factor in an exact requests × fill × display × eCPM split of Δ revenue
+    with stage("drivers view", len(df)):
+        decomposition = get_view("ai_insights_drivers", dataset, RevenueDecomposition.default(dataset))
+    if decomposition is not None:
+        result = result.with_drivers(decomposition)
+    df_yest, df_before = result.day_last, result.day_prev
+    yesterday, day_before = result.last_date, result.prev_date
 
-    yesterday = dates[-1]
-    day_before = dates[-2]
-    df_yest = df[df['Date'] == yesterday].copy()
-    df_before = df[df['Date'] == day_before].copy()
-
-    # Aggregate revenue and metrics per package
-    rev_yest = df_yest.groupby('Package').agg({
-        'Gross Revenue': 'sum',
-        'eCPM': 'mean',
-        'FillRate': 'mean',
-        'Margin (%)': 'mean',
-        'IVT (%)': 'mean'
-    }).rename(columns={'Gross Revenue': 'Rev Yest', 'eCPM': 'CPM Yest', 'FillRate': 'Fill Yest',
-                       'Margin (%)': 'Margin Yest', 'IVT (%)': 'IVT Yest'})
-    rev_before = df_before.groupby('Package').agg({
-        'Gross Revenue': 'sum',
-        'eCPM': 'mean',
-        'FillRate': 'mean',
-        'Margin (%)': 'mean',
-        'IVT (%)': 'mean'
-    }).rename(columns={'Gross Revenue': 'Rev Before', 'eCPM': 'CPM Before', 'FillRate': 'Fill Before',
-                       'Margin (%)': 'Margin Before', 'IVT (%)': 'IVT Before'})
-    merged = rev_yest.join(rev_before, how='outer').fillna(0).reset_index()
-
-    # Calculate changes
-    merged['Δ'] = merged['Rev Yest'] - merged['Rev Before']
-    merged['% Change'] = np.where(merged['Rev Before'] > 0, (merged['Δ'] / merged['Rev Before']) * 100, 0)
-    merged['Dir'] = merged['Δ'].apply(lambda x: color_arrow(x))
-    merged['Buyer'] = [buyer_demo_picker(i) for i in range(len(merged))]
-    merged['Reason'] = ""
-    merged['Comment'] = ""
-    merged['CPM'] = merged['CPM Yest'].round(2)
-    merged['DSP Fill'] = (merged['Fill Yest'] * 100).round(1)
-    merged['Margin'] = merged['Margin Yest'].round(1)
-    merged['IVT'] = merged['IVT Yest'].round(1)
-
-    # Create reason & comment per row
-    for idx, row in merged.iterrows():
-        cpm_diff = row['CPM Yest'] - row['CPM Before']
-        fill_diff = row['Fill Yest'] - row['Fill Before']
-        ivt_diff = row['IVT Yest'] - row['IVT Before']
-        margin_diff = row['Margin Yest'] - row['Margin Before']
-        main_metric = None
-
-        if abs(cpm_diff) > 0.04:
-            if row['CPM Before'] != 0:
-                main_metric = f"CPM {'up' if cpm_diff > 0 else 'down'} {abs(cpm_diff)/row['CPM Before']*100:.0f}%"
-            else:
-                main_metric = f"CPM {'up' if cpm_diff > 0 else 'down'} (no previous value)"
-        elif abs(fill_diff) > 0.02:
-            if row['Fill Before'] != 0:
-                main_metric = f"Fill {'up' if fill_diff > 0 else 'down'} {abs(fill_diff)/row['Fill Before']*100:.1f}%"
-            else:
-                main_metric = f"Fill {'up' if fill_diff > 0 else 'down'} (no previous value)"
-        elif abs(ivt_diff) > 2:
-            if row['IVT Before'] != 0:
-                main_metric = f"IVT {'up' if ivt_diff > 0 else 'down'} {abs(ivt_diff)/row['IVT Before']*100:.1f}%"
-            else:
-                main_metric = f"IVT {'up' if ivt_diff > 0 else 'down'} (no previous value)"
-        elif abs(margin_diff) > 2:
-            if row['Margin Before'] != 0:
-                main_metric = f"Margin {'up' if margin_diff > 0 else 'down'} {abs(margin_diff)/row['Margin Before']*100:.1f}%"
-            else:
-                main_metric = f"Margin {'up' if margin_diff > 0 else 'down'} (no previous value)"
-        else:
-            main_metric = "Stable"
-
-        merged.at[idx, 'Reason'] = main_metric
-        merged.at[idx, 'Comment'] = make_comment(row)
-
-    # Get top 5 up/down
-    movers_up = merged.sort_values('Δ', ascending=False).head(5)
-    movers_down = merged.sort_values('Δ').head(5)
+    # Get top N up/down (top-K selection, no full sort)
+    top_n = st.number_input("Movers per direction", min_value=1, max_value=100, value=5)
+    movers_up = result.top_up(top_n)
+    movers_down = result.top_down(top_n)
     movers_all = pd.concat([movers_up, movers_down])
 
     # Compute totals for executive summary
-    total_rev_yest = df_yest['Gross Revenue'].sum()
-    total_rev_before = df_before['Gross Revenue'].sum()
-    total_diff = total_rev_yest - total_rev_before
-    pct_diff = (total_diff / total_rev_before * 100) if total_rev_before > 0 else 0
+    total_rev_yest = result.total_last
+    total_diff = result.total_diff
+    pct_diff = result.pct_diff
 
     # --- Add summary metric at a glance ---
     delta_color = "normal"
@@ -215,7 +172,11 @@ def show_ai_insights():
     )
 
     # Generate summary & actions
-    summary = generate_summary(total_diff, pct_diff, movers_up.iloc[0], movers_down.iloc[0], movers_up.to_dict('records'), movers_down.to_dict('records'))
+    with stage("summary text"):
+        summary = generate_summary(
+            total_diff, pct_diff, movers_up.to_dict('records'), movers_down.to_dict('records'),
+            totals=decomposition.totals() if decomposition is not None else None,
+        )
     st.markdown(f"<h5><b>Yesterday AI Revenue Overview — {yesterday.date()} vs {day_before.date()}</b></h5>", unsafe_allow_html=True)
     st.markdown(f"<div style='font-size:1.1em'>{summary}</div>", unsafe_allow_html=True)
     st.markdown("---")
@@ -227,19 +188,36 @@ def show_ai_insights():
     st.markdown("---")
 
     # Show movers table
-    table_display = movers_all[[
-        'Package', 'Dir', 'Reason', 'Comment', 'Rev Yest', '% Change', 'CPM', 'DSP Fill', 'Margin', 'IVT', 'Buyer'
-    ]].copy()
-    table_display['Rev Yest'] = table_display['Rev Yest'].apply(lambda x: f"${x:,.0f}")
-    table_display['% Change'] = table_display['% Change'].apply(lambda x: f"{x:+.0f}%")
-    table_display['Margin'] = table_display['Margin'].apply(lambda x: f"{x:.1f}% {margin_icon(x)}")
-    table_display['IVT'] = table_display['IVT'].apply(lambda x: f"{x:.1f}% {ivt_icon(x)}")
-    table_display['DSP Fill'] = table_display['DSP Fill'].apply(lambda x: f"{x:.1f}%")
+    with stage("format movers table", len(movers_all)):
+        table_display = movers_all[[c for c in [
+            'Package', 'Reason', 'Driver Share', 'Comment', 'Rev Yest', '% Change', 'CPM', 'DSP Fill', 'Margin', 'IVT', 'Buyer', 'Buyer Share'
+        ] if c in movers_all.columns]].copy()
+        table_display.insert(1, 'Dir', direction(movers_all['Δ']))
+        table_display.insert(table_display.columns.get_loc('Margin') + 1, 'Margin Flag', threshold_flag(table_display['Margin'], 20))
+        table_display.insert(table_display.columns.get_loc('IVT') + 1, 'IVT Flag', threshold_flag(table_display['IVT'], 10, good_above=False))
+
     st.markdown(f"#### Top Movers (Up/Down) — {yesterday.date()} vs {day_before.date()}")
-    st.write(
-        table_display.to_html(escape=False, index=False),
-        unsafe_allow_html=True
-    )
+    with stage("render table", len(table_display)):
+        render_table(
+            table_display,
+            {
+                'Dir': 'flag', 'Driver Share': 'share', 'Rev Yest': 'money', '% Change': 'signed_pct', 'CPM': 'float',
+                'DSP Fill': 'pct', 'Margin': 'pct', 'Margin Flag': 'flag', 'IVT': 'pct', 'IVT Flag': 'flag', 'Buyer Share': 'share',
+            },
+            labels={'Margin Flag': '', 'IVT Flag': ''},
+        )
+
+    if decomposition is not None:
+        with st.expander("🔎 Drill into a package's revenue drivers (by Channel × Ad format)"):
+            package = st.selectbox("Package", movers_all['Package'].drop_duplicates().tolist(), key="drivers_package")
+            with stage("driver drill-down"):
+                drill = decomposition.drill(package)
+            render_table(
+                drill.drop(columns=['Driver']),
+                {'Rev Before': 'money', 'Rev Yest': 'money', 'Δ': 'signed_money', 'Driver Share': 'share',
+                 **{f"Δ {f}": 'signed_money' for f in FACTORS}, 'Δ Other': 'signed_money'},
+                labels={f"Δ {f}": f"Δ {FACTOR_LABELS[f]}" for f in FACTORS},
+            )
     st.markdown("---")
 
     # AI Chatbot (optional, needs openai package and API key)
@@ -250,6 +228,7 @@ def show_ai_insights():
     if api_key and user_q and ask_button:
         import openai
         trending_pkgs = movers_up['Package'].tolist() + movers_down['Package'].tolist()
+        drivers = decomposition.context(trending_pkgs) if decomposition is not None else {}
         context_rows = []
         for pkg in trending_pkgs:
             last = df_yest[df_yest['Package'] == pkg]
@@ -273,6 +252,8 @@ Day Before Revenue: {int(prev_rev)}"""
                 row += f"\nYesterday CPM: {last_cpm:.3f}  Day Before CPM: {prev_cpm:.3f}"
             if last_fill is not None and prev_fill is not None:
                 row += f"\nYesterday Fill: {last_fill*100:.1f}%  Day Before Fill: {prev_fill*100:.1f}%"
+            if pkg in drivers:
+                row += f"\n{drivers[pkg]}"
             context_rows.append(row)
         data_context = "\n".join(context_rows)
         system_prompt = (
@@ -289,7 +270,7 @@ Day Before Revenue: {int(prev_rev)}"""
             f"QUESTION: {user_q}\n\n"
             "Give your answer in clear bullet points."
         )
-        with st.spinner("Thinking..."):
+        with st.spinner("Thinking..."), stage("llm call"):
             try:
                 client = openai.OpenAI(api_key=api_key)
                 response = client.chat.completions.create(
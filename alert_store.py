@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+# === Alert state and outbox (SQLite, WAL) ===
+# Watermarks and open streaks carry AlertEngine state between runs, so each run
+# only evaluates newly loaded days. Fired alerts go to an outbox keyed by
+# (rule, group, streak start): re-running the same days, or a streak that keeps
+# going, never queues the same alert twice. Consumers read `pending()` and call
+# `mark_delivered()` once they have sent them on.
+ALERTS_DB = "alerts.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    rule_id TEXT PRIMARY KEY,
+    day TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS streaks (
+    rule_id TEXT NOT NULL,
+    group_key TEXT NOT NULL,
+    streak INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (rule_id, group_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    rule_id TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    group_key TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    started TEXT NOT NULL,
+    fired_on TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    delivered_at REAL,
+    UNIQUE (rule_id, group_key, started)
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (delivered_at, id);
+"""
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class AlertStore:
+    def __init__(self, path=ALERTS_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def state(self):
+        """(watermarks {rule id: day}, open streaks frame) for AlertEngine.evaluate."""
+        with self.lock:
+            watermarks = dict(self.conn.execute("SELECT rule_id, day FROM watermarks").fetchall())
+            state = pd.read_sql_query("SELECT rule_id, group_key, streak, day FROM streaks", self.conn)
+        state = state.rename(columns={"rule_id": "Rule ID", "group_key": "Group", "streak": "Streak", "day": "Day"})
+        state["Day"] = pd.to_datetime(state["Day"])
+        return {rule_id: pd.Timestamp(day) for rule_id, day in watermarks.items()}, state
+
+    def evaluate(self, engine, dataset):
+        """Run `engine` on the days since the last run, save its state and queue new alerts.
+
+        Returns (AlertResult, number of alerts added to the outbox).
+        """
+        watermarks, state = self.state()
+        result = engine.evaluate(dataset, watermarks, state)
+        return result, self.save(result)
+
+    def save(self, result):
+        """Replace the evaluated rules' state and queue their alerts in one transaction."""
+        now = time.time()
+        rule_ids = [(rule_id,) for rule_id in result.watermarks]
+        marks = [(rule_id, _day(day)) for rule_id, day in result.watermarks.items()]
+        streaks = [
+            (rule_id, group, int(streak), _day(day))
+            for rule_id, group, streak, day in result.state[["Rule ID", "Group", "Streak", "Day"]].itertuples(index=False)
+        ]
+        alerts = [
+            (rule_id, rule, group, subject, _day(started), _day(fired_on), message, now)
+            for rule_id, rule, group, subject, started, fired_on, message in result.alerts[
+                ["Rule ID", "Rule", "Group", "Subject", "Started", "Fired On", "Message"]
+            ].itertuples(index=False)
+        ]
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany("DELETE FROM streaks WHERE rule_id = ?", rule_ids)
+                self.conn.executemany("INSERT INTO streaks VALUES (?, ?, ?, ?)", streaks)
+                self.conn.executemany("INSERT OR REPLACE INTO watermarks VALUES (?, ?)", marks)
+                before = self.conn.total_changes
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO outbox (rule_id, rule, group_key, subject, started, fired_on, message, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    alerts,
+                )
+                added = self.conn.total_changes - before
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return added
+
+    def pending(self, limit=1000):
+        """Undelivered alerts, oldest first."""
+        query = (
+            "SELECT id, rule, subject, started, fired_on, message, created_at FROM outbox"
+            " WHERE delivered_at IS NULL ORDER BY id LIMIT ?"
+        )
+        with self.lock:
+            df = pd.read_sql_query(query, self.conn, params=(limit,))
+        df["created_at"] = pd.to_datetime(df["created_at"], unit="s")
+        return df.rename(columns={
+            "id": "ID", "rule": "Rule", "subject": "Subject", "started": "Started",
+            "fired_on": "Fired On", "message": "Message", "created_at": "Queued At",
+        })
+
+    def mark_delivered(self, ids):
+        now = time.time()
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany("UPDATE outbox SET delivered_at = ? WHERE id = ?", [(now, int(i)) for i in ids])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.total_changes - before
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE delivered_at IS NULL").fetchone()[0]
@@ -0,0 +1,47 @@
+"""Headless analytics engines behind the Streamlit tabs.
+
+Engines are frozen dataclasses holding their parameters (so they can key
+caches); `engine.run(dataset)` returns a typed result holding numeric frames.
+Nothing in this package imports streamlit.
+"""
+from .alerts import AlertEngine, AlertResult, AlertRule, Condition, DEFAULT_RULES, load_rules, parse_rule
+from .buyers import BuyerResult, TopBuyers
+from .dataset import Dataset, data_version, prepare_df
+from .decomposition import DecompositionResult, RevenueDecomposition
+from .discrepancy import DiscrepancyAnalyzer, DiscrepancyResult
+from .floors import FloorResult, FloorSimulator
+from .funnel import FunnelResult, SupplyFunnel
+from .frozen import FrozenFrame, ReadOnlyFrameError, freeze
+from .forecast import ForecastResult, RevenueForecaster
+from .insights import InsightsEngine, MoversResult
+from .ivt import IvtRecommender, IvtResult, IvtSpikeDetector
+from .rollup import AdvertiserRollup, RollupResult, map_partitions
+from .rpm import RpmProfitability, RpmResult
+from .scoring import Rule, SCORE_RULES, ScoreResult, ScoringEngine, score_missing
+from .storage import ColdStore, TieredDataset
+from .sketches import DaySketch, RangeSketch, SketchBuilder, SketchIndex
+from .series import DailySeries, DailySeriesBuilder, lttb
+from .topk import top_and_bottom, top_k, top_k_index
+from .window import WindowComparison, WindowResult
+
+__all__ = [
+    "AlertEngine", "AlertResult", "AlertRule", "Condition", "DEFAULT_RULES", "load_rules", "parse_rule",
+    "BuyerResult", "TopBuyers",
+    "Dataset", "data_version", "prepare_df",
+    "DecompositionResult", "RevenueDecomposition",
+    "DiscrepancyAnalyzer", "DiscrepancyResult",
+    "FloorResult", "FloorSimulator",
+    "FrozenFrame", "ReadOnlyFrameError", "freeze",
+    "ForecastResult", "RevenueForecaster",
+    "FunnelResult", "SupplyFunnel",
+    "InsightsEngine", "MoversResult",
+    "IvtRecommender", "IvtResult", "IvtSpikeDetector",
+    "AdvertiserRollup", "RollupResult", "map_partitions",
+    "RpmProfitability", "RpmResult",
+    "Rule", "SCORE_RULES", "ScoreResult", "ScoringEngine", "score_missing",
+    "ColdStore", "TieredDataset",
+    "DaySketch", "RangeSketch", "SketchBuilder", "SketchIndex",
+    "DailySeries", "DailySeriesBuilder", "lttb",
+    "top_and_bottom", "top_k", "top_k_index",
+    "WindowComparison", "WindowResult",
+]
@@ -0,0 +1,270 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+from .rpm import RpmProfitability
+
+# === Rule-based alerts, evaluated incrementally ===
+# A rule is a conjunction of comparisons on daily per-group aggregates, held for
+# N consecutive days: "IVT (%) > 10 and Gross Revenue > 500 for 2 days by Package".
+# Rules that share group keys share one groups × days matrix per metric, and each
+# distinct comparison is computed once as a boolean array, so extra rules mostly
+# cost array ANDs. Open streaks are returned as state with a per-rule watermark
+# (last evaluated day): the next run only reads the days after it.
+
+SUM_METRICS = {
+    "Request NE", "Requests AE", "Gross Revenue", "Publisher Impressions", "Advertiser Impressions", "Revenue cost",
+}  # summed per day; every other metric is averaged
+OPERATORS = {">=": np.greater_equal, "<=": np.less_equal, "==": np.equal, "!=": np.not_equal, ">": np.greater, "<": np.less}
+DEFAULT_KEYS = ("Package",)
+STATE_COLUMNS = ["Rule ID", "Group", "Streak", "Day"]
+ALERT_COLUMNS = ["Rule ID", "Rule", "Group", "Subject", "Started", "Fired On", "Message"]
+GROUP_SEP = "\x1f"
+
+_CONDITION = re.compile(r"^(.+?)\s*(>=|<=|==|!=|>|<)\s*\$?\s*(-?[\d,]*\.?\d+)\s*%?$")
+_FOR = re.compile(r"\s+for\s+(\d+)\s+(?:consecutive\s+)?days?$", re.I)
+_BY = re.compile(r"\s+by\s+(.+)$", re.I)
+
+
+@dataclass(frozen=True)
+class Condition:
+    metric: str
+    op: str
+    value: float
+
+    def __str__(self):
+        return f"{self.metric} {self.op} {self.value:,.10g}"
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    name: str
+    conditions: tuple
+    days: int = 1  # consecutive days all conditions must hold
+    keys: tuple = DEFAULT_KEYS
+
+    @property
+    def rule_id(self):
+        """Hash of the definition (not the name): editing a rule restarts its streaks."""
+        return hashlib.sha1(self.expression.encode()).hexdigest()[:12]
+
+    @property
+    def expression(self):
+        text = " and ".join(map(str, self.conditions))
+        if self.days > 1:
+            text += f" for {self.days} days"
+        return f"{text} by {', '.join(self.keys)}"
+
+
+def parse_rule(text, name=None):
+    """Parse "[name:] IVT (%) > 10 and Gross Revenue > $500 for 2 days by Advertiser, Package".
+
+    "$", "%" and thousands separators in values are ignored; the group keys default to Package.
+    """
+    if name is None and ":" in text:
+        name, text = text.split(":", 1)
+    text = text.strip()
+    keys = DEFAULT_KEYS
+    match = _BY.search(text)
+    if match:
+        keys = tuple(key.strip() for key in match.group(1).split(","))
+        text = text[:match.start()]
+    days = 1
+    match = _FOR.search(text)
+    if match:
+        days = int(match.group(1))
+        text = text[:match.start()]
+    conditions = []
+    for part in re.split(r"\s+and\s+", text, flags=re.I):
+        match = _CONDITION.match(part.strip())
+        if not match:
+            raise ValueError(f"Cannot parse alert condition {part.strip()!r}")
+        metric, op, value = match.groups()
+        conditions.append(Condition(metric, op, float(value.replace(",", ""))))
+    if days < 1:
+        raise ValueError("An alert rule needs at least 1 day")
+    return AlertRule((name or text).strip(), tuple(conditions), days, keys)
+
+
+def load_rules(path):
+    """One rule per line (see parse_rule); blank lines and # comments are skipped."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return tuple(parse_rule(line) for line in lines if line and not line.startswith("#"))
+
+
+def resolve_metric(metric, columns):
+    """Column for `metric`: exact, case-insensitive, or with a " (%)" suffix ("IVT" -> "IVT (%)")."""
+    lookup = {col.lower(): col for col in columns}
+    for candidate in (metric, f"{metric} (%)"):
+        if candidate.lower() in lookup:
+            return lookup[candidate.lower()]
+    return None
+
+
+DEFAULT_RULES = (
+    parse_rule("High IVT on revenue: IVT (%) > 10 and Gross Revenue > 500 for 2 days"),
+    parse_rule("Low margin: Margin (%) < 20 and Gross Revenue > 100 for 3 days"),
+    parse_rule(
+        f"Losing RPM: RPM < {RpmProfitability.rpm_threshold} and Request NE >= {RpmProfitability.req_threshold}"
+    ),
+)
+
+
+def _daily_matrix(df, keys, metrics, first_day, n_days):
+    """Group labels plus metric -> (groups × days) array of daily aggregates (NaN = no rows)."""
+    codes = df.groupby(list(keys), observed=True, sort=False).ngroup().to_numpy()
+    day = (df["Date"].dt.normalize() - first_day).dt.days.to_numpy()
+    valid = codes >= 0
+    first_rows = np.unique(codes[valid], return_index=True)[1]
+    labels = df[list(keys)].to_numpy()[valid][first_rows]
+    flat = codes[valid].astype(np.int64) * n_days + day[valid]
+    size = len(first_rows) * n_days
+
+    values = {}
+    for metric in metrics:
+        col = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype=float)[valid]
+        has = ~np.isnan(col)
+        sums = np.bincount(flat[has], weights=col[has], minlength=size)
+        n = np.bincount(flat[has], minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            daily = np.where(n > 0, sums if metric in SUM_METRICS else sums / n, np.nan)
+        values[metric] = daily.reshape(len(first_rows), n_days)
+    return labels, values
+
+
+def _streaks(hit, carry):
+    """Run length of consecutive True days per row, continuing from `carry`."""
+    day = np.arange(hit.shape[1])
+    # Day of the latest miss (a carried streak of k is a miss k + 1 days before day 0)
+    last_miss = np.maximum.accumulate(np.where(hit, -1 - carry[:, None], day), axis=1)
+    return day - last_miss
+
+
+@dataclass
+class AlertResult:
+    """New alerts (one per streak reaching its rule's days) plus the state to carry into the next run."""
+    alerts: pd.DataFrame   # ALERT_COLUMNS
+    state: pd.DataFrame    # STATE_COLUMNS: open streaks of the evaluated rules at their watermark
+    watermarks: dict       # rule id -> last evaluated day, for the evaluated rules
+    skipped: dict = field(default_factory=dict)  # rule name -> reason it was not evaluated
+
+
+@dataclass(frozen=True)
+class AlertEngine:
+    rules: tuple = DEFAULT_RULES
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    @timed("alert rules")
+    def run(self, dataset):
+        """Alerts that hold on the latest days, with no carried state."""
+        return self.evaluate(dataset)
+
+    def _start(self, rule, watermarks, first, last):
+        # Rules seen before continue after their watermark; new rules only look back far
+        # enough to fire on what holds today, not to replay the whole history
+        if rule.rule_id in watermarks:
+            return pd.Timestamp(watermarks[rule.rule_id]) + pd.Timedelta(days=1)
+        return max(first, last - pd.Timedelta(days=rule.days - 1))
+
+    def evaluate(self, dataset, watermarks=None, state=None):
+        """Evaluate the days after each rule's watermark, continuing the streaks in `state`."""
+        watermarks = watermarks or {}
+        state = state if state is not None else pd.DataFrame(columns=STATE_COLUMNS)
+        first, last = dataset.date_span()
+        if pd.notna(last):
+            first, last = first.normalize(), last.normalize()
+        columns = dataset.df.columns
+        skipped = {}
+        pending = {}  # group keys -> [(rule, {metric: column}, start day)]
+        for rule in self.rules:
+            if pd.isna(last):
+                skipped[rule.name] = "no dated rows"
+                continue
+            missing = [k for k in rule.keys if k not in columns]
+            metrics = {c.metric: resolve_metric(c.metric, columns) for c in rule.conditions}
+            missing += [m for m, col in metrics.items() if col is None]
+            if missing:
+                skipped[rule.name] = f"missing {', '.join(missing)}"
+                continue
+            start = self._start(rule, watermarks, first, last)
+            if start <= last:
+                pending.setdefault(rule.keys, []).append((rule, metrics, start))
+
+        carried = state.groupby("Rule ID").indices if len(state) else {}
+        state_days = pd.to_datetime(state["Day"]).to_numpy()
+        state_streaks = state["Streak"].to_numpy(dtype=np.int32)
+        fired = {col: [] for col in ALERT_COLUMNS}
+        still_open = {col: [] for col in STATE_COLUMNS[:3]}
+        new_watermarks = {}
+        for keys, batch in pending.items():
+            window_start = min(start for _, _, start in batch)
+            n_days = (last - window_start).days + 1
+            needed = sorted({col for _, metrics, _ in batch for col in metrics.values()})
+            with stage("daily aggregates", len(dataset)):
+                df = dataset.frame(["Date", *keys, *needed], start=window_start)
+                labels, values = _daily_matrix(df, keys, needed, window_start, n_days)
+                groups = np.array([GROUP_SEP.join(map(str, row)) for row in labels], dtype=object)
+                subjects = np.array([" / ".join(map(str, row)) for row in labels], dtype=object)
+                state_rows = pd.Index(groups).get_indexer(state["Group"]) if len(state) else None
+            masks = {}  # (column, op, value) -> groups × days bool, shared across rules
+            with stage("evaluate rules", len(groups) * n_days * len(batch)):
+                for rule, metrics, start in batch:
+                    hit = np.ones((len(groups), n_days), dtype=bool)
+                    for cond in rule.conditions:
+                        key = (metrics[cond.metric], cond.op, cond.value)
+                        if key not in masks:
+                            with np.errstate(invalid="ignore"):
+                                masks[key] = OPERATORS[cond.op](values[key[0]], cond.value)
+                        hit &= masks[key]
+                    offset = (start - window_start).days
+                    carry = np.zeros(len(groups), dtype=np.int32)
+                    previous = carried.get(rule.rule_id)
+                    if previous is not None:
+                        # Only streaks open on the day before `start` continue
+                        previous = previous[state_days[previous] == np.datetime64(start - pd.Timedelta(days=1))]
+                        rows = state_rows[previous]
+                        carry[rows[rows >= 0]] = state_streaks[previous][rows >= 0]
+                    runs = _streaks(hit[:, offset:], carry)
+                    # A streak fires once, on the day it reaches `days`; carried streaks past it already fired
+                    rows, cols = np.nonzero(runs == rule.days)
+                    if len(rows):
+                        day_index = offset + cols
+                        fired_on = window_start + pd.to_timedelta(day_index, unit="D")
+                        fired["Rule ID"].append(np.full(len(rows), rule.rule_id, dtype=object))
+                        fired["Rule"].append(np.full(len(rows), rule.name, dtype=object))
+                        fired["Group"].append(groups[rows])
+                        fired["Subject"].append(subjects[rows])
+                        fired["Started"].append((fired_on - pd.Timedelta(days=rule.days - 1)).to_numpy())
+                        fired["Fired On"].append(fired_on.to_numpy())
+                        fired["Message"].append(_messages(rule, metrics, values, rows, day_index))
+                    open_rows = np.flatnonzero(runs[:, -1])
+                    still_open["Rule ID"].append(np.full(len(open_rows), rule.rule_id, dtype=object))
+                    still_open["Group"].append(groups[open_rows])
+                    still_open["Streak"].append(runs[open_rows, -1])
+                    new_watermarks[rule.rule_id] = last
+
+        alerts = pd.DataFrame({col: _concat(parts) for col, parts in fired.items()}, columns=ALERT_COLUMNS)
+        state = pd.DataFrame({col: _concat(parts) for col, parts in still_open.items()}, columns=STATE_COLUMNS)
+        state["Day"] = last
+        return AlertResult(alerts, state, new_watermarks, skipped)
+
+
+def _concat(parts):
+    return np.concatenate(parts) if parts else np.array([], dtype=object)
+
+
+def _messages(rule, metrics, values, rows, day_index):
+    """Values on the firing day per fired group, e.g. "IVT (%) 14.20, Gross Revenue 812.50 (2 days)"."""
+    names = list(dict.fromkeys(c.metric for c in rule.conditions))
+    columns = [values[metrics[name]][rows, day_index] for name in names]
+    suffix = f" ({rule.days} days)" if rule.days > 1 else ""
+    return np.array([
+        ", ".join(f"{name} {value:,.2f}" for name, value in zip(names, row)) + suffix
+        for row in zip(*columns)
+    ], dtype=object)
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+import pandas as pd
+from .profiling import stage, timed
+
+BUYER_COLUMNS = {'Package', 'Buyer', 'Gross Revenue'}
+
+
+@dataclass
+class BuyerResult:
+    """Top buyer per package: Package, Buyer, Buyer Revenue, Buyer Share (0-1), Buyers."""
+    table: pd.DataFrame
+
+    def attach(self, movers, package_col="Package"):
+        """Copy of `movers` with Buyer / Buyer Share filled from the attribution (None when unknown)."""
+        # Match on text: numeric app-store IDs load as ints from Excel but as strings from CSV
+        top = self.table.set_index(self.table['Package'].astype(str))
+        keys = movers[package_col].astype(str)
+        movers = movers.copy()
+        movers['Buyer'] = keys.map(top['Buyer']).astype(object)
+        movers['Buyer Share'] = keys.map(top['Buyer Share'])
+        movers['Buyer'] = movers['Buyer'].where(movers['Buyer'].notna(), None)
+        return movers
+
+
+@dataclass(frozen=True)
+class TopBuyers:
+    """Attribute each package to the buyer/DSP with the largest revenue share."""
+    days: int = None  # only the last N dates of the buyer data (None = all of it)
+    date: pd.Timestamp = None  # only this date (overrides `days`), e.g. the movers' comparison day
+    advertiser: str = None  # only this advertiser's rows, when the buyer data has an Advertiser column
+    packages: frozenset = None  # otherwise only these packages (as text), e.g. the advertiser's own
+    package_col: str = "Package"
+    buyer_col: str = "Buyer"
+    revenue_col: str = "Gross Revenue"
+    advertiser_col: str = "Advertiser"
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    @timed("top buyers")
+    def run(self, dataset):
+        df = dataset.df
+        if self.date is not None and 'Date' in df.columns:
+            df = df[pd.to_datetime(df['Date']).dt.normalize() == pd.Timestamp(self.date).normalize()]
+        elif self.days and 'Date' in df.columns:
+            dates = pd.to_datetime(df['Date'])
+            keep = sorted(dates.dropna().unique())[-self.days:]
+            df = df[dates.isin(keep)]
+        if self.advertiser is not None and self.advertiser_col in df.columns:
+            df = df[df[self.advertiser_col] == self.advertiser]
+        elif self.packages is not None:
+            df = df[df[self.package_col].astype(str).isin(self.packages)]
+
+        with stage("groupby package & buyer", len(df)):
+            by_buyer = df.groupby([self.package_col, self.buyer_col], observed=True)[self.revenue_col].sum()
+        by_buyer = by_buyer.rename('Buyer Revenue').reset_index()
+        package_total = by_buyer.groupby(self.package_col, observed=True)['Buyer Revenue'].transform('sum')
+        by_buyer['Buyer Share'] = by_buyer['Buyer Revenue'] / package_total.where(package_total > 0)
+        by_buyer['Buyers'] = by_buyer.groupby(self.package_col, observed=True)[self.buyer_col].transform('size')
+        top = (
+            by_buyer.sort_values([self.package_col, 'Buyer Revenue'], ascending=[True, False], kind="stable")
+            .drop_duplicates(self.package_col)
+            .rename(columns={self.package_col: 'Package', self.buyer_col: 'Buyer'})
+            .reset_index(drop=True)
+        )
+        return BuyerResult(top[['Package', 'Buyer', 'Buyer Revenue', 'Buyer Share', 'Buyers']])
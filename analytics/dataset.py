@@ -0,0 +1,124 @@
+import hashlib
+import threading
+from concurrent.futures import Future
+import pandas as pd
+from .frozen import freeze
+from .scoring import score_missing
+
+PARTITION_COLUMN = "Advertiser"
+
+
+def data_version(df):
+    """Short content hash of a dataframe, used to key every shared cache."""
+    hashed = pd.util.hash_pandas_object(df, index=True).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()[:12]
+
+
+def prepare_df(df):
+    # Convert Date once at load time so views never have to write it back
+    if "Date" in df.columns:
+        df = df.copy()
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    # Raw exports carry no Score / Status / Alert; derive them in the same pass
+    return score_missing(df)
+
+
+class Dataset:
+    """A loaded frame plus its data version. `df` is read-only (a FrozenFrame): it is shared.
+
+    Engines that need long history read through `frame()`, which a TieredDataset
+    also answers from the on-disk tier.
+    """
+
+    def __init__(self, df, version=None):
+        self.df = freeze(df)
+        self.version = version or data_version(df)
+        self._partitions = {}
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path):
+        if str(path).endswith(".csv"):
+            df = pd.read_csv(path)
+        elif str(path).endswith(".parquet"):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_excel(path)
+        return cls(prepare_df(df))
+
+    def partitions(self, column=PARTITION_COLUMN):
+        """{value: Dataset} for each value of `column`, built once (one stable sort, then slices).
+
+        Partition versions derive from this one ("<version>/<value>") instead of being re-hashed.
+        """
+        with self._lock:
+            if column not in self._partitions:
+                self._partitions[column] = self._split(column)
+            return self._partitions[column]
+
+    def derived(self, key, compute):
+        """`compute()` once per key for this dataset; concurrent callers wait for the first one."""
+        with self._lock:
+            future = self._derived.get(key)
+            owner = future is None
+            if owner:
+                future = self._derived[key] = Future()
+        if owner:
+            try:
+                future.set_result(compute())
+            except Exception as e:
+                with self._lock:
+                    del self._derived[key]  # failures are retried, not cached
+                future.set_exception(e)
+        return future.result()
+
+    def _split(self, column):
+        if column not in self.df.columns:
+            return {}
+        values = self.df[column]
+        if values.nunique(dropna=True) == 1 and values.notna().all():
+            # Single advertiser: the partition is the whole frame
+            value = values.iloc[0]
+            return {value: Dataset(self.df, f"{self.version}/{value}")}
+        ordered = self.df.iloc[values.argsort(kind="stable")]
+        sorted_values = ordered[column]
+        parts = {}
+        bounds = sorted_values.ne(sorted_values.shift()).to_numpy().nonzero()[0].tolist() + [len(ordered)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            value = sorted_values.iloc[start]
+            if pd.notna(value):
+                parts[value] = Dataset(ordered.iloc[start:end], f"{self.version}/{value}")
+        return parts
+
+    def frame(self, columns=None, start=None, end=None):
+        """Rows with Date in [start, end] (inclusive, None = open-ended), optionally only `columns`."""
+        df = self.df
+        if (start is not None or end is not None) and "Date" in df.columns:
+            dates = df["Date"]
+            mask = pd.Series(True, index=df.index)
+            if start is not None:
+                mask &= dates >= pd.Timestamp(start)
+            if end is not None:
+                mask &= dates <= pd.Timestamp(end)
+            df = df[mask]
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df
+
+    def date_span(self):
+        """(first, last) Date over all the data, or (NaT, NaT)."""
+        if "Date" not in self.df.columns:
+            return pd.NaT, pd.NaT
+        dates = pd.to_datetime(self.df["Date"])
+        return dates.min(), dates.max()
+
+    @property
+    def root_version(self):
+        return self.version.split("/")[0]
+
+    def __len__(self):
+        return len(self.df)
+
+    def __repr__(self):
+        return f"Dataset(rows={len(self.df)}, version={self.version!r})"
@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+from itertools import combinations
+from math import factorial
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+
+# === Revenue-change decomposition ===
+# Per cell, Gross Revenue = Requests × Fill × Display × eCPM / 1000, where the
+# rates are volume-weighted from the rows (so the product reproduces the cell's
+# revenue). Δ revenue between two dates is split into one additive contribution
+# per factor; contributions of cells sum to any coarser level (package, total).
+
+FACTORS = ["Requests", "Fill", "Display", "eCPM"]
+FACTOR_LABELS = {"Requests": "requests", "Fill": "fill rate", "Display": "display rate", "eCPM": "eCPM"}
+CONTRIBUTIONS = [f"Δ {f}" for f in FACTORS]
+REQUIRED_COLUMNS = {'Date', 'Package', 'Request NE', 'FillRate', 'Display Rate', 'Gross Revenue'}
+
+
+def _factor_frame(day, keys):
+    filled = day['Request NE'] * day['FillRate']
+    parts = pd.DataFrame({
+        'Requests': day['Request NE'],
+        'Filled': filled,
+        'Impressions': filled * day['Display Rate'],
+        'Revenue': day['Gross Revenue'],
+    })
+    sums = parts.groupby([day[k] for k in keys], observed=True, dropna=False).sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sums['Fill'] = np.where(sums['Requests'] > 0, sums['Filled'] / sums['Requests'], 0.0)
+        sums['Display'] = np.where(sums['Filled'] > 0, sums['Impressions'] / sums['Filled'], 0.0)
+        sums['eCPM'] = np.where(sums['Impressions'] > 0, sums['Revenue'] / sums['Impressions'] * 1000, 0.0)
+    return sums[['Revenue'] + FACTORS]
+
+
+def shapley_contributions(before, after):
+    """Exact Shapley split of Δ(prod of columns) for (n, k) factor arrays; rows sum to the product change."""
+    n, k = before.shape
+    out = np.zeros((n, k))
+    for j in range(k):
+        others = [i for i in range(k) if i != j]
+        for size in range(k):
+            weight = factorial(size) * factorial(k - size - 1) / factorial(k)
+            for subset in combinations(others, size):
+                # Marginal effect of moving factor j with the factors in `subset` already moved
+                base = np.prod([after[:, i] if i in subset else before[:, i] for i in others], axis=0)
+                out[:, j] += weight * base * (after[:, j] - before[:, j])
+    return out
+
+
+def lmdi_contributions(before, after):
+    """Log-mean Divisia split (LMDI-I); exact for strictly positive factors, NaN elsewhere."""
+    v0, v1 = before.prod(axis=1), after.prod(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.where(np.isclose(v0, v1), v0, (v1 - v0) / (np.log(v1) - np.log(v0)))
+        out = weight[:, None] * np.log(after / before)
+    valid = (before > 0).all(axis=1) & (after > 0).all(axis=1)
+    out[~valid] = np.nan
+    return out
+
+
+@dataclass
+class DecompositionResult:
+    """Factor contributions per (Package, Channel, Ad format) cell for the last date vs the one before."""
+    cells: pd.DataFrame
+    keys: tuple
+    last_date: pd.Timestamp
+    prev_date: pd.Timestamp
+
+    def by(self, levels=("Package",)):
+        """Contributions summed to `levels`, with the dominant Driver and a readable Reason."""
+        levels = [lvl for lvl in levels if lvl in self.cells.columns]
+        table = self.cells.groupby(levels, observed=True, dropna=False)[
+            ['Rev Before', 'Rev Yest', 'Δ'] + CONTRIBUTIONS + ['Δ Other']].sum().reset_index()
+        return _with_drivers(table)
+
+    def drill(self, package, levels=("Channel", "Ad format")):
+        """One package's change broken down by `levels`."""
+        cells = self.cells[self.cells['Package'].astype(str) == str(package)]
+        return DecompositionResult(cells, self.keys, self.last_date, self.prev_date).by(levels)
+
+    def totals(self):
+        """Account-wide contribution per factor (plus Other), summing every cell."""
+        return self.cells[CONTRIBUTIONS + ['Δ Other']].sum()
+
+    def context(self, packages):
+        """{package: one-line driver summary} for an LLM prompt."""
+        table = self.by()
+        table = table[table['Package'].astype(str).isin({str(p) for p in packages})]
+        lines = {}
+        for row in table.to_dict('records'):
+            parts = ", ".join(f"{FACTOR_LABELS[f]} {row[f'Δ {f}']:+,.0f}" for f in FACTORS)
+            lines[row['Package']] = f"Revenue change {row['Δ']:+,.0f} = {parts} (other {row['Δ Other']:+,.0f})"
+        return lines
+
+
+def _with_drivers(table):
+    contrib = table[CONTRIBUTIONS].to_numpy()
+    top = np.abs(contrib).argmax(axis=1) if len(table) else np.zeros(0, dtype=int)
+    driver = contrib[np.arange(len(table)), top]
+    gross = np.abs(contrib).sum(axis=1)
+    table['Driver'] = np.asarray(FACTORS)[top] if len(table) else []
+    # Share of the gross movement (offsetting factors included), so always within 0-1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['Driver Share'] = np.where(gross > 0, np.abs(driver) / gross, np.nan)
+    table['Reason'] = [
+        f"{FACTOR_LABELS[f]} {'up' if value > 0 else 'down'} ({'+' if value > 0 else '-'}${abs(value):,.0f})" if value else "Stable"
+        for f, value in zip(table['Driver'], driver)
+    ]
+    return table
+
+
+@dataclass(frozen=True)
+class RevenueDecomposition:
+    keys: tuple = ("Package", "Channel", "Ad format")
+    method: str = "shapley"  # or "lmdi" (falls back to Shapley for cells with a zero factor)
+
+    @classmethod
+    def default(cls, dataset):
+        return cls(keys=tuple(k for k in cls.keys if k in dataset.df.columns))
+
+    @timed("revenue decomposition")
+    def run(self, dataset):
+        """Return a DecompositionResult, or None with fewer than 2 dates or missing columns."""
+        df = dataset.df
+        if not REQUIRED_COLUMNS.issubset(df.columns):
+            return None
+        with stage("to_datetime", len(df)):
+            date_series = pd.to_datetime(df['Date'])
+            dates = sorted(date_series.dropna().unique())
+        if len(dates) < 2:
+            return None
+        last_date, prev_date = dates[-1], dates[-2]
+        keys = [k for k in self.keys if k in df.columns]
+
+        with stage("factor groupby", len(df)):
+            last = _factor_frame(df[date_series == last_date], keys)
+            prev = _factor_frame(df[date_series == prev_date], keys)
+            merged = prev.join(last, how='outer', lsuffix=' before', rsuffix=' yest').fillna(0.0)
+
+        before = merged[[f"{f} before" for f in FACTORS]].to_numpy(dtype=float)
+        after = merged[[f"{f} yest" for f in FACTORS]].to_numpy(dtype=float)
+        with stage("attribution", len(merged)):
+            contrib = shapley_contributions(before, after)
+            if self.method == "lmdi":
+                log_split = lmdi_contributions(before, after)
+                contrib = np.where(np.isnan(log_split), contrib, log_split)
+            # Cells that appear or disappear are pure volume: the whole change is "requests"
+            entry_exit = (before[:, 0] == 0) | (after[:, 0] == 0)
+            contrib[entry_exit] = 0.0
+            contrib[entry_exit, 0] = after[entry_exit].prod(axis=1) - before[entry_exit].prod(axis=1)
+
+        cells = merged.index.to_frame(index=False)
+        cells['Rev Before'] = merged['Revenue before'].to_numpy()
+        cells['Rev Yest'] = merged['Revenue yest'].to_numpy()
+        cells['Δ'] = cells['Rev Yest'] - cells['Rev Before']
+        cells[CONTRIBUTIONS] = contrib / 1000
+        # Whatever the factor identity does not reproduce (rows with revenue but no impressions)
+        cells['Δ Other'] = cells['Δ'] - cells[CONTRIBUTIONS].sum(axis=1)
+        return DecompositionResult(cells, tuple(keys), pd.Timestamp(last_date), pd.Timestamp(prev_date))
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+import pandas as pd
+from .profiling import stage, timed
+
+
+@dataclass
+class DiscrepancyResult:
+    """Rows with impression gap and margin, plus the negative-margin subset."""
+    table: pd.DataFrame
+    negative: pd.DataFrame
+
+    @property
+    def total_loss(self):
+        return self.negative["Gross Revenue"].sum() - self.negative["Revenue cost"].sum()
+
+    @property
+    def top_loss(self):
+        return self.negative.sort_values("Gross Revenue", ascending=False).head(1)
+
+
+@dataclass(frozen=True)
+class DiscrepancyAnalyzer:
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    @timed("margin leaks")
+    def run(self, dataset):
+        df = dataset.df
+        with stage("derive columns", len(df)):
+            table = df.assign(
+                **{
+                    "Impression Gap": df["Publisher Impressions"] - df["Advertiser Impressions"],
+                    "Margin": (df["Gross Revenue"] - df["Revenue cost"]) / df["Gross Revenue"],
+                }
+            )
+        return DiscrepancyResult(table, table[table["Margin"] < 0])
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+from .topk import top_k
+
+# === Bid-floor what-if model ===
+# Per (Package, Ad format), bids are modelled as log-logistic around the observed
+# AVG Bid Price; the shape comes from how much that average moves from row to row.
+# Auctions are second-price with `bidders` bidders and the floor as reserve, so a
+# floor F earns E[max(2nd bid, F); top bid >= F] and fills with P(top bid >= F).
+# Only ratios to the current floor are used, scaled onto each group's observed
+# revenue and fill. Every group × candidate floor is evaluated in one broadcast.
+
+FLOOR_COLUMNS = {'Package', 'Ad format', 'Request NE', 'FillRate', 'Gross Revenue', 'AVG Bid Price', 'AVG BidFloor'}
+MULTIPLIERS = tuple(np.round(2.0 ** (np.arange(-8, 25) / 4), 3))  # 0.25x .. 64x the current floor
+QUANTILES = 256
+
+
+@dataclass
+class FloorResult:
+    """Per-group current state plus revenue / fill ratios for every candidate floor multiplier."""
+    table: pd.DataFrame            # Package, Ad format, Requests, Revenue, Fill, Bid, Floor, Best Multiplier, ...
+    multipliers: np.ndarray        # (C,)
+    revenue_ratio: np.ndarray      # (groups, C), 1.0 at the current floor
+    fill_ratio: np.ndarray         # (groups, C)
+
+    def _column(self, multiplier):
+        return int(np.abs(self.multipliers - multiplier).argmin())
+
+    def at(self, multiplier):
+        """Projected revenue and fill for every group if all floors were scaled by `multiplier`."""
+        c = self._column(multiplier)
+        table = self.table[['Package', 'Ad format', 'Floor', 'Revenue', 'Fill']].copy()
+        table['New Floor'] = table['Floor'] * self.multipliers[c]
+        table['Projected Revenue'] = table['Revenue'] * self.revenue_ratio[:, c]
+        table['Projected Fill'] = table['Fill'] * self.fill_ratio[:, c]
+        table['Δ Revenue'] = table['Projected Revenue'] - table['Revenue']
+        return table
+
+    def curve(self, package, ad_format):
+        """Revenue and fill across the candidate floors for one group."""
+        match = (self.table['Package'].astype(str) == str(package)) & (self.table['Ad format'].astype(str) == str(ad_format))
+        i = int(np.flatnonzero(match.to_numpy())[0])
+        row = self.table.iloc[i]
+        return pd.DataFrame({
+            'Multiplier': self.multipliers,
+            'Floor': row['Floor'] * self.multipliers,
+            'Revenue': row['Revenue'] * self.revenue_ratio[i],
+            'Fill': row['Fill'] * self.fill_ratio[i],
+        })
+
+    def opportunities(self, n=50):
+        """Groups with the largest revenue uplift at their best floor."""
+        return top_k(self.table, 'Uplift', n, tiebreak='Package')
+
+
+@dataclass(frozen=True)
+class FloorSimulator:
+    days: int = 7                  # fit on the last N dates (None = all)
+    bidders: int = 3
+    default_shape: float = 3.0     # log-logistic shape when a group has too few rows to estimate it
+    min_shape: float = 1.5
+    max_shape: float = 8.0
+    multipliers: tuple = MULTIPLIERS
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    def _groups(self, df):
+        requests = df['Request NE'].astype(float)
+        parts = pd.DataFrame({
+            'Requests': requests,
+            'Revenue': df['Gross Revenue'],
+            'Filled': requests * df['FillRate'],
+            'Bid x Req': df['AVG Bid Price'] * requests,
+            'Floor x Req': df['AVG BidFloor'] * requests,
+            'Log Bid': np.log(df['AVG Bid Price'].where(df['AVG Bid Price'] > 0)),
+        })
+        grouped = parts.groupby([df['Package'], df['Ad format']], observed=True)
+        sums = grouped[['Requests', 'Revenue', 'Filled', 'Bid x Req', 'Floor x Req']].sum()
+        spread = grouped['Log Bid'].agg(['std', 'count'])
+        table = pd.DataFrame({
+            'Requests': sums['Requests'],
+            'Revenue': sums['Revenue'],
+            'Fill': sums['Filled'] / sums['Requests'],
+            'Bid': sums['Bid x Req'] / sums['Requests'],
+            'Floor': sums['Floor x Req'] / sums['Requests'],
+            'Log Bid Std': spread['std'].where(spread['count'] >= 3),
+        }).reset_index()
+        return table[(table['Requests'] > 0) & (table['Bid'] > 0)].reset_index(drop=True)
+
+    @timed("floor simulator")
+    def run(self, dataset):
+        """Return a FloorResult, or None when the floor/bid columns are missing or no group qualifies."""
+        df = dataset.df
+        if not FLOOR_COLUMNS.issubset(df.columns):
+            return None
+        if self.days and 'Date' in df.columns:
+            dates = pd.to_datetime(df['Date'])
+            keep = sorted(dates.dropna().unique())[-self.days:]
+            df = df[dates.isin(keep)]
+
+        with stage("groupby package & format", len(df)):
+            table = self._groups(df)
+        if table.empty:
+            return None
+
+        multipliers = np.asarray(self.multipliers, dtype=float)
+        n = self.bidders
+        with stage("floor grid", len(table) * len(multipliers)):
+            # Log-logistic: std(log X) = pi / (shape * sqrt(3)); scale chosen so the mean is the observed bid
+            shape = np.pi / (np.sqrt(3) * table['Log Bid Std'].to_numpy())
+            shape = np.clip(np.nan_to_num(shape, nan=self.default_shape, posinf=self.max_shape), self.min_shape, self.max_shape)
+            scale = table['Bid'].to_numpy() * np.sin(np.pi / shape) / (np.pi / shape)
+
+            # Second-highest bid's partial expectation via a quantile grid (u = bid CDF level)
+            u = (np.arange(QUANTILES) + 0.5) / QUANTILES
+            bids = scale[:, None] * (u / (1 - u))[None, :] ** (1 / shape[:, None])                  # (G, Q)
+            density = n * (n - 1) * u ** (n - 2) * (1 - u) / QUANTILES                               # (Q,)
+            tail = np.zeros((len(table), QUANTILES + 1))
+            tail[:, :-1] = np.cumsum((bids * density)[:, ::-1], axis=1)[:, ::-1]
+
+            floors = np.nan_to_num(table['Floor'].to_numpy())[:, None] * multipliers[None, :]      # (G, C)
+            ratio = (floors / scale[:, None]) ** shape[:, None]
+            cdf = ratio / (1 + ratio)
+            # Linear within a quantile cell, so the curve is smooth in the floor
+            position = np.clip(QUANTILES * cdf, 0, QUANTILES)
+            cell = np.minimum(position.astype(int), QUANTILES - 1)
+            lower = np.take_along_axis(tail, cell, axis=1)
+            upper = np.take_along_axis(tail, cell + 1, axis=1)
+            second_price = lower - (position - cell) * (lower - upper)
+            # Exactly one bid clears the floor: the winner pays the floor
+            floor_price = floors * n * (1 - cdf) * cdf ** (n - 1)
+            revenue = second_price + floor_price
+            fill = 1 - cdf ** n
+
+            current = int(np.abs(multipliers - 1).argmin())
+            with np.errstate(divide='ignore', invalid='ignore'):
+                revenue_ratio = np.nan_to_num(revenue / revenue[:, [current]], nan=1.0)
+                fill_ratio = np.nan_to_num(fill / fill[:, [current]], nan=1.0)
+
+        best = revenue_ratio.argmax(axis=1)
+        rows = np.arange(len(table))
+        table['Shape'] = shape
+        table['Best Multiplier'] = multipliers[best]
+        table['Best Floor'] = table['Floor'] * table['Best Multiplier']
+        table['Revenue at Best'] = table['Revenue'] * revenue_ratio[rows, best]
+        table['Fill at Best'] = table['Fill'] * fill_ratio[rows, best]
+        table['Uplift'] = table['Revenue at Best'] - table['Revenue']
+        return FloorResult(table.drop(columns=['Log Bid Std']), multipliers, revenue_ratio, fill_ratio)
@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+from .series import DailySeriesBuilder
+from .topk import top_k
+
+# === Per-package revenue forecasts ===
+# Additive Holt-Winters (level, trend, weekly season) run over a packages × days
+# matrix: the recursion steps through the days, every step updating all packages
+# at once. With fewer than two full seasons of history the season is dropped
+# (Holt / EWMA). Intervals come from each package's one-step-ahead errors.
+
+
+def smooth(y, alpha, beta, gamma, season, horizon):
+    """Fit exponential smoothing to every row of y (packages × days).
+
+    Returns (forecast (P, horizon), one-step residual RMSE (P,)). `season` = 0 disables seasonality.
+    """
+    n_rows, n_days = y.shape
+    if season:
+        first = y[:, :season]
+        level = first.mean(axis=1)
+        trend = (y[:, season:2 * season].mean(axis=1) - level) / season
+        seasonal = first - level[:, None]
+        start = season
+    else:
+        level = y[:, 0].copy()
+        trend = np.zeros(n_rows)
+        seasonal = np.zeros((n_rows, 1))
+        start = 1
+
+    sq_errors = np.zeros(n_rows)
+    for t in range(start, n_days):
+        s = t % season if season else 0
+        error = y[:, t] - (level + trend + seasonal[:, s])
+        sq_errors += error ** 2
+        new_level = alpha * (y[:, t] - seasonal[:, s]) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        if season:
+            seasonal[:, s] = gamma * (y[:, t] - new_level) + (1 - gamma) * seasonal[:, s]
+        level = new_level
+
+    steps = np.arange(1, horizon + 1)
+    season_idx = (n_days + steps - 1) % season if season else np.zeros(horizon, dtype=int)
+    forecast = level[:, None] + trend[:, None] * steps[None, :] + seasonal[:, season_idx]
+    rmse = np.sqrt(sq_errors / max(n_days - start, 1))
+    return forecast, rmse
+
+
+@dataclass
+class ForecastResult:
+    """History, next-`horizon`-day forecasts with intervals, and a last-day backtest per package."""
+    packages: np.ndarray
+    dates: pd.DatetimeIndex
+    future_dates: pd.DatetimeIndex
+    history: np.ndarray   # (P, T) daily revenue
+    forecast: np.ndarray  # (P, H)
+    lower: np.ndarray
+    upper: np.ndarray
+    table: pd.DataFrame   # Package, Actual, Expected, Lower, Shortfall, Below Forecast, Next 7d
+    model: str
+
+    def __post_init__(self):
+        self.row = {package: i for i, package in enumerate(self.packages)}
+
+    def frame(self, package):
+        """Forecast, Lower, Upper for one package, indexed by future date."""
+        i = self.row[package]
+        return pd.DataFrame(
+            {'Forecast': self.forecast[i], 'Lower': self.lower[i], 'Upper': self.upper[i]},
+            index=self.future_dates,
+        )
+
+    def below(self, n=50):
+        """Packages whose last day came in under the backtest's lower bound, largest shortfall first."""
+        return top_k(self.table[self.table['Below Forecast']], 'Shortfall', n, tiebreak='Package')
+
+
+@dataclass(frozen=True)
+class RevenueForecaster:
+    horizon: int = 7
+    season: int = 7
+    alpha: float = 0.4
+    beta: float = 0.05
+    gamma: float = 0.3
+    z: float = 1.64      # ~90% interval
+    min_revenue: float = 1.0  # ignore packages earning less per day on average
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    def _fit(self, y, horizon):
+        season = self.season if y.shape[1] >= 2 * self.season else 0
+        forecast, rmse = smooth(y, self.alpha, self.beta, self.gamma, season, horizon)
+        # Forecast error grows with the horizon as level errors accumulate
+        spread = self.z * rmse[:, None] * np.sqrt(1 + np.arange(horizon) * self.alpha ** 2)[None, :]
+        forecast = np.clip(forecast, 0, None)
+        return forecast, np.clip(forecast - spread, 0, None), forecast + spread, season
+
+    @timed("revenue forecast")
+    def run(self, dataset):
+        """Return a ForecastResult, or None with fewer than 3 days of revenue."""
+        if not {'Date', 'Package', 'Gross Revenue'}.issubset(dataset.df.columns):
+            return None
+        # Same builder (and so the same cached series) as the trends view
+        series = DailySeriesBuilder.default(dataset).run(dataset)
+        y = np.nan_to_num(series.values['Gross Revenue'].astype(float))
+        if y.shape[1] < 3:
+            return None
+        keep = y.mean(axis=1) >= self.min_revenue
+        y, packages = y[keep], series.packages[keep]
+
+        with stage("fit & forecast", y.size):
+            forecast, lower, upper, season = self._fit(y, self.horizon)
+        with stage("backtest last day", y.size):
+            expected, expected_low, _, _ = self._fit(y[:, :-1], 1)
+
+        table = pd.DataFrame({
+            'Package': packages,
+            'Actual': y[:, -1],
+            'Expected': expected[:, 0],
+            'Lower': expected_low[:, 0],
+        })
+        table['Shortfall'] = table['Expected'] - table['Actual']
+        table['Below Forecast'] = table['Actual'] < table['Lower']
+        table[f'Next {self.horizon}d'] = forecast.sum(axis=1)
+        future = pd.date_range(series.dates[-1] + pd.Timedelta(days=1), periods=self.horizon, freq="D")
+        model = "Holt-Winters (weekly)" if season else "Holt (no season, < 2 weeks of history)"
+        return ForecastResult(packages, series.dates, future, y, forecast, lower, upper, table, model)
@@ -0,0 +1,97 @@
+import pandas as pd
+
+# === Read-only shared frames ===
+# Dataset.df is shared by every session and background worker. FrozenFrame rejects
+# the writes that would change it for everyone (column assignment, loc/iloc
+# setitem, inplace=True methods, renaming the axes). Anything derived from it
+# (filters, selections, copy(), assign()) is an ordinary DataFrame, and pandas'
+# copy-on-write keeps those copies cheap until they are written to.
+
+READ_ONLY_HINT = (
+    "shared dataset frames are read-only; derive a new frame instead "
+    "(df.assign(...), df.copy(), or a filtered selection)"
+)
+
+
+class ReadOnlyFrameError(TypeError):
+    pass
+
+
+class _ReadOnlyIndexer:
+    """Wraps .loc / .iloc / .at / .iat: reads pass through, item assignment raises."""
+
+    def __init__(self, indexer, name):
+        self._indexer = indexer
+        self._name = name
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        raise ReadOnlyFrameError(f"df.{self._name}[...] = ...: {READ_ONLY_HINT}")
+
+    def __call__(self, *args, **kwargs):
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs), self._name)
+
+    def __getattr__(self, name):
+        if name.startswith("_setitem"):
+            raise ReadOnlyFrameError(f"df.{self._name} assignment: {READ_ONLY_HINT}")
+        return getattr(self._indexer, name)
+
+
+class FrozenFrame(pd.DataFrame):
+    """A DataFrame whose in-place mutators raise ReadOnlyFrameError; derived frames are plain."""
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def _reject(self, what):
+        raise ReadOnlyFrameError(f"{what}: {READ_ONLY_HINT}")
+
+    def __setitem__(self, key, value):
+        self._reject(f"df[{key!r}] = ...")
+
+    def __delitem__(self, key):
+        self._reject(f"del df[{key!r}]")
+
+    def __setattr__(self, name, value):
+        if name in ("index", "columns") or (not name.startswith("_") and name in self.columns):
+            self._reject(f"df.{name} = ...")
+        super().__setattr__(name, value)
+
+    def insert(self, loc, column, value, allow_duplicates=False):
+        self._reject(f"df.insert({column!r}, ...)")
+
+    def isetitem(self, loc, value):
+        self._reject("df.isetitem(...)")
+
+    def update(self, other, *args, **kwargs):
+        self._reject("df.update(...)")
+
+    def _update_inplace(self, result, verify_is_copy=True):
+        # Every inplace=True method (fillna, drop, rename, sort_values, ...) and += land here
+        self._reject("inplace=True")
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc, "loc")
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc, "iloc")
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at, "at")
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat, "iat")
+
+
+def freeze(df):
+    """Read-only view of `df` (no data is copied)."""
+    if isinstance(df, FrozenFrame):
+        return df
+    return FrozenFrame(df)
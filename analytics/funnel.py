@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+from .topk import top_k
+
+# === Supply funnel ===
+# Request NE → Requests AE (fill) → Advertiser Impressions, i.e. Requests AE ×
+# Display Rate (display) → Publisher Impressions (discrepancy); Publisher
+# Impressions / Request NE is the Survival rate. Each stage is compared with the catalogue-wide conversion: a
+# group's loss at a stage is the shortfall against that benchmark, carried to
+# publisher impressions at catalogue rates, so stages are comparable and the
+# largest one is where the group leaks the most.
+
+STAGES = ["Request NE", "Requests AE", "Advertiser Impressions", "Publisher Impressions"]
+LOSSES = ["Fill", "Display", "Discrepancy"]  # between consecutive stages
+NO_LEAK = "None"
+FUNNEL_COLUMNS = set(STAGES)
+
+
+@dataclass
+class FunnelResult:
+    """Per-group stage counts, conversions, impression losses and the stage that leaks the most."""
+    table: pd.DataFrame
+    keys: tuple
+    benchmark: np.ndarray  # catalogue conversion per loss stage
+
+    def summary(self):
+        """Account-wide funnel: one row per stage with its count and conversion from the stage before."""
+        counts = self.table[STAGES].sum()
+        return pd.DataFrame({
+            'Stage': STAGES,
+            'Count': counts.to_numpy(),
+            'Conversion': [np.nan] + list(self.benchmark),
+        })
+
+    def by_leak_stage(self):
+        """How many groups leak most at each stage, and the impressions lost there."""
+        return (
+            self.table.groupby('Leak Stage', observed=False)
+            .agg(Groups=('Leak Stage', 'size'), **{'Impressions Lost': ('Leak Impressions', 'sum')})
+            .reindex(LOSSES + [NO_LEAK], fill_value=0)
+            .reset_index()
+        )
+
+    def worst(self, n=50, leak_stage=None):
+        table = self.table if leak_stage is None else self.table[self.table['Leak Stage'] == leak_stage]
+        return top_k(table, 'Leak Impressions', n)
+
+
+@dataclass(frozen=True)
+class SupplyFunnel:
+    keys: tuple = ("Product", "Package", "Campaign ID")
+
+    @classmethod
+    def default(cls, dataset):
+        return cls(keys=tuple(k for k in cls.keys if k in dataset.df.columns))
+
+    @timed("supply funnel")
+    def run(self, dataset):
+        """Return a FunnelResult, or None when the funnel columns are missing."""
+        df = dataset.df
+        keys = [k for k in self.keys if k in df.columns]
+        if not keys or not FUNNEL_COLUMNS.issubset(df.columns):
+            return None
+
+        with stage("groupby stages", len(df)):
+            table = df[STAGES].groupby([df[k] for k in keys], observed=True).sum().reset_index()
+
+        with stage("conversions & losses", len(table)):
+            counts = table[STAGES].to_numpy(dtype=float)
+            before, after = counts[:, :-1], counts[:, 1:]
+            totals = counts.sum(axis=0)
+            benchmark = np.divide(totals[1:], totals[:-1], out=np.zeros(len(LOSSES)), where=totals[:-1] > 0)
+            # Impressions one unit entering stage k+1 yields at catalogue rates
+            downstream = np.append(np.cumprod(benchmark[::-1])[::-1][1:], 1.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                conversion = np.where(before > 0, after / before, np.nan)
+                survival = np.where(counts[:, 0] > 0, counts[:, -1] / counts[:, 0], np.nan)
+            lost = (benchmark * before - after) * downstream
+            leak = lost.argmax(axis=1)
+            rows = np.arange(len(table))
+            worst = lost[rows, leak]
+
+            for i, name in enumerate(LOSSES):
+                table[f'{name} Conversion'] = conversion[:, i]
+                table[f'{name} Loss'] = lost[:, i]
+            table['Survival'] = survival
+            codes = np.where(worst > 0, leak, len(LOSSES))
+            table['Leak Stage'] = pd.Categorical.from_codes(codes, LOSSES + [NO_LEAK])
+            table['Leak Impressions'] = np.clip(worst, 0, None)
+        return FunnelResult(table, tuple(keys), benchmark)
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+from .topk import top_k
+
+METRICS = {
+    'Gross Revenue': 'sum',
+    'eCPM': 'mean',
+    'FillRate': 'mean',
+    'Margin (%)': 'mean',
+    'IVT (%)': 'mean'
+}
+REQUIRED_COLUMNS = {'Date', 'Package', 'Gross Revenue', 'eCPM', 'FillRate', 'Margin (%)', 'IVT (%)'}
+
+
+def make_comment(pct_change):
+    if pct_change > 18:
+        return "Scaling fast"
+    if pct_change > 10:
+        return "Looks solid"
+    if pct_change > 3:
+        return "Recovering"
+    if pct_change < -18:
+        return "Losing buyer interest"
+    if pct_change < -10:
+        return "Needs attention"
+    if pct_change < -3:
+        return "At risk"
+    return "Stable"
+
+
+def main_reason(row):
+    """First metric whose day-over-day move crosses its threshold: CPM, fill, IVT, then margin."""
+    for label, yest, before, threshold, fmt in [
+        ("CPM", 'CPM Yest', 'CPM Before', 0.04, ".0f"),
+        ("Fill", 'Fill Yest', 'Fill Before', 0.02, ".1f"),
+        ("IVT", 'IVT Yest', 'IVT Before', 2, ".1f"),
+        ("Margin", 'Margin Yest', 'Margin Before', 2, ".1f"),
+    ]:
+        diff = row[yest] - row[before]
+        if abs(diff) > threshold:
+            direction = 'up' if diff > 0 else 'down'
+            if row[before] != 0:
+                return f"{label} {direction} {abs(diff)/row[before]*100:{fmt}}%"
+            return f"{label} {direction} (no previous value)"
+    return "Stable"
+
+
+@dataclass
+class MoversResult:
+    """Per-package metrics for the last date vs the date before it."""
+    movers: pd.DataFrame
+    day_last: pd.DataFrame
+    day_prev: pd.DataFrame
+    last_date: pd.Timestamp
+    prev_date: pd.Timestamp
+
+    @property
+    def total_last(self):
+        return self.day_last['Gross Revenue'].sum()
+
+    @property
+    def total_prev(self):
+        return self.day_prev['Gross Revenue'].sum()
+
+    @property
+    def total_diff(self):
+        return self.total_last - self.total_prev
+
+    @property
+    def pct_diff(self):
+        return (self.total_diff / self.total_prev * 100) if self.total_prev > 0 else 0
+
+    def with_buyers(self, buyers):
+        """Copy of this result with Buyer / Buyer Share taken from a BuyerResult."""
+        return MoversResult(buyers.attach(self.movers, self.movers.columns[0]), self.day_last, self.day_prev,
+                            self.last_date, self.prev_date)
+
+    def with_drivers(self, decomposition):
+        """Copy of this result whose Reason comes from a DecompositionResult (largest contributing factor)."""
+        package_col = self.movers.columns[0]
+        drivers = decomposition.by((package_col,))
+        drivers = drivers.set_index(drivers[package_col].astype(str))
+        keys = self.movers[package_col].astype(str)
+        movers = self.movers.copy()
+        movers['Driver'] = keys.map(drivers['Driver'])
+        movers['Driver Share'] = keys.map(drivers['Driver Share'])
+        movers['Reason'] = keys.map(drivers['Reason']).fillna(movers['Reason'])
+        return MoversResult(movers, self.day_last, self.day_prev, self.last_date, self.prev_date)
+
+    def top_up(self, n=5):
+        return top_k(self.movers, 'Δ', n, largest=True, tiebreak=self.movers.columns[0])
+
+    def top_down(self, n=5):
+        return top_k(self.movers, 'Δ', n, largest=False, tiebreak=self.movers.columns[0])
+
+
+@dataclass(frozen=True)
+class InsightsEngine:
+    package_col: str = "Package"
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    @timed("insights movers")
+    def run(self, dataset):
+        """Return a MoversResult, or None when there are fewer than 2 dates."""
+        df = dataset.df
+        with stage("to_datetime", len(df)):
+            date_series = pd.to_datetime(df['Date'])
+            dates = sorted(date_series.unique())
+        if len(dates) < 2:
+            return None
+
+        last_date, prev_date = dates[-1], dates[-2]
+        day_last = df[date_series == last_date]
+        day_prev = df[date_series == prev_date]
+
+        with stage("groupby packages", len(day_last) + len(day_prev)):
+            rev_yest = day_last.groupby(self.package_col).agg(METRICS).rename(columns={
+                'Gross Revenue': 'Rev Yest', 'eCPM': 'CPM Yest', 'FillRate': 'Fill Yest',
+                'Margin (%)': 'Margin Yest', 'IVT (%)': 'IVT Yest'})
+            rev_before = day_prev.groupby(self.package_col).agg(METRICS).rename(columns={
+                'Gross Revenue': 'Rev Before', 'eCPM': 'CPM Before', 'FillRate': 'Fill Before',
+                'Margin (%)': 'Margin Before', 'IVT (%)': 'IVT Before'})
+            merged = rev_yest.join(rev_before, how='outer').fillna(0).reset_index()
+
+        # Calculate changes
+        merged['Δ'] = merged['Rev Yest'] - merged['Rev Before']
+        merged['% Change'] = np.where(merged['Rev Before'] > 0, (merged['Δ'] / merged['Rev Before']) * 100, 0)
+        merged['Buyer'] = None  # filled by TopBuyers when buyer data is available
+        merged['Buyer Share'] = np.nan
+        merged['CPM'] = merged['CPM Yest'].round(2)
+        merged['DSP Fill'] = (merged['Fill Yest'] * 100).round(1)
+        merged['Margin'] = merged['Margin Yest'].round(1)
+        merged['IVT'] = merged['IVT Yest'].round(1)
+
+        with stage("reason & comment", len(merged)):
+            merged['Reason'] = [main_reason(row) for _, row in merged.iterrows()]
+            merged['Comment'] = merged['% Change'].map(make_comment)
+
+        return MoversResult(merged, day_last, day_prev, last_date, prev_date)
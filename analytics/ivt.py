@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+
+GROUP_COLS_POSSIBLE = ("Product", "Package", "Campaign ID", "Campaign", "Ad Group", "Site")
+BLOCK_RECOMMENDATION = "🚩 Block product at campaign level"
+NO_ACTION = "No action"
+
+
+def guess_column(df, options, default=None):
+    """Find a column in df that matches any of the substrings in options."""
+    for option in options:
+        for col in df.columns:
+            if option.lower() in col.lower():
+                return col
+    return default
+
+
+def ivt_candidates(df):
+    return [col for col in df.columns if "ivt" in col.lower() or "invalid" in col.lower()]
+
+
+@dataclass
+class IvtResult:
+    """Requests, revenue and Avg/Max IVT per group over a date range (all numeric)."""
+    table: pd.DataFrame
+    start_date: pd.Timestamp
+    end_date: pd.Timestamp
+    request_col: str
+    revenue_col: str
+
+    def recommendations(self, threshold):
+        """Copy of `table` with a Recommendation column for groups whose Max IVT >= threshold."""
+        table = self.table.copy()
+        table["Recommendation"] = np.where(table["Max IVT"] >= threshold, BLOCK_RECOMMENDATION, NO_ACTION)
+        return table
+
+
+@dataclass(frozen=True)
+class IvtRecommender:
+    date_col: str
+    request_col: str
+    revenue_col: str
+    ivt_col: str
+    group_cols: tuple = GROUP_COLS_POSSIBLE
+    days: int = 3
+
+    @classmethod
+    def default(cls, dataset, days=3):
+        """Guess the columns from the data, as the IVT tab does before the user adjusts them."""
+        df = dataset.df
+        candidates = ivt_candidates(df)
+        return cls(
+            date_col=guess_column(df, ["date"], df.columns[0]),
+            request_col=guess_column(df, ["request", "impression", "req"], df.columns[0]),
+            revenue_col=guess_column(df, ["gross revenue", "revenue", "amount", "total"], df.columns[0]),
+            ivt_col=candidates[0] if candidates else df.columns[0],
+            group_cols=tuple(col for col in GROUP_COLS_POSSIBLE if col in df.columns),
+            days=days,
+        )
+
+    @timed("ivt aggregate")
+    def run(self, dataset):
+        """Return an IvtResult, or None when the date range holds no rows."""
+        if self.date_col == "Date":
+            # Long ranges reach past the in-memory days into the cold tier
+            columns = list(dict.fromkeys([self.date_col, self.request_col, self.revenue_col, self.ivt_col, *self.group_cols]))
+            _, end_date = dataset.date_span()
+            if pd.isna(end_date):
+                return None
+            start_date = end_date - pd.Timedelta(days=self.days - 1)
+            with stage("date range read"):
+                filtered_df = dataset.frame(columns, start_date, end_date)
+        else:
+            df = dataset.df
+            with stage("to_datetime & date filter", len(df)):
+                dates = pd.to_datetime(df[self.date_col], errors="coerce")
+                end_date = dates.max()
+                start_date = end_date - pd.Timedelta(days=self.days - 1)
+                filtered_df = df[(dates >= start_date) & (dates <= end_date)]
+        if filtered_df.empty:
+            return None
+
+        group_cols = [col for col in self.group_cols if col in filtered_df.columns]
+        with stage("groupby", len(filtered_df)):
+            grouped = filtered_df.groupby(group_cols, dropna=False, observed=True)
+            table = pd.concat({
+                self.request_col: grouped[self.request_col].sum(),
+                self.revenue_col: grouped[self.revenue_col].sum(),
+                "Avg IVT": grouped[self.ivt_col].mean(),
+                "Max IVT": grouped[self.ivt_col].max(),
+            }, axis=1).reset_index()
+        table[self.revenue_col] = pd.to_numeric(table[self.revenue_col], errors="coerce").fillna(0)
+        table[self.request_col] = pd.to_numeric(table[self.request_col], errors="coerce").fillna(0)
+        return IvtResult(table, start_date, end_date, self.request_col, self.revenue_col)
+
+
+@dataclass(frozen=True)
+class IvtSpikeDetector:
+    """Days where a package's IVT exceeds its own mean + `sigmas` std (per Advertiser/Channel/Package)."""
+    sigmas: float = 2.0
+    keys: tuple = ('Advertiser', 'Channel', 'Package')
+
+    @timed("ivt spikes")
+    def run(self, dataset):
+        # Baselines use the full history (cold tier included), not just the in-memory days
+        df = dataset.frame(['Date', 'IVT (%)', *self.keys])
+        keys = list(self.keys)
+        with stage("groupby daily ivt", len(df)):
+            grouped = df.groupby([pd.to_datetime(df['Date']).rename('Date')] + keys, observed=True)['IVT (%)'].mean().reset_index()
+        with stage("baseline", len(grouped)):
+            baseline = grouped.groupby(keys, observed=True)['IVT (%)'].agg(['mean', 'std']).reset_index()
+            baseline = baseline.rename(columns={'mean': 'baseline_mean', 'std': 'baseline_std'})
+            merged = pd.merge(grouped, baseline, on=keys, how='left')
+        merged['Spike'] = merged['IVT (%)'] > (merged['baseline_mean'] + self.sigmas * merged['baseline_std'])
+        return merged[merged['Spike']]
@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+import functools
+import pandas as pd
+
+# === Streamlit-free stage hooks ===
+# The engines call stage()/timed() unconditionally; they are no-ops until a
+# recorder is installed (the app's perf panel installs one, see perf.py).
+_recorder = None
+
+
+class Stage:
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+
+
+def set_recorder(recorder):
+    """Install a context-manager factory `recorder(name, rows)` that records stages."""
+    global _recorder
+    _recorder = recorder
+
+
+@contextmanager
+def stage(name, rows=None):
+    if _recorder is None:
+        yield Stage(name, rows)
+        return
+    with _recorder(name, rows) as record:
+        yield record
+
+
+def timed(name=None):
+    """Decorator form of `stage`; rows are taken from a returned DataFrame when there is one."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name or fn.__qualname__) as record:
+                result = fn(*args, **kwargs)
+                frame = getattr(result, "table", result)
+                if isinstance(frame, pd.DataFrame):
+                    record.rows = len(frame)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .dataset import PARTITION_COLUMN
+from .profiling import stage, timed
+
+MAX_WORKERS = 4
+
+
+def map_partitions(dataset, fn, column=PARTITION_COLUMN, max_workers=MAX_WORKERS):
+    """{value: fn(partition)} with partitions processed in parallel (pandas releases the GIL in its kernels)."""
+    parts = dataset.partitions(column)
+    if len(parts) <= 1:
+        return {value: fn(part) for value, part in parts.items()}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(parts))) as pool:
+        futures = {value: pool.submit(fn, part) for value, part in parts.items()}
+        return {value: future.result() for value, future in futures.items()}
+
+
+def _partial(part):
+    # Additive pieces only, so partitions combine into the total without a second scan
+    df = part.df
+    return {
+        'Rows': len(df),
+        'Packages': df['Package'].dropna().unique() if 'Package' in df.columns else None,
+        'Gross Revenue': df['Gross Revenue'].sum(),
+        'Revenue cost': df['Revenue cost'].sum() if 'Revenue cost' in df.columns else np.nan,
+        'Request NE': df['Request NE'].sum() if 'Request NE' in df.columns else np.nan,
+        'IVT sum': df['IVT (%)'].sum() if 'IVT (%)' in df.columns else np.nan,
+        'IVT count': df['IVT (%)'].count() if 'IVT (%)' in df.columns else 0,
+    }
+
+
+def _combine(partials):
+    packages = [p['Packages'] for p in partials if p['Packages'] is not None]
+    total = {key: sum(p[key] for p in partials) for key in partials[0] if key != 'Packages'}
+    total['Packages'] = pd.unique(np.concatenate(packages)) if packages else None
+    return total
+
+
+def _summary(partial):
+    revenue, cost, requests = partial['Gross Revenue'], partial['Revenue cost'], partial['Request NE']
+    return {
+        'Rows': partial['Rows'],
+        'Packages': len(partial['Packages']) if partial['Packages'] is not None else np.nan,
+        'Gross Revenue': revenue,
+        'Revenue cost': cost,
+        'Margin (%)': (revenue - cost) / revenue * 100 if revenue else np.nan,
+        'Request NE': requests,
+        'RPM': revenue / requests * 1000 if requests else np.nan,
+        'Avg IVT (%)': partial['IVT sum'] / partial['IVT count'] if partial['IVT count'] else np.nan,
+    }
+
+
+@dataclass
+class RollupResult:
+    """One row per partition plus a Total row."""
+    table: pd.DataFrame
+
+
+@dataclass(frozen=True)
+class AdvertiserRollup:
+    column: str = PARTITION_COLUMN
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    @timed("advertiser rollup")
+    def run(self, dataset):
+        with stage("summarize partitions", len(dataset)):
+            partials = map_partitions(dataset, _partial, self.column)
+        rows = {value: _summary(partial) for value, partial in partials.items()}
+        table = pd.DataFrame.from_dict(rows, orient='index')
+        table.index.name = self.column
+        table = table.sort_values('Gross Revenue', ascending=False).reset_index()
+        if len(table):
+            # "All advertisers" combines the partition sums; ratios come from the combined sums
+            total = _summary(_combine(list(partials.values())))
+            total[self.column] = 'All advertisers'
+            table = pd.concat([table, pd.DataFrame([total])], ignore_index=True)
+        return RollupResult(table)
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+
+PROFITABLE = "👍 Profitable"
+LOSING = "🚩 Losing money"
+RPM_COLUMNS = ['Campaign ID', 'RPM', 'Request NE', 'Gross Revenue', 'Revenue Cost']
+
+
+@dataclass
+class RpmResult:
+    """Low-RPM, high-request rows with serving costs and net revenue (all numeric)."""
+    table: pd.DataFrame
+
+    @property
+    def losing(self):
+        return self.table[self.table['Profit/Loss Status'] == LOSING]
+
+    @property
+    def total_loss(self):
+        net = self.table['Net Revenue After Serving Costs']
+        return -net[net < 0].sum()
+
+
+@dataclass(frozen=True)
+class RpmProfitability:
+    rpm_threshold: float = 0.05
+    req_threshold: int = 10_000_000
+    serving_cost_per_billion: float = 200
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    @timed("rpm profitability")
+    def run(self, dataset):
+        df = dataset.df
+        # Column mapping (robust to case)
+        col_map = {col.lower(): col for col in df.columns}
+        with stage("filter", len(df)):
+            mask = (df[col_map['rpm']] < self.rpm_threshold) & (df[col_map['request ne']] > self.req_threshold)
+            filtered = df[mask].copy()
+        return self._profitability(filtered, col_map)
+
+    def unfiltered(self, dataset):
+        """RpmResult over every row, ignoring the RPM / request thresholds (for full exports)."""
+        df = dataset.df
+        return self._profitability(df.copy(), {col.lower(): col for col in df.columns})
+
+    def _profitability(self, filtered, col_map):
+        for col in RPM_COLUMNS:
+            filtered[col] = filtered[col_map[col.lower()]]
+
+        filtered['Serving Costs'] = np.round(filtered['Request NE'] / 1_000_000_000 * self.serving_cost_per_billion).astype(int)
+        filtered['Net Revenue After Serving Costs'] = filtered['Gross Revenue'] - filtered['Revenue Cost'] - filtered['Serving Costs']
+        filtered['Profit/Loss Status'] = np.where(filtered['Net Revenue After Serving Costs'] > 0, PROFITABLE, LOSING)
+        return RpmResult(filtered)
@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+
+# === Row scoring (Score / Status / Alert, as in the "Scored_With_Alerts" workbook) ===
+# Each rule maps one metric linearly from `bad` (0 points) to `good` (full weight),
+# clipped at both ends; Score is the weighted sum on a 0-100 scale. Every rule is
+# one array expression over the whole column, so a load is scored in a single pass.
+
+SCORE_COLUMNS = ["Score", "Status", "Alert"]
+STATUSES = ["Critical", "Needs Review", "Safe"]
+ALERTS = ["✅ OK", "⚠️ High IVT", "⚠️ Low Margin", "❗ High IVT + Low Margin"]
+
+
+@dataclass(frozen=True)
+class Rule:
+    metric: str
+    weight: float
+    bad: float
+    good: float  # may be below `bad` for lower-is-better metrics (IVT)
+
+    def points(self, values):
+        values = np.asarray(values, dtype=float)
+        share = np.clip((values - self.bad) / (self.good - self.bad), 0.0, 1.0)
+        return self.weight * np.nan_to_num(share, nan=0.0)
+
+
+SCORE_RULES = (
+    Rule("eCPM", 20, 0.0, 10.0),
+    Rule("FillRate", 15, 0.0, 0.05),
+    Rule("IVT (%)", 15, 20.0, 0.0),
+    Rule("Margin (%)", 25, 10.0, 40.0),
+    Rule("RPM", 15, 0.0, 0.02),
+    Rule("Survival rate", 10, 0.0, 0.003),
+)
+
+
+@dataclass
+class ScoreResult:
+    """Score (0-100), Status and Alert for every row, aligned to the scored frame's index."""
+    table: pd.DataFrame
+
+    def apply(self, df):
+        """Copy of `df` with its Score / Status / Alert columns replaced by this result."""
+        return df.assign(**{col: self.table[col] for col in SCORE_COLUMNS})
+
+
+@dataclass(frozen=True)
+class ScoringEngine:
+    rules: tuple = SCORE_RULES
+    critical_below: float = 40.0
+    review_below: float = 55.0
+    high_ivt: float = 10.0     # IVT (%) above this raises "High IVT"
+    low_margin: float = 20.0   # Margin (%) below this raises "Low Margin"
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    def can_score(self, df):
+        return all(rule.metric in df.columns for rule in self.rules)
+
+    def score(self, df):
+        with stage("score rules", len(df)):
+            total = sum(rule.points(df[rule.metric]) for rule in self.rules)
+            scale = 100.0 / sum(rule.weight for rule in self.rules)
+            score = np.round(total * scale, 1)
+
+        with stage("status & alerts", len(df)):
+            status = np.select([score < self.critical_below, score < self.review_below], [0, 1], 2)
+            ivt = df["IVT (%)"].to_numpy(dtype=float, na_value=np.nan)
+            margin = df["Margin (%)"].to_numpy(dtype=float, na_value=np.nan)
+            # Bit 0 = high IVT, bit 1 = low margin; the codes line up with ALERTS
+            alert = (ivt > self.high_ivt).astype(np.int8) | ((margin < self.low_margin).astype(np.int8) << 1)
+
+        return pd.DataFrame({
+            "Score": score,
+            "Status": pd.Categorical.from_codes(status, STATUSES),
+            "Alert": pd.Categorical.from_codes(alert, ALERTS),
+        }, index=df.index)
+
+    @timed("scoring")
+    def run(self, dataset):
+        return ScoreResult(self.score(dataset.df))
+
+
+def score_missing(df, engine=None):
+    """Score rows at load time when the file arrives without Score / Status / Alert."""
+    engine = engine or ScoringEngine()
+    if not engine.can_score(df):
+        return df
+    if all(col in df.columns and df[col].notna().all() for col in SCORE_COLUMNS):
+        return df
+    return ScoreResult(engine.score(df)).apply(df)
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+
+# Metric -> daily aggregation (same as the AI Insights movers)
+TREND_METRICS = {
+    'Gross Revenue': 'sum',
+    'eCPM': 'mean',
+    'FillRate': 'mean',
+    'IVT (%)': 'mean',
+}
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling to at most `threshold` points (NaNs dropped)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    idx = np.empty(threshold, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+@dataclass
+class DailySeries:
+    """Per-package daily metrics stored as packages × days float32 arrays (NaN = no rows that day)."""
+    packages: np.ndarray  # sorted by total revenue, largest first
+    dates: pd.DatetimeIndex
+    values: dict  # metric -> 2D array
+
+    def __post_init__(self):
+        self.row = {package: i for i, package in enumerate(self.packages)}
+
+    @property
+    def nbytes(self):
+        return sum(v.nbytes for v in self.values.values())
+
+    def series(self, package, metric, start=None, end=None, max_points=None):
+        """(dates, values) for one package, optionally clipped to [start, end] and LTTB-downsampled."""
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start))
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        y = self.values[metric][self.row[package], lo:hi]
+        x = np.arange(lo, hi)
+        if max_points:
+            x, y = lttb(x, y, max_points)
+        else:
+            keep = ~np.isnan(y)
+            x, y = x[keep], y[keep]
+        return self.dates[x.astype(np.int64)], y
+
+
+@dataclass(frozen=True)
+class DailySeriesBuilder:
+    metrics: tuple = tuple(TREND_METRICS)
+    package_col: str = "Package"
+
+    @classmethod
+    def default(cls, dataset):
+        return cls(tuple(m for m in TREND_METRICS if m in dataset.df.columns))
+
+    def run(self, dataset):
+        # Built once per dataset: the trends view and the revenue forecast share it
+        return dataset.derived(self, lambda: self._build(dataset))
+
+    @timed("daily series")
+    def _build(self, dataset):
+        # Full history, hot and cold tiers, but only the columns the series need
+        df = dataset.frame(['Date', self.package_col, *self.metrics])
+        with stage("factorize", len(df)):
+            dates = pd.to_datetime(df['Date']).dt.normalize()
+            pkg_codes, packages = pd.factorize(df[self.package_col])
+            valid = dates.notna().to_numpy() & (pkg_codes >= 0)
+            first = dates.min()
+            day_codes = ((dates - first).dt.days).to_numpy()
+            n_days = int(day_codes[valid].max()) + 1 if valid.any() else 0
+            flat = pkg_codes[valid].astype(np.int64) * n_days + day_codes[valid].astype(np.int64)
+            size = len(packages) * n_days
+
+        values = {}
+        with stage("bincount", int(valid.sum())):
+            counts = np.bincount(flat, minlength=size)
+            for metric in self.metrics:
+                col = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype=float)[valid]
+                has = ~np.isnan(col)
+                sums = np.bincount(flat[has], weights=col[has], minlength=size)
+                if TREND_METRICS.get(metric, 'mean') == 'mean':
+                    n = np.bincount(flat[has], minlength=size)
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        sums = sums / n
+                sums[counts == 0] = np.nan
+                values[metric] = sums.reshape(len(packages), n_days).astype(np.float32)
+
+        order = np.arange(len(packages))
+        if 'Gross Revenue' in values:
+            order = np.argsort(-np.nan_to_num(values['Gross Revenue']).sum(axis=1), kind="stable")
+        values = {metric: arr[order] for metric, arr in values.items()}
+        date_index = pd.date_range(first, periods=n_days, freq="D") if n_days else pd.DatetimeIndex([])
+        return DailySeries(np.asarray(packages)[order], date_index, values)
@@ -0,0 +1,299 @@
+import os
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+
+# === Mergeable per-day sketches ===
+# Each day is summarized once: HyperLogLog registers for distinct counts (overall
+# and per campaign) and log-spaced histograms for quantiles. Both merge exactly
+# (register max / bin sum), so a headline over any date range costs a merge of
+# the day sketches, not a scan of the rows. Quantile bins are DDSketch-style:
+# every value inside the tracked range comes back within RELATIVE_ACCURACY.
+
+HLL_PRECISION = 12          # 4096 registers, ~1.6% standard error
+GROUP_HLL_PRECISION = 10    # per-campaign sketches: 1024 registers, ~3.3%
+RELATIVE_ACCURACY = 0.01
+MIN_TRACKED = 1e-4          # |values| below this land in the zero bin
+MAX_TRACKED = 1e9           # and above this in the outermost bin
+
+DISTINCT_COLUMNS = ("Product", "Package", "Campaign ID")
+QUANTILE_METRICS = ("IVT (%)", "eCPM", "Margin (%)")
+GROUP_COLUMN = "Campaign ID"
+ITEM_COLUMN = "Product"     # counted distinct per GROUP_COLUMN
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = np.log(_GAMMA)
+_KEY_MIN = int(np.ceil(np.log(MIN_TRACKED) / _LOG_GAMMA))
+_KEY_MAX = int(np.ceil(np.log(MAX_TRACKED) / _LOG_GAMMA))
+_KEYS = _KEY_MAX - _KEY_MIN + 1
+N_BINS = 2 * _KEYS + 1      # negatives (largest magnitude first), zero, positives
+
+
+# --- HyperLogLog ---
+
+def hll_error(precision):
+    """Standard error of a HyperLogLog estimate with 2**precision registers."""
+    return 1.04 / np.sqrt(2 ** precision)
+
+
+def hash64(values):
+    """64-bit hash per value (stable across runs, so registers from different days merge)."""
+    values = pd.Series(values)
+    if pd.api.types.is_float_dtype(values) and (values % 1 == 0).all():
+        values = values.astype(np.int64)  # IDs read back as floats hash like the ints they are
+    if pd.api.types.is_integer_dtype(values):
+        return pd.util.hash_array(values.to_numpy(dtype=np.int64))
+    # Hash each distinct string once
+    codes, uniques = pd.factorize(values)
+    return pd.util.hash_array(np.asarray(uniques.astype(str), dtype=object))[codes]
+
+
+def hll_update(registers, slots, hashes, precision):
+    """Max the rank of each hash into registers.reshape(-1)[slots * m + bucket]."""
+    m = 1 << precision
+    bucket = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    rest = hashes & np.uint64((1 << (64 - precision)) - 1)
+    # Rank = leading zeros of the remaining bits + 1; they fit a float64 exactly
+    bit_length = np.frexp(rest.astype(np.float64))[1]
+    rank = (64 - precision - bit_length + 1).astype(np.uint8)
+    np.maximum.at(registers.reshape(-1), slots * m + bucket, rank)
+
+
+def hll_estimate(registers):
+    """Distinct-count estimate per row of a (..., m) register array."""
+    registers = np.asarray(registers)
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    zeros = np.sum(registers == 0, axis=-1)
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    # Linear counting is the better estimate while registers are still empty
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+# --- Quantile histogram ---
+
+def quantile_bins(values):
+    """Histogram bin of each value (NaN -> -1)."""
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.abs(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        key = np.ceil(np.log(np.clip(magnitude, MIN_TRACKED, MAX_TRACKED)) / _LOG_GAMMA).astype(np.int64) - _KEY_MIN
+    key = np.clip(key, 0, _KEYS - 1)
+    bins = np.where(values > 0, _KEYS + 1 + key, _KEYS - 1 - key)
+    bins[magnitude < MIN_TRACKED] = _KEYS
+    bins[np.isnan(values)] = -1
+    return bins
+
+
+def _bin_values():
+    keys = np.arange(_KEYS) + _KEY_MIN
+    positive = 2 * _GAMMA ** keys / (_GAMMA + 1)  # midpoint (in relative terms) of each bin
+    return np.concatenate([-positive[::-1], [0.0], positive])
+
+
+BIN_VALUES = _bin_values()
+
+
+def histogram_quantiles(counts, qs):
+    """Values at quantiles `qs` (0-1) of a merged histogram; NaN when it is empty."""
+    counts = np.asarray(counts)
+    total = counts.sum()
+    if total == 0:
+        return np.full(len(qs), np.nan)
+    ranks = np.asarray(qs, dtype=np.float64) * (total - 1)
+    return BIN_VALUES[np.searchsorted(np.cumsum(counts), ranks, side="right")]
+
+
+# --- Day sketches ---
+
+@dataclass
+class DaySketch:
+    """One day's distinct-count registers, quantile histograms and per-campaign registers."""
+    day: pd.Timestamp
+    rows: int
+    distinct: dict          # column -> (m,) uint8
+    quantiles: dict         # metric -> (N_BINS,) int64
+    groups: np.ndarray      # GROUP_COLUMN values, as strings
+    group_registers: np.ndarray  # (len(groups), group m) uint8
+
+    def save(self, path):
+        arrays = {f"distinct/{col}": regs for col, regs in self.distinct.items()}
+        arrays.update({f"quantile/{metric}": counts for metric, counts in self.quantiles.items()})
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, rows=self.rows, groups=self.groups.astype(str), group_registers=self.group_registers, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, day, path):
+        with np.load(path) as data:
+            distinct = {key.split("/", 1)[1]: data[key] for key in data.files if key.startswith("distinct/")}
+            quantiles = {key.split("/", 1)[1]: data[key] for key in data.files if key.startswith("quantile/")}
+            return cls(day, int(data["rows"]), distinct, quantiles, data["groups"].astype(object), data["group_registers"])
+
+
+@dataclass
+class RangeSketch:
+    """Day sketches merged over a date range."""
+    start: pd.Timestamp
+    end: pd.Timestamp
+    days: int
+    rows: int
+    distinct_registers: dict
+    histograms: dict
+    groups: np.ndarray
+    group_registers: np.ndarray
+
+    def distinct(self, column):
+        """Approximate number of distinct values of `column` in the range."""
+        if column not in self.distinct_registers:
+            return None
+        return int(round(float(hll_estimate(self.distinct_registers[column]))))
+
+    def quantiles(self, metric, qs=(0.5, 0.95)):
+        """Approximate quantiles of `metric` over all rows in the range, or None when not sketched."""
+        if metric not in self.histograms:
+            return None
+        return histogram_quantiles(self.histograms[metric], qs)
+
+    def distinct_per_group(self, n=None):
+        """Approximate distinct ITEM_COLUMN per GROUP_COLUMN, largest first."""
+        counts = pd.Series(np.round(hll_estimate(self.group_registers)).astype(np.int64), index=self.groups)
+        counts = counts.sort_values(ascending=False)
+        counts.index.name = GROUP_COLUMN
+        return counts.head(n) if n else counts
+
+
+@dataclass
+class SketchIndex:
+    """Day sketches by date; `merge(start, end)` answers range headlines without the rows."""
+    days: dict = field(default_factory=dict)  # Timestamp -> DaySketch
+
+    @property
+    def span(self):
+        if not self.days:
+            return pd.NaT, pd.NaT
+        return min(self.days), max(self.days)
+
+    def merge(self, start=None, end=None):
+        chosen = [
+            sketch for day, sketch in sorted(self.days.items())
+            if (start is None or day >= pd.Timestamp(start)) and (end is None or day <= pd.Timestamp(end))
+        ]
+        distinct, histograms = {}, {}
+        for sketch in chosen:
+            for col, regs in sketch.distinct.items():
+                distinct[col] = regs if col not in distinct else np.maximum(distinct[col], regs)
+            for metric, counts in sketch.quantiles.items():
+                histograms[metric] = counts if metric not in histograms else histograms[metric] + counts
+        parts = [sketch for sketch in chosen if len(sketch.groups)]
+        if parts:
+            codes, groups = pd.factorize(np.concatenate([sketch.groups for sketch in parts]))
+            group_registers = np.zeros((len(groups), parts[0].group_registers.shape[1]), dtype=np.uint8)
+            np.maximum.at(group_registers, codes, np.concatenate([sketch.group_registers for sketch in parts]))
+        else:
+            groups, group_registers = np.array([], dtype=object), np.zeros((0, 1 << GROUP_HLL_PRECISION), dtype=np.uint8)
+        return RangeSketch(
+            pd.Timestamp(start) if start is not None else self.span[0],
+            pd.Timestamp(end) if end is not None else self.span[1],
+            len(chosen), sum(sketch.rows for sketch in chosen),
+            distinct, histograms, np.asarray(groups, dtype=object), group_registers,
+        )
+
+
+@dataclass(frozen=True)
+class SketchBuilder:
+    distinct_columns: tuple = DISTINCT_COLUMNS
+    quantile_metrics: tuple = QUANTILE_METRICS
+    precision: int = HLL_PRECISION
+    group_precision: int = GROUP_HLL_PRECISION
+
+    @classmethod
+    def default(cls, dataset):
+        columns = dataset.df.columns
+        return cls(
+            distinct_columns=tuple(col for col in DISTINCT_COLUMNS if col in columns),
+            quantile_metrics=tuple(metric for metric in QUANTILE_METRICS if metric in columns),
+        )
+
+    def sketch_days(self, df):
+        """DaySketch per date in `df`, from one vectorized pass over the rows."""
+        dates = pd.to_datetime(df["Date"]).dt.normalize()
+        day_codes, days = pd.factorize(dates, sort=True)
+        n_days = len(days)
+        valid = day_codes >= 0
+        day_codes = day_codes[valid]
+        df = df[valid]
+        m = 1 << self.precision
+
+        distinct = {}
+        with stage("hll registers", len(df)):
+            for col in self.distinct_columns:
+                registers = np.zeros((n_days, m), dtype=np.uint8)
+                present = df[col].notna().to_numpy()
+                hll_update(registers, day_codes[present], hash64(df[col][present]), self.precision)
+                distinct[col] = registers
+
+        quantiles = {}
+        with stage("quantile histograms", len(df)):
+            for metric in self.quantile_metrics:
+                bins = quantile_bins(pd.to_numeric(df[metric], errors="coerce"))
+                keep = bins >= 0
+                counts = np.bincount(day_codes[keep] * N_BINS + bins[keep], minlength=n_days * N_BINS)
+                quantiles[metric] = counts.reshape(n_days, N_BINS)
+
+        group_parts = {}
+        if GROUP_COLUMN in df.columns and ITEM_COLUMN in df.columns:
+            with stage("per-campaign hll", len(df)):
+                present = (df[GROUP_COLUMN].notna() & df[ITEM_COLUMN].notna()).to_numpy()
+                group_codes, labels = pd.factorize(df[GROUP_COLUMN][present])
+                pairs, pair_codes = np.unique(day_codes[present] * len(labels) + group_codes, return_inverse=True)
+                registers = np.zeros((len(pairs), 1 << self.group_precision), dtype=np.uint8)
+                hll_update(registers, pair_codes, hash64(df[ITEM_COLUMN][present]), self.group_precision)
+                pair_days = pairs // len(labels)
+                pair_groups = np.asarray(pd.Index(labels).astype(str), dtype=object)[pairs % len(labels)]
+                for d in range(n_days):
+                    rows = np.flatnonzero(pair_days == d)
+                    group_parts[d] = (pair_groups[rows], registers[rows])
+
+        rows_per_day = np.bincount(day_codes, minlength=n_days)
+        empty = (np.array([], dtype=object), np.zeros((0, 1 << self.group_precision), dtype=np.uint8))
+        return {
+            day: DaySketch(
+                day, int(rows_per_day[d]),
+                {col: regs[d] for col, regs in distinct.items()},
+                {metric: counts[d] for metric, counts in quantiles.items()},
+                *group_parts.get(d, empty),
+            )
+            for d, day in enumerate(days)
+        }
+
+    @timed("day sketches")
+    def run(self, dataset):
+        """SketchIndex over all days; cold-tier days reuse the sketch file saved beside their data."""
+        store = getattr(dataset, "store", None)
+        sketches = {}
+        cold_days = store.days() if store is not None else []
+        if cold_days:
+            stale = []
+            for day in cold_days:
+                path = store.sketch_path(day, dataset.where)
+                if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(store.day_path(day)):
+                    sketches[day] = DaySketch.load(day, path)
+                else:
+                    stale.append(day)
+            if stale:
+                columns = ["Date", *self.distinct_columns, *self.quantile_metrics, GROUP_COLUMN, ITEM_COLUMN]
+                with stage("sketch cold days", len(stale)):
+                    rows = store.read(list(dict.fromkeys(columns)), stale[0], stale[-1], dataset.where)
+                    for day, sketch in self.sketch_days(rows).items():
+                        if day in stale:
+                            sketch.save(store.sketch_path(day, dataset.where))
+                            sketches[day] = sketch
+        df = dataset.df
+        if "Date" in df.columns and len(df):
+            # Hot days are summarized on each load (they may still be re-delivered)
+            sketches.update(self.sketch_days(df))
+        return SketchIndex(sketches)
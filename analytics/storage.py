@@ -0,0 +1,189 @@
+import hashlib
+import os
+import shutil
+import pandas as pd
+from .dataset import Dataset, data_version
+from .profiling import stage
+
+# === Tiered storage: recent days in memory, history on disk ===
+# The last `hot_days` dates stay in `Dataset.df`, which every engine reads. Older
+# dates live in ColdStore as one uncompressed Arrow IPC file per day, opened with
+# memory maps, so history costs disk rather than RAM. Engines that need long
+# baselines go through `Dataset.frame()`; file names carry the date, so a date
+# range only opens the files inside it. Each source (file revision, upload) gets
+# its own store directory named by its data version, so two datasets never read
+# each other's days; only the KEEP_STORES most recently loaded ones stay on disk.
+
+HOT_DAYS = 35
+RETENTION_DAYS = 400  # ~13 months of history
+KEEP_STORES = 3
+FILE_PREFIX = "date="
+SKETCH_PREFIX = "sketch="
+
+
+class ColdStore:
+    """Day files under `root`: date=YYYY-MM-DD.arrow (Arrow IPC file format)."""
+
+    def __init__(self, root, retention_days=RETENTION_DAYS):
+        self.root = root
+        self.retention_days = retention_days
+        os.makedirs(root, exist_ok=True)
+
+    def day_path(self, day):
+        return os.path.join(self.root, f"{FILE_PREFIX}{day:%Y-%m-%d}.arrow")
+
+    def sketch_path(self, day, where=None):
+        """Where a day's sketches are kept (one file per partition filter)."""
+        tag = "".join(f".{col}={value}" for col, value in sorted((where or {}).items()))
+        return os.path.join(self.root, f"{SKETCH_PREFIX}{day:%Y-%m-%d}{tag}.npz")
+
+    def days(self):
+        """Sorted dates present on disk (from the file names, nothing is opened)."""
+        if not os.path.isdir(self.root):
+            return []  # pruned by a newer load
+        days = []
+        for name in os.listdir(self.root):
+            if name.startswith(FILE_PREFIX) and name.endswith(".arrow"):
+                days.append(pd.Timestamp(name[len(FILE_PREFIX):-len(".arrow")]))
+        return sorted(days)
+
+    def version(self):
+        """Changes whenever a day file is added, replaced or dropped."""
+        digest = hashlib.sha1()
+        for day in self.days():
+            info = os.stat(self.day_path(day))
+            digest.update(f"{day:%Y%m%d}:{info.st_size}:{info.st_mtime_ns};".encode())
+        return digest.hexdigest()[:12]
+
+    def write(self, df):
+        """Write (or replace) one file per date in `df`, then drop days past the retention window."""
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        if df.empty:
+            return
+        # Plain strings on disk: per-day dictionaries would not concatenate across files
+        df = df.assign(**{col: df[col].astype(str) for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+        for day, rows in df.groupby(df["Date"].dt.normalize(), sort=True):
+            table = pa.Table.from_pandas(rows, preserve_index=False)
+            path = self.day_path(day)
+            tmp = path + ".tmp"
+            with pa.OSFile(tmp, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)  # readers never see a half-written day
+        self.prune()
+
+    def prune(self):
+        days = self.days()
+        if not days:
+            return
+        cutoff = days[-1] - pd.Timedelta(days=self.retention_days)
+        prefix = f"{SKETCH_PREFIX}{cutoff:%Y-%m-%d}"
+        for day in days:
+            if day < cutoff:
+                os.remove(self.day_path(day))
+        for name in os.listdir(self.root):
+            # Sketch names sort by date, so anything before the cutoff's prefix is older
+            if name.startswith(SKETCH_PREFIX) and name < prefix:
+                os.remove(os.path.join(self.root, name))
+
+    def read(self, columns=None, start=None, end=None, where=None):
+        """Rows of the day files within [start, end], memory-mapped, as a DataFrame."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.ipc as ipc
+
+        days = [d for d in self.days()
+                if (start is None or d >= pd.Timestamp(start).normalize()) and (end is None or d <= pd.Timestamp(end))]
+        tables = []
+        for day in days:
+            table = ipc.open_file(pa.memory_map(self.day_path(day), "r")).read_all()
+            for col, value in (where or {}).items():
+                if col in table.column_names:
+                    table = table.filter(pc.equal(table[col].cast(pa.string()), str(value)))
+            if columns is not None:
+                table = table.select([col for col in columns if col in table.column_names])
+            tables.append(table)
+        if not tables:
+            return pd.DataFrame(columns=list(columns) if columns is not None else None)
+        return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+
+def prune_stores(root, keep=KEEP_STORES):
+    """Delete all but the `keep` most recently loaded store directories under `root`."""
+    if not os.path.isdir(root):
+        return
+    stores = [entry for entry in os.scandir(root) if entry.is_dir()]
+    stores.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in stores[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class TieredDataset(Dataset):
+    """Hot rows in memory (`df`) plus a ColdStore; `frame()` spans both tiers.
+
+    `where` narrows the cold tier to one partition (e.g. {"Advertiser": "Magnite"}).
+    """
+
+    def __init__(self, df, store, version=None, where=None):
+        self.store = store
+        self.where = where or {}
+        cold_days = store.days()
+        if version is None:
+            version = data_version(df)
+            if cold_days:
+                version = f"{version}-{store.version()}"
+        super().__init__(df, version)
+
+    @classmethod
+    def from_frame(cls, df, root, hot_days=HOT_DAYS, retention_days=RETENTION_DAYS, source_version=None):
+        """Move dates older than the last `hot_days` into this source's store under `root`; keep the rest in memory."""
+        store = ColdStore(os.path.join(root, source_version or data_version(df)), retention_days)
+        os.utime(store.root)  # most recently loaded survives prune_stores
+        prune_stores(root)
+        if "Date" in df.columns and len(df):
+            dates = df["Date"].dt.normalize()
+            cutoff = dates.max() - pd.Timedelta(days=hot_days - 1)
+            cold = dates < cutoff
+            if cold.any():
+                with stage("write cold tier", int(cold.sum())):
+                    store.write(df[cold])
+                df = df[~cold].reset_index(drop=True)
+        return cls(df, store)
+
+    @classmethod
+    def from_file(cls, path, root="history", hot_days=HOT_DAYS, retention_days=RETENTION_DAYS):
+        loaded = Dataset.from_file(path)
+        return cls.from_frame(loaded.df, root, hot_days, retention_days, loaded.version)
+
+    def frame(self, columns=None, start=None, end=None):
+        hot = super().frame(columns, start, end)
+        cold_days = self.store.days()
+        # Cold days end where the hot tier starts (a day re-loaded into the hot tier wins)
+        cold_end = None
+        if "Date" in self.df.columns and len(self.df):
+            cold_end = self.df["Date"].min().normalize() - pd.Timedelta(days=1)
+        if end is not None:
+            cold_end = pd.Timestamp(end) if cold_end is None else min(cold_end, pd.Timestamp(end))
+        if not cold_days or (cold_end is not None and cold_days[0] > cold_end):
+            return hot
+        with stage("read cold tier"):
+            cold = self.store.read(columns, start, cold_end, self.where)
+        if cold.empty:
+            return hot
+        return pd.concat([cold, hot], ignore_index=True)
+
+    def date_span(self):
+        first, last = super().date_span()
+        cold_days = self.store.days()
+        if cold_days:
+            first = cold_days[0] if pd.isna(first) else min(first, cold_days[0])
+            last = cold_days[-1] if pd.isna(last) else max(last, cold_days[-1])
+        return first, last
+
+    def _split(self, column):
+        return {
+            value: TieredDataset(part.df, self.store, part.version, {**self.where, column: value})
+            for value, part in super()._split(column).items()
+        }
+
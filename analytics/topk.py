@@ -0,0 +1,31 @@
+import numpy as np
+
+# === Top-K selection without a full sort ===
+# argpartition finds the K best rows in O(n); only those (plus rows tied with
+# the K-th value) are sorted, so ties break deterministically on `tiebreak`.
+
+
+def top_k_index(values, k, largest=True):
+    """Positions of the k largest (or smallest) non-NaN values, plus any rows tied with the k-th."""
+    values = np.asarray(values, dtype=float)
+    candidates = np.flatnonzero(~np.isnan(values))
+    if k <= 0 or not len(candidates):
+        return candidates[:0]
+    if k >= len(candidates):
+        return candidates
+    key = -values[candidates] if largest else values[candidates]
+    kth = key[np.argpartition(key, k - 1)[k - 1]]
+    return candidates[key <= kth]
+
+
+def top_k(df, by, k, largest=True, tiebreak=None):
+    """Rows of `df` with the k largest (or smallest) `by`, sorted, ties ordered by `tiebreak`."""
+    rows = df.iloc[top_k_index(df[by].to_numpy(dtype=float, na_value=np.nan), k, largest)]
+    keys = [by] + ([tiebreak] if tiebreak else [])
+    ascending = [not largest] + ([True] if tiebreak else [])
+    return rows.sort_values(keys, ascending=ascending, kind="stable").head(max(k, 0))
+
+
+def top_and_bottom(df, by, k, tiebreak=None):
+    """(k largest, k smallest) rows by `by`; the same row can appear in both when len(df) < 2k."""
+    return top_k(df, by, k, True, tiebreak), top_k(df, by, k, False, tiebreak)
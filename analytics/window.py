@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .profiling import stage, timed
+from .topk import top_k
+
+
+@dataclass
+class WindowResult:
+    """Per-package revenue for the last `days` dates vs the `days` before them."""
+    table: pd.DataFrame  # Package, Last Revenue, Prev Revenue, Δ Gross Revenue Change, % Change
+    last_dates: list
+    prev_dates: list
+
+    @property
+    def last_range(self):
+        return f"{self.last_dates[0].strftime('%d/%m')}-{self.last_dates[-1].strftime('%d/%m')}"
+
+    @property
+    def prev_range(self):
+        return f"{self.prev_dates[0].strftime('%d/%m')}-{self.prev_dates[-1].strftime('%d/%m')}"
+
+
+@dataclass(frozen=True)
+class WindowComparison:
+    days: int = 3
+    top_n: int = 15
+    sort_by: str = "Last Revenue"
+    package_col: str = "Package"
+
+    @classmethod
+    def default(cls, dataset):
+        return cls()
+
+    @timed("window comparison")
+    def run(self, dataset):
+        """Return a WindowResult, or None when there are fewer than 2 * days dates."""
+        df = dataset.df
+        with stage("to_datetime", len(df)):
+            date_series = pd.to_datetime(df['Date'])
+            dates = sorted(date_series.unique())
+        if len(dates) < 2 * self.days:
+            return None
+
+        last_dates = dates[-self.days:]
+        prev_dates = dates[-2 * self.days:-self.days]
+        with stage("groupby windows", len(df)):
+            last = df[date_series.isin(last_dates)].groupby(self.package_col)['Gross Revenue'].sum()
+            prev = df[date_series.isin(prev_dates)].groupby(self.package_col)['Gross Revenue'].sum()
+            table = pd.concat({"Last Revenue": last, "Prev Revenue": prev}, axis=1).fillna(0)
+
+        table['Δ Gross Revenue Change'] = table["Last Revenue"] - table["Prev Revenue"]
+        table['% Change'] = np.where(
+            table["Prev Revenue"] > 0,
+            table['Δ Gross Revenue Change'] / table["Prev Revenue"].where(table["Prev Revenue"] > 0) * 100,
+            np.nan
+        )
+        table = table.reset_index()
+        if self.top_n:
+            table = top_k(table, self.sort_by, self.top_n, tiebreak=self.package_col)
+        else:
+            table = table.sort_values(self.sort_by, ascending=False)
+        return WindowResult(table.reset_index(drop=True), last_dates, prev_dates)
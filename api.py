@@ -0,0 +1,230 @@
+"""Local JSON API over the analytics engines (stdlib asyncio, no extra dependencies).
+
+Usage: python api.py [--data DemoAI.xlsx] [--host 127.0.0.1] [--port 8765]
+
+    GET /health
+    GET /movers?days=3&top_n=10&advertiser=Magnite      Action Center top movers
+    GET /insights?top_n=5&advertiser=Magnite            AI Insights totals and movers
+    GET /ivt?days=3&threshold=10&advertiser=Magnite     IVT block recommendations
+
+Every response carries an ETag built from the data version and the query, so
+clients sending If-None-Match get a 304 without any work. Computed bodies are
+kept in memory per data version; the data file is reloaded when it changes.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from urllib.parse import parse_qsl, urlsplit
+from analytics import Dataset, InsightsEngine, IvtRecommender, WindowComparison
+from analytics.ivt import BLOCK_RECOMMENDATION
+
+EXCEL_FILE = "DemoAI.xlsx"
+MAX_CACHED_BODIES = 1024
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def records(df):
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def int_param(params, name, default, low=1, high=10_000):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise BadRequest(f"{name} must be between {low} and {high}")
+    return value
+
+
+def float_param(params, name, default):
+    try:
+        return float(params.get(name, default))
+    except ValueError:
+        raise BadRequest(f"{name} must be a number")
+
+
+# === Endpoints (run in a worker thread; the dataset is shared read-only) ===
+
+def movers(dataset, params):
+    days = int_param(params, "days", 3, high=60)
+    top_n = int_param(params, "top_n", 10, high=1000)
+    result = WindowComparison(days=days, top_n=top_n, sort_by="Δ Gross Revenue Change").run(dataset)
+    if result is None:
+        return {"error": f"need at least {2 * days} days of data", "movers": []}
+    return {"last_range": result.last_range, "prev_range": result.prev_range, "movers": records(result.table)}
+
+
+def insights(dataset, params):
+    top_n = int_param(params, "top_n", 5, high=100)
+    result = InsightsEngine().run(dataset)
+    if result is None:
+        return {"error": "need at least 2 days of data", "top_up": [], "top_down": []}
+    return {
+        "last_date": result.last_date.date().isoformat(),
+        "prev_date": result.prev_date.date().isoformat(),
+        "total_last": float(result.total_last),
+        "total_prev": float(result.total_prev),
+        "total_diff": float(result.total_diff),
+        "pct_diff": float(result.pct_diff),
+        "top_up": records(result.top_up(top_n)),
+        "top_down": records(result.top_down(top_n)),
+    }
+
+
+def ivt(dataset, params):
+    days = int_param(params, "days", 3, high=60)
+    threshold = float_param(params, "threshold", 10)
+    result = IvtRecommender.default(dataset, days=days).run(dataset)
+    if result is None:
+        return {"error": "no data in the selected date range", "blocks": []}
+    table = result.recommendations(threshold)
+    blocks = table[table["Recommendation"] == BLOCK_RECOMMENDATION].sort_values("Max IVT", ascending=False)
+    return {
+        "start_date": result.start_date.date().isoformat(),
+        "end_date": result.end_date.date().isoformat(),
+        "groups": len(table),
+        "blocks": records(blocks),
+    }
+
+
+ENDPOINTS = {"/movers": movers, "/insights": insights, "/ivt": ivt}
+
+
+class InsightsApi:
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.dataset = None
+        self.bodies = {}
+        self.pending = {}
+        self.reload_lock = asyncio.Lock()
+
+    async def current_dataset(self):
+        mtime = os.path.getmtime(self.path)
+        if mtime != self.mtime:
+            async with self.reload_lock:
+                if mtime != self.mtime:
+                    self.dataset = await asyncio.to_thread(Dataset.from_file, self.path)
+                    self.bodies, self.mtime = {}, mtime
+        return self.dataset
+
+    def subset(self, dataset, advertiser):
+        if not advertiser:
+            return dataset
+        partitions = dataset.partitions()
+        if advertiser not in partitions:
+            raise BadRequest(f"unknown advertiser {advertiser!r}")
+        return partitions[advertiser]
+
+    async def handle(self, target, headers):
+        """Return (status, body bytes, etag)."""
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        dataset = await self.current_dataset()
+        if url.path == "/health":
+            body = {"status": "ok", "version": dataset.version, "rows": len(dataset)}
+            return 200, json.dumps(body).encode(), None
+        endpoint = ENDPOINTS.get(url.path)
+        if endpoint is None:
+            return 404, json.dumps({"error": f"unknown endpoint {url.path}"}).encode(), None
+
+        key = (dataset.version, url.path, tuple(sorted(params.items())))
+        etag = '"%s-%s"' % (dataset.version, hashlib.sha1(repr(key).encode()).hexdigest()[:10])
+        if headers.get("if-none-match") == etag:
+            return 304, b"", etag
+        body = self.bodies.get(key)
+        if body is None:
+            # Concurrent identical requests share one computation
+            task = self.pending.get(key)
+            if task is None:
+                view = self.subset(dataset, params.pop("advertiser", None))
+                task = asyncio.ensure_future(asyncio.to_thread(endpoint, view, params))
+                self.pending[key] = task
+                task.add_done_callback(lambda _: self.pending.pop(key, None))
+            result = await task
+            body = json.dumps(result, default=str).encode()
+            if len(self.bodies) >= MAX_CACHED_BODIES:
+                self.bodies.pop(next(iter(self.bodies)))
+            self.bodies[key] = body
+        return 200, body, etag
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                t0 = time.perf_counter()
+                try:
+                    if method != "GET":
+                        raise BadRequest("only GET is supported")
+                    status, body, etag = await self.handle(target, headers)
+                except BadRequest as e:
+                    status, body, etag = 400, json.dumps({"error": str(e)}).encode(), None
+                except Exception as e:
+                    status, body, etag = 500, json.dumps({"error": repr(e)}).encode(), None
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = [
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(body)}",
+                    "Cache-Control: no-cache",
+                    f"Server-Timing: app;dur={(time.perf_counter() - t0) * 1000:.2f}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if etag:
+                    head.append(f"ETag: {etag}")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(path, host, port):
+    api = InsightsApi(path)
+    dataset = await api.current_dataset()
+    server = await asyncio.start_server(api.serve_connection, host, port)
+    print(f"Serving {len(dataset):,} rows (version {dataset.version}) on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the analytics engines as a local JSON API.")
+    parser.add_argument("--data", default=EXCEL_FILE, help=".xlsx, .csv or .parquet")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.data, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,41 @@
+import importlib
 import streamlit as st
-import pandas as pd
+from data_store import EXCEL_FILE, current_dataset, load_dataset, set_dataset
+from perf import begin_run, render_perf_panel, stage
+from precompute import render_status, warm
+
+begin_run()
 
 # === Load Excel file once and share across the app ===
-EXCEL_FILE = "DemoAI.xlsx"
 if "main_df" not in st.session_state:
-    st.session_state["main_df"] = pd.read_excel(EXCEL_FILE)
+    with stage("load excel") as s:
+        s.rows = len(set_dataset(load_dataset(EXCEL_FILE)))
+
+# === Warm every tab's default view in the background for this data version ===
+warm(current_dataset())
+
+# ---- TAB REGISTRY ----
+# Tab name -> (module, render function). A tab's module (and its heavy
+# dependencies) is only imported the first time that tab is selected.
+TABS = {
+    "Home": ("home", "show_home"),
+    "AI Insights": ("ai_insights", "show_ai_insights"),
+    "Dashboard": ("dashboard", "show_dashboard"),
+    "IVT Optimization": ("ivt_optimization", "show_ivt_optimization"),
+    "RPM Optimization": ("rpm_optimization", "show_rpm_optimization"),
+    "Pubimps/advimps discrepancy": ("pubimps", "show_pubimps"),
+    "Trend Explorer": ("trends", "show_trends"),
+    "Floor Optimizer": ("floors", "show_floors"),
+}
+
+
+def render_tab(name):
+    module_name, func_name = TABS[name]
+    getattr(importlib.import_module(module_name), func_name)()
 
-from home import show_home
-from ai_insights import show_ai_insights
-from dashboard import show_dashboard
-from ivt_optimization import show_ivt_optimization
-from rpm_optimization import show_rpm_optimization
-from filter import show_filtering
-from pubimps import show_pubimps
 
 # ---- TAB LOGIC ----
-tab_list = [
-    "Home",
-    "AI Insights",
-    "Dashboard",
-    "IVT Optimization",
-    "RPM Optimization",
-    "Pubimps/advimps discrepancy"
-]
+tab_list = list(TABS)
 if "tab" not in st.session_state:
     st.session_state["tab"] = "Home"
 
@@ -40,19 +53,15 @@ with st.sidebar:
         index=tab_list.index(st.session_state["tab"])
     )
     st.session_state["tab"] = selected
+    st.caption(f"Advertiser: {st.session_state.get('selected_advertiser', 'All advertisers')}")
+    render_status()
 
 tab = st.session_state["tab"]
 
 # ---- MAIN TAB CONTENT ----
-if tab == "Home":
-    show_home()
-elif tab == "AI Insights":
-    show_ai_insights()
-elif tab == "Dashboard":
-    show_dashboard()
-elif tab == "IVT Optimization":
-    show_ivt_optimization()
-elif tab == "RPM Optimization":
-    show_rpm_optimization()
-elif tab == "Pubimps/advimps discrepancy":
-    show_pubimps()
+try:
+    render_tab(tab)
+finally:
+    # Rendered last so it shows the stages of this very rerun (also after st.stop())
+    with st.sidebar:
+        render_perf_panel()
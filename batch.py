@@ -0,0 +1,131 @@
+"""Headless daily batch: write every tab's recommendations without opening the app.
+
+Usage: python batch.py [--data DemoAI.xlsx] [--out-dir reports] [--format csv|parquet]
+                       [--rules alert_rules.txt] [--alerts-db alerts.db] [--no-alerts]
+
+Writes ivt_block_list, rpm_losing_money and margin_leaks (one file each,
+suffixed with the latest data date) using the same engines as the tabs, then
+evaluates the alert rules on the days added since the previous run and queues
+new alerts in the outbox of --alerts-db.
+Schedule it with cron, e.g. `0 6 * * * cd /app && python batch.py`.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from alert_store import ALERTS_DB, AlertStore
+from analytics import AlertEngine, Dataset, DiscrepancyAnalyzer, IvtRecommender, RpmProfitability, load_rules
+from analytics.ivt import BLOCK_RECOMMENDATION
+
+EXCEL_FILE = "DemoAI.xlsx"
+RPM_COLUMNS = [
+    "Profit/Loss Status", "Campaign ID", "Product", "RPM", "Request NE", "Gross Revenue", "Revenue Cost",
+    "Serving Costs", "Net Revenue After Serving Costs",
+]
+LEAK_COLUMNS = [
+    "Product", "Campaign ID", "Publisher Impressions", "Advertiser Impressions", "Gross Revenue",
+    "Revenue cost", "Margin", "Impression Gap",
+]
+
+
+# --- Reports (each takes the shared dataset and returns a frame) ---
+
+def ivt_block_list(dataset, args):
+    result = IvtRecommender.default(dataset, days=args.ivt_days).run(dataset)
+    if result is None:
+        return None
+    table = result.recommendations(args.ivt_threshold)
+    return table[table["Recommendation"] == BLOCK_RECOMMENDATION].sort_values("Max IVT", ascending=False)
+
+
+def rpm_losing_money(dataset, args):
+    result = RpmProfitability(args.rpm_threshold, args.req_threshold).run(dataset)
+    return result.losing[RPM_COLUMNS].sort_values("Net Revenue After Serving Costs")
+
+
+def margin_leaks(dataset, args):
+    result = DiscrepancyAnalyzer().run(dataset)
+    return result.negative[LEAK_COLUMNS].sort_values("Gross Revenue", ascending=False)
+
+
+REPORTS = {
+    "ivt_block_list": ivt_block_list,
+    "rpm_losing_money": rpm_losing_money,
+    "margin_leaks": margin_leaks,
+}
+
+
+def run_alerts(dataset, args):
+    """Evaluate the rules incrementally and queue new alerts; returns the number queued."""
+    engine = AlertEngine(load_rules(args.rules)) if args.rules else AlertEngine()
+    result, added = AlertStore(args.alerts_db).evaluate(engine, dataset)
+    for name, reason in result.skipped.items():
+        print(f"  alert rule {name!r} skipped: {reason}")
+    return added
+
+
+def write_report(df, path, fmt):
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the daily IVT, RPM and margin-leak reports.")
+    parser.add_argument("--data", default=EXCEL_FILE, help=".xlsx, .csv or .parquet")
+    parser.add_argument("--out-dir", default="reports")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--only", nargs="+", choices=list(REPORTS), help="write only these reports")
+    parser.add_argument("--ivt-days", type=int, default=3)
+    parser.add_argument("--ivt-threshold", type=float, default=10)
+    parser.add_argument("--rpm-threshold", type=float, default=RpmProfitability.rpm_threshold)
+    parser.add_argument("--req-threshold", type=int, default=RpmProfitability.req_threshold)
+    parser.add_argument("--rules", help="alert rules file, one rule per line (default: built-in rules)")
+    parser.add_argument("--alerts-db", default=ALERTS_DB)
+    parser.add_argument("--no-alerts", action="store_true", help="skip alert evaluation")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    dataset = Dataset.from_file(args.data)
+    load_s = time.perf_counter() - t0
+    print(f"Loaded {len(dataset):,} rows from {args.data} in {load_s:.2f}s")
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = dataset.df["Date"].max().strftime("%Y-%m-%d") if "Date" in dataset.df.columns else "latest"
+
+    # The dataset is read-only, so the reports can share it across threads
+    names = args.only or list(REPORTS)
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        futures = {name: pool.submit(REPORTS[name], dataset, args) for name in names}
+
+    failed = False
+    for name, future in futures.items():
+        try:
+            df = future.result()
+        except Exception as e:
+            print(f"  {name}: FAILED ({e})", file=sys.stderr)
+            failed = True
+            continue
+        if df is None:
+            print(f"  {name}: no data in range")
+            continue
+        path = out_dir / f"{name}_{stamp}.{args.format}"
+        write_report(df, path, args.format)
+        print(f"  {name}: {len(df):,} rows -> {path}")
+
+    if not args.no_alerts:
+        try:
+            added = run_alerts(dataset, args)
+            print(f"  alerts: {added:,} new -> {args.alerts_db}")
+        except Exception as e:
+            print(f"  alerts: FAILED ({e})", file=sys.stderr)
+            failed = True
+    print(f"Done in {time.perf_counter() - t0:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
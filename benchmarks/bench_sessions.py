@@ -0,0 +1,197 @@
+"""Multi-session load test: concurrent headless app sessions clicking through every tab.
+
+Usage: python benchmarks/bench_sessions.py [--sessions 24] [--rows 200000] [--days 30] [--rounds 2] [--json out.json]
+
+Each session is a streamlit AppTest in its own process (AppTest drives a
+process-wide Runtime singleton, so sessions cannot share one process). Every
+process builds the same synthetic frame, runs one warm-up pass through the tabs
+to fill its cache_resource / precompute caches (what a long-running server
+already has), then all processes start together and visit every tab `--rounds`
+times, each from a different first tab. Reports p50/p99 rerun latency per tab
+and overall, and the resident memory each measured session adds on top of its
+warm process. A worker that dies or raises counts as a failure (exit 1).
+"""
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+logging.getLogger("streamlit").setLevel(logging.CRITICAL)
+
+from bench_startup import TABS  # noqa: E402
+from synthetic_data import generate  # noqa: E402
+
+START_TIMEOUT = 1800  # seconds a worker waits for the others to finish warming up
+
+
+def rss_mb():
+    """Resident set size of this process (falls back to the peak where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * q) - 1, 0)]
+
+
+def run_session(index, df, rounds):
+    """Start one session on Home, then visit every tab `rounds` times; returns (app, timings, errors)."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=600)
+    at.session_state["main_df"] = df
+    at.session_state["tab"] = "Home"
+    timings, errors = [], []
+
+    def rerun(tab):
+        at.session_state["tab"] = tab
+        t0 = time.perf_counter()
+        at.run()
+        timings.append((tab, time.perf_counter() - t0))
+        if at.exception:
+            errors.append((tab, str(at.exception[0].value)[:200]))
+
+    rerun("Home")
+    order = TABS[index % len(TABS):] + TABS[:index % len(TABS)]
+    for _ in range(rounds):
+        for tab in order:
+            rerun(tab)
+    return at, timings, errors
+
+
+def worker(index, args, start, results):
+    """One session process: warm up, wait for every process, run the measured session, report."""
+    os.chdir(ROOT)
+    try:
+        df = generate(args["rows"], days=args["days"], advertisers=args["advertisers"])
+        _, cold, cold_errors = run_session(index, df, 1)
+        gc.collect()
+        rss_warm = rss_mb()
+        start.wait(START_TIMEOUT)
+        at, timings, errors = run_session(index, df, args["rounds"])
+        gc.collect()
+        rss_session = rss_mb()  # `at` (and its session_state) is still alive
+        results.put({
+            "index": index, "cold": cold, "timings": timings, "errors": cold_errors + errors,
+            "rss_warm": rss_warm, "rss_delta": rss_session - rss_warm,
+        })
+    except BaseException:
+        start.abort()  # release the others instead of leaving them at the barrier
+        results.put({"index": index, "failure": traceback.format_exc(limit=5)})
+
+
+def summarize(timings):
+    rows = {}
+    for tab, seconds in timings:
+        rows.setdefault(tab, []).append(seconds * 1000)
+    return {
+        tab: {"n": len(ms), "p50": percentile(ms, 0.5), "p99": percentile(ms, 0.99), "max": max(ms)}
+        for tab, ms in rows.items()
+    }
+
+
+def print_table(title, timings):
+    print(title)
+    if not timings:
+        print("  (no reruns completed)")
+        return
+    print(f"  {'tab':<30}{'reruns':>7}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for tab, row in summarize(timings).items():
+        print(f"  {tab:<30}{row['n']:>7}{row['p50']:>10.1f}{row['p99']:>10.1f}{row['max']:>10.1f}")
+    ms = [seconds * 1000 for _, seconds in timings]
+    print(f"  {'all':<30}{len(ms):>7}{percentile(ms, 0.5):>10.1f}{percentile(ms, 0.99):>10.1f}{max(ms):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=24)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--advertisers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=2, help="passes through every tab per session")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    print(f"{args.rows:,} rows, {args.days} days; {args.sessions} sessions × {args.rounds} rounds × {len(TABS)} tabs")
+
+    # Spawned, not forked: a fresh interpreter per session, no inherited threads or Runtime
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Barrier(args.sessions + 1)
+    results = ctx.Queue()
+    worker_args = {"rows": args.rows, "days": args.days, "advertisers": args.advertisers, "rounds": args.rounds}
+    processes = [ctx.Process(target=worker, args=(i, worker_args, start, results)) for i in range(args.sessions)]
+    for process in processes:
+        process.start()
+
+    failures = []
+    try:
+        start.wait(START_TIMEOUT)  # every process has warmed up
+    except Exception:
+        failures.append("warm-up did not complete in every session")
+    t0 = time.perf_counter()
+    reports = {}
+    while len(reports) < args.sessions and (any(p.is_alive() for p in processes) or not results.empty()):
+        try:
+            report = results.get(timeout=1)
+        except Exception:
+            continue
+        reports[report["index"]] = report
+    elapsed = time.perf_counter() - t0
+    for process in processes:
+        process.join(timeout=30)
+
+    for i, process in enumerate(processes):
+        report = reports.get(i)
+        if report is None:
+            failures.append(f"session {i}: process exited ({process.exitcode}) without reporting")
+        elif "failure" in report:
+            failures.append(f"session {i}: {report['failure'].strip().splitlines()[-1]}")
+    done = [r for r in reports.values() if "failure" not in r]
+    cold = [t for r in done for t in r["cold"]]
+    timings = [t for r in done for t in r["timings"]]
+    errors = [e for r in done for e in r["errors"]]
+
+    print_table("\nWarm-up pass, one per process (cold caches)", cold)
+    rate = f", {len(timings) / elapsed:.1f} reruns/s" if elapsed > 0 else ""
+    print_table(f"\n{len(done)} concurrent sessions ({elapsed:.1f}s{rate})", timings)
+    if done:
+        warm = sum(r["rss_warm"] for r in done) / len(done)
+        per_session = sum(r["rss_delta"] for r in done) / len(done)
+        print(f"\nMemory: {warm:,.0f} MB per process with warm caches; "
+              f"~{per_session:,.1f} MB added by each open session")
+    else:
+        warm = per_session = None
+    if errors:
+        print(f"\n{len(errors)} reruns raised:")
+        for tab, message in errors[:10]:
+            print(f"  {tab}: {message}")
+    if failures:
+        print(f"\n{len(failures)} failures:")
+        for failure in failures[:10]:
+            print(f"  {failure}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "rows": args.rows, "sessions": args.sessions, "rounds": args.rounds,
+                "cold": summarize(cold), "concurrent": summarize(timings),
+                "rss_mb": {"warm_process": warm, "per_session": per_session},
+                "errors": errors, "failures": failures,
+            }, f, indent=2)
+    return 1 if errors or failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Startup-time benchmark: module import cost, cold app start and per-rerun overhead.
+
+Usage: python benchmarks/bench_startup.py [--repeat 5] [--reruns 10]
+"""
+import argparse
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TAB_MODULES = ["home", "ai_insights", "dashboard", "ivt_optimization", "rpm_optimization", "pubimps", "trends", "floors"]
+HEAVY_DEPS = ["openai", "st_aggrid", "plotly"]
+TABS = [
+    "Home",
+    "AI Insights",
+    "Dashboard",
+    "IVT Optimization",
+    "RPM Optimization",
+    "Pubimps/advimps discrepancy",
+    "Trend Explorer",
+    "Floor Optimizer",
+]
+
+IMPORT_SNIPPET = """
+import sys, time
+import streamlit, pandas
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def time_import(module, repeat):
+    # A fresh interpreter per sample so nothing is already in sys.modules
+    samples, heavy = [], ""
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(module=module, heavy=HEAVY_DEPS)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        samples.append(float(out[0]))
+        heavy = out[1] if len(out) > 1 else ""
+    return statistics.median(samples), heavy
+
+
+def time_app(tab, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+    at.session_state["tab"] = tab
+    t0 = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - t0
+    samples = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - t0)
+    return cold, statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh-interpreter samples per module import")
+    parser.add_argument("--reruns", type=int, default=5, help="warm reruns per tab")
+    args = parser.parse_args()
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    logging.getLogger("streamlit").setLevel(logging.CRITICAL)
+
+    print(f"{'module':<20}{'import (ms)':>12}  heavy deps pulled in")
+    for module in TAB_MODULES:
+        median, heavy = time_import(module, args.repeat)
+        print(f"{module:<20}{median * 1000:>12.1f}  {heavy or '-'}")
+
+    print()
+    print(f"{'tab':<30}{'cold (ms)':>10}{'rerun p50':>11}{'rerun max':>11}")
+    for tab in TABS:
+        cold, p50, worst = time_app(tab, args.reruns)
+        print(f"{tab:<30}{cold * 1000:>10.1f}{p50 * 1000:>11.1f}{worst * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Headless benchmark of each tab's core computation on synthetic data of growing size.
+
+Usage: python benchmarks/bench_tabs.py [--sizes 10000 100000 1000000] [--days 30] [--json out.jsonl]
+Sizes up to 50M rows are supported given enough RAM (~6 GB per 10M rows).
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+logging.getLogger("streamlit").setLevel(logging.CRITICAL)
+
+from synthetic_data import generate  # noqa: E402
+from analytics import (  # noqa: E402
+    DailySeriesBuilder, Dataset, DiscrepancyAnalyzer, FloorSimulator, InsightsEngine, IvtRecommender, IvtSpikeDetector,
+    RevenueDecomposition, RevenueForecaster, RpmProfitability, SketchBuilder, SupplyFunnel, WindowComparison,
+)
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+ENGINES = [
+    ("3d window table", WindowComparison),
+    ("day sketches", SketchBuilder),
+    ("insights movers", InsightsEngine),
+    ("revenue drivers", RevenueDecomposition),
+    ("ivt aggregate", IvtRecommender),
+    ("rpm filter", RpmProfitability),
+    ("pubimps leaks", DiscrepancyAnalyzer),
+    ("supply funnel", SupplyFunnel),
+    ("ivt spikes", IvtSpikeDetector),
+    ("daily series", DailySeriesBuilder),
+    ("revenue forecast", RevenueForecaster),
+    ("floor grid", FloorSimulator),
+]
+COMPUTATIONS = [
+    (name, lambda ds, engine=engine: (engine.default(ds) if hasattr(engine, "default") else engine()).run(ds))
+    for name, engine in ENGINES
+]
+
+def measure(fn, df, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    fn(df)
+    elapsed = time.perf_counter() - t0
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--only", nargs="+", help="run only these computations (by name)")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows runs down)")
+    parser.add_argument("--json", help="append results as JSON lines to this file")
+    args = parser.parse_args()
+
+    computations = [c for c in COMPUTATIONS if not args.only or c[0] in args.only]
+    results = []
+    print(f"{'rows':>12}  {'computation':<18}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}")
+    for size in args.sizes:
+        df = Dataset(generate(size, days=args.days))
+        for name, fn in computations:
+            # Fresh wrapper per computation: intermediates memoized on a Dataset (the daily
+            # series) would otherwise be timed only in whichever computation runs first
+            elapsed, peak = measure(fn, Dataset(df.df, df.version), not args.no_memory)
+            peak_mb = peak / 1e6 if peak is not None else None
+            results.append({"rows": size, "computation": name, "seconds": elapsed,
+                            "rows_per_s": size / elapsed, "peak_mb": peak_mb})
+            peak_str = f"{peak_mb:>10.1f}" if peak_mb is not None else f"{'-':>10}"
+            print(f"{size:>12,}  {name:<18}{elapsed:>10.3f}{size / elapsed:>14,.0f}{peak_str}")
+        del df
+
+    if args.json:
+        with open(args.json, "a") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+
+
+if __name__ == "__main__":
+    main()
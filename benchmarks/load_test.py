@@ -0,0 +1,82 @@
+"""Load test for api.py: concurrent keep-alive clients, reports requests/s and latency.
+
+Usage: python benchmarks/load_test.py [--url http://127.0.0.1:8765] [--requests 5000] [--concurrency 50]
+Start the server first (python api.py). --etag sends If-None-Match to measure the 304 path.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+PATHS = [
+    "/movers?days=3&top_n=10",
+    "/insights?top_n=5",
+    "/ivt?days=3&threshold=10",
+    "/movers?days=1&top_n=25&advertiser=Magnite",
+]
+
+
+async def fetch(reader, writer, host, path, etag=None):
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+    if etag:
+        request += f"If-None-Match: {etag}\r\n"
+    writer.write((request + "\r\n").encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("etag")
+
+
+async def client(url, paths, count, use_etag, latencies, statuses):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    etags = {}
+    try:
+        for i in range(count):
+            path = paths[i % len(paths)]
+            t0 = time.perf_counter()
+            status, etag = await fetch(reader, writer, parts.netloc, path, etags.get(path) if use_etag else None)
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+            if etag:
+                etags[path] = etag
+    finally:
+        writer.close()
+
+
+async def run(args):
+    latencies, statuses = [], {}
+    per_client = max(args.requests // args.concurrency, 1)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        client(args.url, PATHS, per_client, args.etag, latencies, statuses) for _ in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"{len(ms):,} requests in {elapsed:.2f}s with {args.concurrency} clients")
+    print(f"  throughput  {len(ms) / elapsed:,.0f} req/s")
+    print(f"  latency ms  p50 {statistics.median(ms):.2f}  p95 {ms[int(len(ms) * 0.95) - 1]:.2f}  "
+          f"p99 {ms[int(len(ms) * 0.99) - 1]:.2f}  max {ms[-1]:.2f}")
+    print(f"  statuses    {dict(sorted(statuses.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--etag", action="store_true", help="revalidate with If-None-Match after the first response")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
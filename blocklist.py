@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+# === Persistent block list (SQLite, WAL) ===
+# One row per (Product, Campaign ID, source tab); re-blocking the same pair from the
+# same tab is ignored. Readers use an in-memory key set that is rebuilt only when
+# the database changes (PRAGMA data_version also sees writes from other processes).
+DB_FILE = "blocklist.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    product TEXT NOT NULL,
+    campaign_id TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    source TEXT NOT NULL,
+    blocked_at REAL NOT NULL,
+    PRIMARY KEY (product, campaign_id, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS blocks_by_time ON blocks (blocked_at);
+"""
+
+
+def _key_series(values):
+    """Vectorized _key for a column."""
+    if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+        return values.astype("Int64").astype(str)
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype(str)
+    return values.astype(str).str.strip()
+
+
+def _key(value):
+    # Product / Campaign IDs arrive as ints, floats (from NaN-able columns) or strings
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class BlockList:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._keys = frozenset()
+        self._index = pd.Index([], dtype=str)
+        self._keys_version = None
+
+    def add(self, products, campaign_ids, reason, source):
+        """Block every (product, campaign) pair in one transaction; returns how many were new."""
+        now = time.time()
+        rows = [(_key(p), _key(c), reason, source, now) for p, c in zip(products, campaign_ids)]
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany("INSERT OR IGNORE INTO blocks VALUES (?, ?, ?, ?, ?)", rows)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.total_changes - before
+
+    def remove(self, products, campaign_ids):
+        rows = [(_key(p), _key(c)) for p, c in zip(products, campaign_ids)]
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany("DELETE FROM blocks WHERE product = ? AND campaign_id = ?", rows)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.total_changes - before
+
+    def keys(self):
+        """frozenset of blocked (product, campaign_id) string pairs, cached until the db changes."""
+        with self.lock:
+            version = (self.conn.total_changes, self.conn.execute("PRAGMA data_version").fetchone()[0])
+            if version != self._keys_version:
+                rows = self.conn.execute("SELECT DISTINCT product, campaign_id FROM blocks").fetchall()
+                self._keys = frozenset(rows)
+                # Hash index of "product<US>campaign" strings for vectorized lookups
+                self._index = pd.Index([f"{p}\x1f{c}" for p, c in rows], dtype=str)
+                self._keys_version = version
+            return self._keys
+
+    def version(self):
+        """Changes whenever the block list does; use it to key cached annotations."""
+        self.keys()
+        return self._keys_version
+
+    def is_blocked(self, df, product_col="Product", campaign_col="Campaign ID"):
+        """Boolean Series aligned to df: True where the row's (product, campaign) is blocked."""
+        if not self.keys() or df.empty:
+            return pd.Series(False, index=df.index)
+        pairs = _key_series(df[product_col]) + "\x1f" + _key_series(df[campaign_col])
+        return pd.Series(self._index.get_indexer(pairs) >= 0, index=df.index)
+
+    def entries(self, source=None):
+        query = "SELECT product, campaign_id, reason, source, blocked_at FROM blocks"
+        params = ()
+        if source:
+            query += " WHERE source = ?"
+            params = (source,)
+        with self.lock:
+            df = pd.read_sql_query(query + " ORDER BY blocked_at DESC", self.conn, params=params)
+        df["blocked_at"] = pd.to_datetime(df["blocked_at"], unit="s")
+        return df.rename(columns={
+            "product": "Product", "campaign_id": "Campaign ID", "reason": "Reason",
+            "source": "Source", "blocked_at": "Blocked At",
+        })
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
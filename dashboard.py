@@ -1,7 +1,61 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import openai
+from analytics import SketchBuilder, WindowComparison
+from analytics.sketches import GROUP_HLL_PRECISION, HLL_PRECISION, RELATIVE_ACCURACY, hll_error
+from data_store import current_dataset
+from perf import stage
+from precompute import get_view
+from styling import sign_css, style_columns
+
+@st.fragment
+def range_headlines(sketches):
+    """Headline distinct counts and quantiles for any date range, from merged day sketches."""
+    first, last = sketches.span
+    if pd.isna(first):
+        return
+    st.subheader("📐 Range Headlines")
+    first, last = first.date(), last.date()
+    if first < last:
+        start, end = st.slider("Date range", min_value=first, max_value=last, value=(first, last), key="headline_range")
+    else:
+        start, end = first, last
+    with stage("merge sketches", len(sketches.days)):
+        merged = sketches.merge(start, end)
+
+    def count(column):
+        value = merged.distinct(column)
+        return "n/a" if value is None else f"~{value:,}"
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Rows", f"{merged.rows:,}")
+    col2.metric("Products", count("Product"))
+    col3.metric("Packages", count("Package"))
+    col4.metric("Campaigns", count("Campaign ID"))
+
+    cols = st.columns(3)
+    for col, (metric, qs, fmt) in zip(cols, [
+        ("IVT (%)", (0.5, 0.95), "{:.1f}%"),
+        ("eCPM", (0.5, 0.95), "${:.2f}"),
+        ("Margin (%)", (0.05, 0.5), "{:.1f}%"),
+    ]):
+        values = merged.quantiles(metric, qs)
+        if values is None:
+            continue
+        label = " / ".join(f"p{round(q * 100)}" for q in qs)
+        col.metric(f"{metric.replace(' (%)', '')} {label}", " / ".join(fmt.format(v) for v in values))
+
+    per_campaign = merged.distinct_per_group(10)
+    if len(per_campaign):
+        with st.expander("Distinct products per campaign (top 10)"):
+            st.dataframe(per_campaign.rename("~Products").reset_index(), use_container_width=True, hide_index=True)
+    st.caption(
+        f"Approximate: merged from {merged.days} daily sketches instead of scanning the rows. "
+        f"Distinct counts have ~{hll_error(HLL_PRECISION):.1%} standard error overall and "
+        f"~{hll_error(GROUP_HLL_PRECISION):.1%} per campaign (single campaigns can be off by twice that); "
+        f"quantiles are within ±{RELATIVE_ACCURACY:.0%} of the value, over rows."
+    )
+
 
 def show_dashboard():
     st.title("📈 AI-Powered Revenue Action Center – Dashboard")
@@ -11,19 +65,22 @@ def show_dashboard():
         st.info("Please upload your Excel file in the AI Insights tab first.")
         return
 
-    df = st.session_state["main_df"]
+    dataset = current_dataset()
+    df = dataset.df
 
-    # Date logic
-    df['Date'] = pd.to_datetime(df['Date'])
-    dates = sorted(df['Date'].unique())
-    if len(dates) < 6:
+    # Date logic (default view is usually precomputed in the background)
+    with stage("3d window view", len(df)):
+        window = get_view("dashboard", dataset, WindowComparison(days=3, top_n=15))
+    if window is None:
         st.warning("Need at least 6 days of data for 3d vs 3d comparison!")
         st.stop()
-
-    last3d = dates[-3:]
-    prev3d = dates[-6:-3]
-    last_range = f"{last3d[0].strftime('%d/%m')}-{last3d[-1].strftime('%d/%m')}"
-    prev_range = f"{prev3d[0].strftime('%d/%m')}-{prev3d[-1].strftime('%d/%m')}"
+    last3d, prev3d = window.last_dates, window.prev_dates
+    last_range, prev_range = window.last_range, window.prev_range
+    merged = window.table.rename(columns={
+        "Last Revenue": f"Last 3d Revenue ({last_range})",
+        "Prev Revenue": f"Prev 3d Revenue ({prev_range})",
+    })
+    merged['% Change'] = merged['% Change'].fillna(100.0)
 
     def format_money(val):
         try:
@@ -31,47 +88,33 @@ def show_dashboard():
         except:
             return ""
 
-    merged = pd.merge(
-        df[df['Date'].isin(last3d)].groupby('Package', as_index=False)['Gross Revenue'].sum().rename(columns={'Gross Revenue': f"Last 3d Revenue ({last_range})"}),
-        df[df['Date'].isin(prev3d)].groupby('Package', as_index=False)['Gross Revenue'].sum().rename(columns={'Gross Revenue': f"Prev 3d Revenue ({prev_range})"}),
-        how='outer', on='Package'
-    ).fillna(0)
-
-    merged['Δ Gross Revenue Change'] = merged[f"Last 3d Revenue ({last_range})"] - merged[f"Prev 3d Revenue ({prev_range})"]
-    merged['% Change'] = np.where(
-        merged[f"Prev 3d Revenue ({prev_range})"] > 0,
-        (merged[f"Last 3d Revenue ({last_range})"] - merged[f"Prev 3d Revenue ({prev_range})"]) / merged[f"Prev 3d Revenue ({prev_range})"] * 100,
-        100.0
-    )
-    merged = merged.sort_values(f"Last 3d Revenue ({last_range})", ascending=False).head(15)
-
-    ac_table = merged[['Package', f"Last 3d Revenue ({last_range})", f"Prev 3d Revenue ({prev_range})", 'Δ Gross Revenue Change', '% Change']].copy()
-    ac_table[f"Last 3d Revenue ({last_range})"] = ac_table[f"Last 3d Revenue ({last_range})"].apply(format_money)
-    ac_table[f"Prev 3d Revenue ({prev_range})"] = ac_table[f"Prev 3d Revenue ({prev_range})"].apply(format_money)
-    ac_table['Δ Gross Revenue Change Raw'] = merged['Δ Gross Revenue Change']  # Keep for styling
-    ac_table['Δ Gross Revenue Change'] = ac_table['Δ Gross Revenue Change'].apply(format_money)
-    ac_table['% Change'] = ac_table['% Change'].apply(lambda x: f"{x:.0f}%")
+    with stage("format table", len(merged)):
+        ac_table = merged[['Package', f"Last 3d Revenue ({last_range})", f"Prev 3d Revenue ({prev_range})", 'Δ Gross Revenue Change', '% Change']].copy()
+        ac_table[f"Last 3d Revenue ({last_range})"] = ac_table[f"Last 3d Revenue ({last_range})"].apply(format_money)
+        ac_table[f"Prev 3d Revenue ({prev_range})"] = ac_table[f"Prev 3d Revenue ({prev_range})"].apply(format_money)
+        ac_table['Δ Gross Revenue Change Raw'] = merged['Δ Gross Revenue Change']  # Keep for styling
+        ac_table['Δ Gross Revenue Change'] = ac_table['Δ Gross Revenue Change'].apply(format_money)
+        ac_table['% Change'] = ac_table['% Change'].apply(lambda x: f"{x:.0f}%")
 
     st.subheader("📊 Action Center: Top 15 Trending Packages")
     st.caption(f"(Last 3d: {last_range} vs Prev 3d: {prev_range})")
 
-    # Color positive green, negative red
-    def style_gross_rev(val):
-        if isinstance(val, str):
-            try:
-                n = int(val.replace('$','').replace(',','').replace('-',''))
-                color = 'green' if '-' not in val else 'red'
-            except:
-                color = 'black'
-        else:
-            color = 'black'
-        return f'color: {color}; font-weight: 700;'
-
-    styled = ac_table.drop(columns=['Δ Gross Revenue Change Raw']).style.applymap(
-        style_gross_rev, subset=['Δ Gross Revenue Change']
+    # Color positive green, negative red (from the numeric column)
+    styled = style_columns(
+        ac_table,
+        {'Δ Gross Revenue Change': sign_css(ac_table['Δ Gross Revenue Change Raw'])},
+        hide=['Δ Gross Revenue Change Raw'],
     )
 
-    st.dataframe(styled, use_container_width=True, hide_index=True)
+    with stage("render table", len(ac_table)):
+        st.dataframe(styled, use_container_width=True, hide_index=True)
+
+    # ----------- Range headlines (sketch merges) -----------
+    st.markdown("---")
+    with stage("day sketches view", len(df)):
+        sketches = get_view("dashboard_sketches", dataset, SketchBuilder.default(dataset))
+    # Moving the range slider reruns only this fragment
+    range_headlines(sketches)
 
     # ----------- AI Chatbot Section -----------
     st.markdown("---")
@@ -81,6 +124,7 @@ def show_dashboard():
     user_q = st.text_input("Type your question about a package, e.g.: 'Why did com.tripedot.woodoku drop?'")
     ask_button = st.button("Ask AI")
     if api_key and user_q and ask_button:
+        import openai
         trending_pkgs = merged['Package'].tolist()
         context_rows = []
         for pkg in trending_pkgs:
@@ -121,7 +165,7 @@ Prev3d Revenue: {int(prev_rev)}"""
             f"QUESTION: {user_q}\n\n"
             "Give your answer in clear bullet points."
         )
-        with st.spinner("Thinking..."):
+        with st.spinner("Thinking..."), stage("llm call"):
             try:
                 client = openai.OpenAI(api_key=api_key)
                 response = client.chat.completions.create(
@@ -0,0 +1,82 @@
+import os
+import streamlit as st
+from analytics import Dataset, TieredDataset
+from blocklist import DB_FILE, BlockList
+
+# === Shared dataset loading & versioning ===
+EXCEL_FILE = "DemoAI.xlsx"
+BUYERS_FILE = "DemoBuyers.csv"  # Date, Package, Buyer, Gross Revenue
+ALL_ADVERTISERS = "All advertisers"
+HISTORY_DIR = "history"  # cold tier: history/<source version>/, one Arrow file per day older than HOT_DAYS
+HOT_DAYS = 35
+
+
+@st.cache_resource(show_spinner=False)
+def _load_file(path, mtime):
+    return Dataset.from_file(path)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_tiered(path, mtime):
+    return TieredDataset.from_file(path, HISTORY_DIR, HOT_DAYS)
+
+
+def load_dataset(path=EXCEL_FILE):
+    """Load the workbook once per file revision and share it across sessions.
+
+    Only the last HOT_DAYS dates stay in memory; older dates go to HISTORY_DIR.
+    """
+    return _load_tiered(path, os.path.getmtime(path))
+
+
+def load_buyers(path=BUYERS_FILE):
+    """Buyer-level revenue breakdown, or None when no buyer file is present."""
+    if not os.path.exists(path):
+        return None
+    return _load_file(path, os.path.getmtime(path))
+
+
+@st.cache_resource(show_spinner=False)
+def get_blocklist(path=DB_FILE):
+    """Block list shared by every session (one SQLite connection per app process)."""
+    return BlockList(path)
+
+
+def set_dataset(dataset):
+    """Make `dataset` the session's full data and publish the selected advertiser's partition."""
+    st.session_state["full_dataset"] = dataset
+    return select_advertiser(st.session_state.get("selected_advertiser", ALL_ADVERTISERS))
+
+
+def full_dataset():
+    return st.session_state.get("full_dataset")
+
+
+def select_advertiser(name):
+    """Swap the active dataset to one advertiser's partition (or everything); no filtering per rerun."""
+    full = st.session_state["full_dataset"]
+    partitions = full.partitions()
+    if name not in partitions:
+        name = ALL_ADVERTISERS
+    dataset = full if name == ALL_ADVERTISERS else partitions[name]
+    st.session_state["selected_advertiser"] = name
+    _publish(dataset)
+    return dataset
+
+
+def _publish(dataset):
+    # `main_df` stays the plain frame for older code
+    st.session_state["dataset"] = dataset
+    st.session_state["main_df"] = dataset.df
+    st.session_state["data_version"] = dataset.version
+
+
+def current_dataset():
+    dataset = st.session_state.get("dataset")
+    df = st.session_state.get("main_df")
+    if df is None:
+        return None
+    if dataset is None or dataset.df is not df:
+        # main_df was replaced directly; re-tag it
+        dataset = set_dataset(Dataset(df))
+    return dataset
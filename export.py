@@ -0,0 +1,112 @@
+import io
+import pandas as pd
+import streamlit as st
+
+# === Chunked exports for download buttons ===
+# Writers take the numeric result frame (not the string-formatted display copy)
+# and convert it in chunks, so a large export never holds a second full-size text
+# copy of the frame. The finished file itself is built in memory: download_button
+# serves bytes, so this is not streaming. Buttons pass a callable to
+# st.download_button: the file is only built when the user clicks, not on every rerun.
+
+CHUNK_ROWS = 50_000
+XLSX_MAX_ROWS = 1_048_575  # Excel sheet limit, minus the header row
+
+
+def _arrow_chunks(df, chunk_rows):
+    import pyarrow as pa
+
+    schema = None
+    for start in range(0, max(len(df), 1), chunk_rows):
+        table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False)
+        schema = table.schema  # later chunks keep the first chunk's types
+        yield table
+
+
+def write_csv(df, chunk_rows=CHUNK_ROWS):
+    # Arrow's CSV writer is an order of magnitude faster than DataFrame.to_csv on wide numeric frames
+    import pyarrow.csv as pa_csv
+
+    buf = io.BytesIO()
+    writer = None
+    for table in _arrow_chunks(df, chunk_rows):
+        writer = writer or pa_csv.CSVWriter(buf, table.schema)
+        writer.write_table(table)
+    writer.close()
+    return buf.getvalue()
+
+
+def _cell_values(chunk):
+    # openpyxl wants plain Python scalars; NaN/NaT become empty cells
+    out = chunk.astype(object).where(chunk.notna(), None)
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(chunk[col]):
+            out[col] = [None if v is None else v.to_pydatetime() for v in out[col]]
+    return out.itertuples(index=False, name=None)
+
+
+def write_xlsx(df, chunk_rows=CHUNK_ROWS, sheet="Export"):
+    # Write-only workbook: rows are serialized as they are appended. Still far slower than
+    # CSV / Parquet per cell (openpyxl writes XML in Python), so those suit very large results.
+    from openpyxl import Workbook
+
+    if len(df) > XLSX_MAX_ROWS:
+        raise ValueError(f"{len(df):,} rows do not fit on one Excel sheet; export as CSV or Parquet instead")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet)
+    ws.append([str(col) for col in df.columns])
+    for start in range(0, len(df), chunk_rows):
+        for row in _cell_values(df.iloc[start:start + chunk_rows]):
+            ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def write_parquet(df, chunk_rows=CHUNK_ROWS):
+    import pyarrow.parquet as pq
+
+    buf = io.BytesIO()
+    writer = None
+    for table in _arrow_chunks(df, chunk_rows):
+        writer = writer or pq.ParquetWriter(buf, table.schema)
+        writer.write_table(table)
+    writer.close()
+    return buf.getvalue()
+
+
+# Label -> (writer, file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": (write_csv, "csv", "text/csv"),
+    "Excel": (write_xlsx, "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": (write_parquet, "parquet", "application/vnd.apache.parquet"),
+}
+
+
+def export_buttons(scopes, file_stem, key):
+    """Format / scope pickers and one lazy download button.
+
+    `scopes` maps a label ("Rows matching filters", "Full result", ...) to a numeric frame or a
+    zero-argument callable returning one; the chosen file is only written on click.
+    """
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        fmt = st.selectbox("Format", list(EXPORT_FORMATS), key=f"{key}_format")
+    with col2:
+        scope = st.selectbox("Rows", list(scopes), key=f"{key}_scope")
+    writer, ext, mime = EXPORT_FORMATS[fmt]
+    source = scopes[scope]
+
+    def build():
+        return writer(source() if callable(source) else source)
+
+    with col3:
+        st.download_button(
+            f"Download {fmt}",
+            data=build,
+            file_name=f"{file_stem}.{ext}",
+            mime=mime,
+            key=f"{key}_download",
+            on_click="ignore",
+        )
+
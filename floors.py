@@ -0,0 +1,81 @@
+import streamlit as st
+from analytics import FloorSimulator
+from data_store import current_dataset
+from perf import stage
+from precompute import get_view
+from tables import render_table
+
+TOP_N = 50
+
+
+def show_floors():
+    st.title("🎚️ Floor Optimizer")
+    st.caption(
+        "What-if on bid floors per package and ad format, from the observed AVG Bid Price / AVG BidFloor "
+        "over the last 7 days. Projections are model estimates: bids are treated as a spread around the "
+        "average bid, and the floor acts as the reserve price."
+    )
+
+    dataset = current_dataset()
+    if dataset is None or dataset.df.empty:
+        st.info("No data found. Please make sure the Excel file is loaded in the app.")
+        return
+
+    with stage("floor grid view", len(dataset)):
+        result = get_view("floors", dataset, FloorSimulator.default(dataset))
+    if result is None:
+        st.warning("Floor simulation needs Package, Ad format, Request NE, FillRate, Gross Revenue, AVG Bid Price and AVG BidFloor.")
+        return
+
+    # --- Account-wide what-if: scale every floor ---
+    st.subheader("What if every floor changed?")
+    multiplier = st.select_slider(
+        "Floor multiplier",
+        options=list(result.multipliers),
+        value=result.multipliers[abs(result.multipliers - 1).argmin()],
+        format_func=lambda m: f"×{m:g}",
+    )
+    with stage("what-if", len(result.table)):
+        projected = result.at(multiplier)
+        requests = result.table['Requests']
+        fill_now = (projected['Fill'] * requests).sum() / requests.sum()
+        fill_new = (projected['Projected Fill'] * requests).sum() / requests.sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Current revenue", f"${projected['Revenue'].sum():,.0f}")
+    col2.metric("Projected revenue", f"${projected['Projected Revenue'].sum():,.0f}", f"{projected['Δ Revenue'].sum():+,.0f}")
+    col3.metric("Projected fill rate", f"{fill_new:.2%}", f"{(fill_new - fill_now) * 100:+.2f} pp")
+
+    st.divider()
+
+    # --- Per-group best floors ---
+    st.subheader(f"Top {TOP_N} floor opportunities")
+    best = result.opportunities(TOP_N)
+    st.caption(
+        f"Potential uplift across all {len(result.table):,} package/format groups: "
+        f"**${result.table['Uplift'].sum():,.0f}** at each group's best floor."
+    )
+    with stage("render table", len(best)):
+        render_table(
+            best[['Package', 'Ad format', 'Revenue', 'Fill', 'Bid', 'Floor', 'Best Floor', 'Best Multiplier',
+                  'Fill at Best', 'Revenue at Best', 'Uplift']],
+            {
+                'Revenue': 'money', 'Fill': 'share', 'Bid': 'float', 'Floor': 'float', 'Best Floor': 'float',
+                'Best Multiplier': 'float', 'Fill at Best': 'share', 'Revenue at Best': 'money', 'Uplift': 'signed_money',
+            },
+        )
+    if best.empty:
+        return
+
+    # --- Response curve for one group ---
+    labels = (best['Package'].astype(str) + " · " + best['Ad format'].astype(str)).tolist()
+    choice = st.selectbox("Response curve for", range(len(labels)), format_func=lambda i: labels[i])
+    row = best.iloc[choice]
+    curve = result.curve(row['Package'], row['Ad format']).set_index('Floor')
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Revenue vs floor**")
+        st.line_chart(curve['Revenue'])
+    with col2:
+        st.markdown("**Fill rate vs floor**")
+        st.line_chart(curve['Fill'])
+    st.caption(f"Current floor {row['Floor']:.3f}, best floor {row['Best Floor']:.3f} (×{row['Best Multiplier']:g}).")
@@ -1,4 +1,12 @@
 import streamlit as st
+from analytics import AdvertiserRollup
+from data_store import ALL_ADVERTISERS, full_dataset, select_advertiser
+from perf import stage
+from precompute import get_view, warm
+from tables import render_table
+
+KNOWN_ADVERTISERS = ["Magnite", "Pubmatic", "OpenX", "TripleLift"]
+NO_DATA = " (no data)"
 
 def show_home():
     # --- STYLES: White BG, Modern SaaS ---
@@ -84,38 +92,53 @@ def show_home():
         <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@600;900&display=swap" rel="stylesheet">
     """, unsafe_allow_html=True)
 
-    # --- Demo Banner and Headline ---
-    st.markdown('<div class="demo-banner">🛈 Demo Mode: Only Magnite is enabled</div>', unsafe_allow_html=True)
+    full = full_dataset()
+    partitions = full.partitions() if full is not None else {}
+    loaded = [str(a) for a in partitions]
+
+    # --- Banner and Headline ---
+    st.markdown(f'<div class="demo-banner">🛈 {len(loaded)} advertiser(s) loaded</div>', unsafe_allow_html=True)
     st.markdown('<div class="headline-glow">AI Revenue Optimizer</div>', unsafe_allow_html=True)
 
-    # --- Demo Advertiser Dropdown ---
+    # --- Advertiser Dropdown ---
     st.markdown("""
         <div class="dropdown-row">
             <div style='font-size:1.15em;font-weight:600;text-align:center;'>
-                Choose Advertiser for Demo
-                <span class="dropdown-helper" title="This is a demo version. Only Magnite is enabled. Other advertisers are disabled for demo mode.">❔</span>
+                Choose Advertiser
+                <span class="dropdown-helper" title="Every tab works on the selected advertiser's data. 'All advertisers' combines them.">❔</span>
             </div>
         </div>
     """, unsafe_allow_html=True)
 
-    adv_choices = [
-        "Magnite (Demo Enabled)",
-        "Pubmatic (Demo Disabled)",
-        "OpenX (Demo Disabled)",
-        "TripleLift (Demo Disabled)"
-    ]
+    adv_choices = [ALL_ADVERTISERS] + loaded + [a + NO_DATA for a in KNOWN_ADVERTISERS if a not in loaded]
+    current = st.session_state.get("selected_advertiser", ALL_ADVERTISERS)
     selected_adv = st.selectbox(
-        "",
+        "Advertiser",
         adv_choices,
-        index=0,
-        help="Only Magnite is available for demo. Others will be added in a future version.",
-        key="advertiser_demo"
+        index=adv_choices.index(current) if current in adv_choices else 0,
+        help="Switching advertiser swaps in that advertiser's precomputed partition.",
+        key="advertiser_choice",
+        label_visibility="collapsed",
     )
-    st.session_state["selected_advertiser"] = selected_adv.split(" ")[0]
 
-    if selected_adv != adv_choices[0]:
-        st.info("This demo is available only for Magnite. Please select 'Magnite (Demo Enabled)' to use the tool.")
+    if selected_adv.endswith(NO_DATA):
+        st.info(f"No rows for {selected_adv[:-len(NO_DATA)]} in the loaded data. Pick another advertiser.")
         st.stop()
+    if full is not None and selected_adv != current:
+        with stage("switch advertiser"):
+            warm(select_advertiser(selected_adv))
+
+    # --- All advertisers: per-advertiser rollup (partitions summarized in parallel) ---
+    if full is not None and selected_adv == ALL_ADVERTISERS and len(loaded) > 1:
+        with stage("advertiser rollup view", len(full)):
+            rollup = get_view("home", full, AdvertiserRollup())
+        render_table(
+            rollup.table,
+            {
+                "Gross Revenue": "money", "Revenue cost": "money", "Margin (%)": "pct", "Request NE": "int",
+                "RPM": "float", "Avg IVT (%)": "pct", "Rows": "int", "Packages": "int",
+            },
+        )
 
     # --- Main Cards ---
     cards = [
@@ -1,14 +1,14 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from analytics import Dataset, IvtRecommender, prepare_df
+from analytics.ivt import BLOCK_RECOMMENDATION, GROUP_COLS_POSSIBLE, guess_column, ivt_candidates
+from data_store import current_dataset, get_blocklist, set_dataset
+from export import export_buttons
+from perf import stage
+from precompute import get_view, warm
 
-def guess_column(df, options, default=None):
-    """Find a column in df that matches any of the substrings in options."""
-    for option in options:
-        for col in df.columns:
-            if option.lower() in col.lower():
-                return col
-    return default
+DEFAULT_DAYS = 3
 
 def show_ivt_optimization():
     st.title("🏴 IVT Optimization Recommendations")
@@ -23,120 +23,84 @@ def show_ivt_optimization():
                 df = pd.read_csv(uploaded_file)
             else:
                 df = pd.read_excel(uploaded_file)
-            st.session_state["main_df"] = df
+            warm(set_dataset(Dataset(prepare_df(df))))
             st.success("File uploaded! Data is now available for analysis.")
         else:
             st.stop()
+    dataset = current_dataset()
+    df = dataset.df
 
     # --- 2. Dynamically guess/ask for columns ---
     date_col = guess_column(df, ["date"])
     request_col = guess_column(df, ["request", "impression", "req"])
     revenue_col = guess_column(df, ["gross revenue", "revenue", "amount", "total"])
-    ivt_candidates = [col for col in df.columns if "ivt" in col.lower() or "invalid" in col.lower()]
+    candidates = ivt_candidates(df)
 
     with st.expander("Column Selection (adjust if needed):"):
         date_col = st.selectbox("Date column:", df.columns, index=df.columns.get_loc(date_col) if date_col else 0)
         request_col = st.selectbox("Requests column:", df.columns, index=df.columns.get_loc(request_col) if request_col else 0)
         revenue_col = st.selectbox("Revenue column:", df.columns, index=df.columns.get_loc(revenue_col) if revenue_col else 0)
-        if len(ivt_candidates) > 1:
-            ivt_col = st.selectbox("IVT column:", ivt_candidates)
-        elif len(ivt_candidates) == 1:
-            ivt_col = ivt_candidates[0]
+        if len(candidates) > 1:
+            ivt_col = st.selectbox("IVT column:", candidates)
+        elif len(candidates) == 1:
+            ivt_col = candidates[0]
         else:
             ivt_col = st.selectbox("IVT column:", df.columns)
 
     # Grouping columns: auto, but allow change
-    group_cols_possible = ["Product", "Package", "Campaign ID", "Campaign", "Ad Group", "Site"]
-    group_cols = [col for col in group_cols_possible if col in df.columns]
+    group_cols = [col for col in GROUP_COLS_POSSIBLE if col in df.columns]
     if not group_cols:
         group_cols = st.multiselect("Columns to group by (at least one required):", df.columns, default=[df.columns[0]])
     else:
         st.markdown(f"**Grouping by:** {', '.join(group_cols)}")
 
-    # --- 3. Filter by date ---
+    # --- 3.-5. Filter by date, aggregate & flatten (default view precomputed in background) ---
+    days = st.number_input("Show data for last... days", min_value=1, max_value=60, value=DEFAULT_DAYS)
+    recommender = IvtRecommender(date_col, request_col, revenue_col, ivt_col, tuple(group_cols), days)
     try:
-        df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-    except Exception:
-        st.error(f"Date conversion failed for column {date_col}.")
-        st.stop()
-
-    days = st.number_input("Show data for last... days", min_value=1, max_value=60, value=3)
-    end_date = df[date_col].max()
-    start_date = end_date - pd.Timedelta(days=days-1)
-    filtered_df = df[(df[date_col] >= start_date) & (df[date_col] <= end_date)]
-
-    if filtered_df.empty:
-        st.info("No data in the selected date range.")
-        st.stop()
-
-    # --- 4. Aggregate ---
-    agg_dict = {
-        request_col: "sum",
-        revenue_col: "sum",
-        ivt_col: ["mean", "max"]
-    }
-    group_cols = [col for col in group_cols if col in filtered_df.columns]
-
-    try:
-        agg_df = filtered_df.groupby(group_cols, dropna=False).agg(agg_dict)
+        with stage("ivt aggregate view", len(df)):
+            result = get_view("ivt_optimization", dataset, recommender)
     except Exception as e:
         st.error(f"Aggregation error: {e}")
         st.write("Group columns:", group_cols)
-        st.write("Aggregation dict:", agg_dict)
         st.stop()
-
-    # --- 5. Flatten columns and dynamically get new column names ---
-    def flatten_col(col):
-        if isinstance(col, tuple):
-            if col[1] == "":
-                return col[0]
-            elif col[1] == "mean":
-                return "Avg IVT"
-            elif col[1] == "max":
-                return "Max IVT"
-            else:
-                return f"{col[0]} {col[1]}"
-        return col
-    agg_df.columns = [flatten_col(c) for c in agg_df.columns]
-    agg_df = agg_df.reset_index()
-
-    # Dynamically find the columns after aggregation
-    req_col_agg = next((c for c in agg_df.columns if "request" in c.lower() or "impression" in c.lower() or "req" in c.lower()), None)
-    rev_col_agg = next((c for c in agg_df.columns if "revenue" in c.lower() or "amount" in c.lower() or "total" in c.lower()), None)
-    avg_ivt_col = next((c for c in agg_df.columns if "avg" in c.lower() and "ivt" in c.lower()), None)
-    max_ivt_col = next((c for c in agg_df.columns if "max" in c.lower() and "ivt" in c.lower()), None)
-
-    if not req_col_agg or not rev_col_agg or not max_ivt_col:
-        st.error("Could not auto-detect your Requests, Revenue, or Max IVT column after aggregation. Please check your column selection and try again.")
+    if result is None:
+        st.info("No data in the selected date range.")
         st.stop()
+    start_date, end_date = result.start_date, result.end_date
 
-    # --- 6. Format and calculate logic columns ---
-    if avg_ivt_col:
-        agg_df[avg_ivt_col + " Numeric"] = agg_df[avg_ivt_col]
-        agg_df[avg_ivt_col] = agg_df[avg_ivt_col].round(0).astype('Int64').astype(str) + "%"
-    agg_df[max_ivt_col + " Numeric"] = agg_df[max_ivt_col]
-    agg_df[max_ivt_col] = agg_df[max_ivt_col].round(0).astype('Int64').astype(str) + "%"
-
-    # Recommendation logic
+    # --- 6. Recommendation logic on the numeric aggregate ---
     ivt_threshold = st.number_input("IVT Threshold (%)", min_value=0, max_value=100, value=10)
-    agg_df["Recommendation"] = np.where(
-        agg_df[max_ivt_col + " Numeric"] >= ivt_threshold,
-        "🚩 Block product at campaign level",
-        "No action"
-    )
-
-    # --- 7. Always keep numeric columns for calculations ---
-    agg_df[rev_col_agg + " Numeric"] = pd.to_numeric(agg_df[rev_col_agg], errors="coerce").fillna(0)
-    agg_df[rev_col_agg] = agg_df[rev_col_agg + " Numeric"].apply(lambda x: f"${int(round(x, 0)):,}")
-    agg_df[req_col_agg + " Numeric"] = pd.to_numeric(agg_df[req_col_agg], errors="coerce").fillna(0)
+    recommendations = result.recommendations(ivt_threshold)
+    agg_df = recommendations.copy()
+    req_col_agg, rev_col_agg = result.request_col, result.revenue_col
+    avg_ivt_col, max_ivt_col = "Avg IVT", "Max IVT"
+
+    # --- 7. Format display columns (numeric columns kept alongside) ---
+    with stage("format columns", len(agg_df)):
+        for col in [avg_ivt_col, max_ivt_col, rev_col_agg, req_col_agg]:
+            agg_df[col + " Numeric"] = agg_df[col]
+        agg_df[avg_ivt_col] = agg_df[avg_ivt_col].round(0).astype('Int64').astype(str) + "%"
+        agg_df[max_ivt_col] = agg_df[max_ivt_col].round(0).astype('Int64').astype(str) + "%"
+        agg_df[rev_col_agg] = agg_df[rev_col_agg + " Numeric"].apply(lambda x: f"${int(round(x, 0)):,}")
+
+    # Annotate groups already on the block list (needs Product + Campaign ID to identify them)
+    blocklist = get_blocklist()
+    can_block = {"Product", "Campaign ID"}.issubset(group_cols)
+    hidden = pd.Series(False, index=agg_df.index)
+    if can_block:
+        with stage("block list lookup", len(agg_df)):
+            blocked = blocklist.is_blocked(agg_df)
+        agg_df['Blocked'] = np.where(blocked, "⛔ Blocked", "")
+        if blocked.any() and st.checkbox(f"Hide {int(blocked.sum())} already blocked", value=False):
+            hidden = blocked
 
-    # Add "Check to Block" column (for demo, default False)
     agg_df['Check to Block'] = False
 
     # --- 8. CALCULATE COUNTERS before dropping cols! ---
     total_revenue = agg_df[rev_col_agg + " Numeric"].sum()
     total_requests = agg_df[req_col_agg + " Numeric"].sum()
-    flagged_count = (agg_df['Recommendation'] == "🚩 Block product at campaign level").sum()
+    flagged_count = (agg_df['Recommendation'] == BLOCK_RECOMMENDATION).sum()
 
     st.markdown(
         f"**Data aggregated by {', '.join(group_cols)}**  \n"
@@ -152,32 +116,43 @@ def show_ivt_optimization():
     display_cols = group_cols + [req_col_agg, rev_col_agg]
     if avg_ivt_col:
         display_cols.append(avg_ivt_col)
-    display_cols += [max_ivt_col, "Recommendation", "Check to Block"]
+    display_cols += [max_ivt_col, "Recommendation", "Blocked", "Check to Block"]
     display_cols = [col for col in display_cols if col in agg_df.columns]
 
     st.markdown("#### Recommendations Table")
-    edited_df = st.data_editor(
-        agg_df[display_cols],
-        column_config={
-            "Check to Block": st.column_config.CheckboxColumn(
-                "Check to Block", help="Select products to block (demo only)"
-            )
+    with stage("render data editor", len(agg_df)):
+        edited_df = st.data_editor(
+            agg_df.loc[~hidden, display_cols],
+            column_config={
+                "Check to Block": st.column_config.CheckboxColumn(
+                    "Check to Block", help="Select products to add to the block list"
+                )
+            },
+            hide_index=True,
+            use_container_width=True,
+            key="ivt_editor"
+        )
+
+    # Numeric recommendations, written only when the download is clicked
+    export_cols = [col for col in display_cols if col in recommendations.columns]
+    export_buttons(
+        {
+            "Shown rows": lambda: recommendations.loc[~hidden, export_cols],
+            "Full result": lambda: recommendations[export_cols],
         },
-        hide_index=True,
-        use_container_width=True,
-        key="ivt_editor"
+        "ivt_recommendations",
+        key="ivt_export",
     )
 
-    st.download_button(
-        "Download Recommendations as CSV",
-        edited_df[display_cols].to_csv(index=False),
-        file_name="ivt_recommendations.csv",
-        mime="text/csv"
-    )
-
-    if st.button("Block checked products (demo)"):
+    if st.button("Block checked products", disabled=not can_block):
         checked = edited_df[edited_df['Check to Block']]
-        st.success(f"Demo: {len(checked)} product-campaign(s) would be blocked.")
+        if checked.empty:
+            st.warning("No products checked.")
+        else:
+            added = blocklist.add(checked["Product"], checked["Campaign ID"], f"Max IVT ≥ {ivt_threshold}%", "IVT Optimization")
+            st.success(f"Blocked {added} product-campaign(s); {len(checked) - added} were already on the block list.")
+    if not can_block:
+        st.caption("Group by Product and Campaign ID to block from this table.")
 
     from datetime import datetime
     st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
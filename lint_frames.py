@@ -0,0 +1,155 @@
+"""Static check: no in-place writes to the shared dataset frame.
+
+Usage: python lint_frames.py [paths ...]   (default: every .py file in the repo)
+
+Within each function, a name bound to `<x>.df`, `st.session_state["main_df"]` or
+`st.session_state.get("main_df")` (or an alias of one) is shared until rebound.
+Writing through it is reported as path:line: df[...] = ..., df.loc[...] = ...,
+attribute assignment, del df[...], mutating methods and inplace=True calls.
+FrozenFrame raises on the same writes at run time; this finds them before a
+session hits them. Exits 1 when anything is found.
+"""
+import ast
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+SKIP_DIRS = {"__pycache__", ".venv", "venv", "history"}
+SHARED_KEYS = {"main_df"}
+INDEXERS = {"loc", "iloc", "at", "iat"}
+MUTATING_METHODS = {"insert", "pop", "update", "isetitem"}
+
+
+def _is_shared_source(node):
+    # dataset.df / current_dataset().df
+    if isinstance(node, ast.Attribute) and node.attr == "df":
+        return True
+    # st.session_state["main_df"] / st.session_state.get("main_df")
+    if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant):
+        return node.slice.value in SHARED_KEYS and _is_session_state(node.value)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "get":
+        key = node.args[0] if node.args else None
+        return isinstance(key, ast.Constant) and key.value in SHARED_KEYS and _is_session_state(node.func.value)
+    return False
+
+
+def _is_session_state(node):
+    return isinstance(node, ast.Attribute) and node.attr == "session_state"
+
+
+class FunctionChecker(ast.NodeVisitor):
+    """Walks one function body in source order, tracking which names hold the shared frame."""
+
+    def __init__(self, path, problems):
+        self.path = path
+        self.problems = problems
+        self.shared = set()
+
+    def report(self, node, what):
+        self.problems.append(f"{self.path}:{node.lineno}: {what} writes to the shared frame; derive a new frame instead")
+
+    def _shared(self, node):
+        return (isinstance(node, ast.Name) and node.id in self.shared) or _is_shared_source(node)
+
+    def _check_target(self, target):
+        if isinstance(target, ast.Subscript):
+            frame = target.value
+            if isinstance(frame, ast.Attribute) and frame.attr in INDEXERS:
+                frame = frame.value
+            if self._shared(frame):
+                self.report(target, f"{ast.unparse(target)} = ...")
+        elif isinstance(target, ast.Attribute) and self._shared(target.value):
+            self.report(target, f"{ast.unparse(target)} = ...")
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self._check_target(element)
+
+    def _bind(self, target, value):
+        if not isinstance(target, ast.Name):
+            return
+        if self._shared(value):
+            self.shared.add(target.id)
+        else:
+            self.shared.discard(target.id)
+
+    def visit_Assign(self, node):
+        self.visit(node.value)
+        for target in node.targets:
+            self._check_target(target)
+            self._bind(target, node.value)
+
+    def visit_AnnAssign(self, node):
+        if node.value is not None:
+            self.visit(node.value)
+            self._check_target(node.target)
+            self._bind(node.target, node.value)
+
+    def visit_AugAssign(self, node):
+        self.visit(node.value)
+        if self._shared(node.target):
+            self.report(node, f"{ast.unparse(node)}")
+        else:
+            self._check_target(node.target)
+
+    def visit_Delete(self, node):
+        for target in node.targets:
+            if isinstance(target, ast.Subscript) and self._shared(target.value):
+                self.report(target, f"del {ast.unparse(target)}")
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and self._shared(func.value):
+            inplace = any(
+                kw.arg == "inplace" and isinstance(kw.value, ast.Constant) and kw.value.value is True
+                for kw in node.keywords
+            )
+            if inplace:
+                self.report(node, f"{ast.unparse(func)}(..., inplace=True)")
+            elif func.attr in MUTATING_METHODS:
+                self.report(node, f"{ast.unparse(func)}(...)")
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node):
+        # Nested functions get their own scope
+        check_function(node, self.path, self.problems)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+def check_function(node, path, problems):
+    checker = FunctionChecker(path, problems)
+    for statement in node.body:
+        checker.visit(statement)
+
+
+def check_file(path):
+    problems = []
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    # Module level counts as one more function body
+    check_function(tree, path, problems)
+    return problems
+
+
+def iter_files(paths):
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            for file in sorted(path.rglob("*.py")):
+                if not SKIP_DIRS.intersection(file.relative_to(path).parts):
+                    yield file
+        else:
+            yield path
+
+
+def main(argv=None):
+    paths = (argv if argv is not None else sys.argv[1:]) or [ROOT]
+    problems = []
+    for file in iter_files(paths):
+        problems += check_file(file)
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from analytics import profiling
+from analytics.profiling import Stage
+
+# === Hot-path timing instrumentation (opt-in from the sidebar perf panel) ===
+MAX_RECORDS = 5000
+
+# tracemalloc is process-wide: it runs while any session has the panel on, and
+# every open stage keeps its own peak (folded in before anyone resets the global one)
+_lock = threading.Lock()
+_tracing_sessions = set()
+_open_stages = []
+
+
+def enabled():
+    # Background (precompute) threads have no script context and are never recorded
+    return get_script_run_ctx(suppress_warning=True) is not None and st.session_state.get("perf_enabled", False)
+
+
+def begin_run():
+    st.session_state["perf_run"] = st.session_state.get("perf_run", 0) + 1
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return
+    with _lock:
+        if enabled():
+            _tracing_sessions.add(ctx.session_id)
+        else:
+            _tracing_sessions.discard(ctx.session_id)
+        if Runtime.exists():
+            # Sessions closed with the panel still on
+            runtime = Runtime.instance()
+            _tracing_sessions.difference_update([sid for sid in _tracing_sessions if not runtime.is_active_session(sid)])
+        if _tracing_sessions and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not _tracing_sessions and tracemalloc.is_tracing() and not _open_stages:
+            tracemalloc.stop()
+
+
+def _open_stage():
+    with _lock:
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in _open_stages:
+            frame["peak"] = max(frame["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": current, "peak": current}
+        _open_stages.append(frame)
+        return frame
+
+
+def _close_stage(frame):
+    with _lock:
+        _open_stages.remove(frame)
+        if not tracemalloc.is_tracing():
+            return None
+        return max(frame["peak"], tracemalloc.get_traced_memory()[1]) - frame["start"]
+
+
+@contextmanager
+def stage(name, rows=None):
+    """Record wall time, rows processed and peak memory of the enclosed block."""
+    record = Stage(name, rows)
+    if not enabled():
+        yield record
+        return
+    frame = _open_stage()
+    t0 = time.perf_counter()
+    try:
+        yield record
+    finally:
+        wall_ms = (time.perf_counter() - t0) * 1000
+        peak = _close_stage(frame) if frame is not None else None
+        peak_kb = peak / 1024 if peak is not None else None
+        records = st.session_state.setdefault("perf_records", [])
+        records.append({
+            "ts": time.time(),
+            "run": st.session_state.get("perf_run", 0),
+            "tab": st.session_state.get("tab"),
+            "stage": record.name,
+            "wall_ms": round(wall_ms, 3),
+            "rows": record.rows,
+            "peak_kb": round(peak_kb, 1) if peak_kb is not None else None,
+        })
+        del records[:-MAX_RECORDS]
+
+
+# Engines in the analytics package report their inner stages through this recorder
+profiling.set_recorder(stage)
+
+
+def export_jsonl(records):
+    return "\n".join(json.dumps(r, default=str) for r in records) + "\n"
+
+
+def render_perf_panel():
+    st.divider()
+    st.toggle("⏱ Performance panel", key="perf_enabled")
+    if not st.session_state.get("perf_enabled"):
+        return
+    records = st.session_state.get("perf_records", [])
+    run = st.session_state.get("perf_run", 0)
+    last_run = [r for r in records if r["run"] == run]
+    if last_run:
+        st.caption(f"Last rerun: {st.session_state.get('tab')} (nested stages overlap)")
+        st.dataframe(
+            pd.DataFrame(last_run)[["stage", "wall_ms", "rows", "peak_kb"]],
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.caption("No stages recorded yet — rerun a tab.")
+    st.download_button(
+        "Export timings (JSON lines)",
+        export_jsonl(records),
+        file_name="perf_timings.jsonl",
+        mime="application/jsonl",
+        disabled=not records,
+    )
@@ -0,0 +1,190 @@
+import importlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import streamlit as st
+
+# === Background precompute of each tab's default view ===
+# Each entry: (view name, analytics engine class). `Engine.default(dataset)` gives the
+# tab's starting parameters; engines are hashable so they form part of the cache key.
+DEFAULT_VIEWS = [
+    ("ai_insights", "InsightsEngine"),
+    ("ai_insights_drivers", "RevenueDecomposition"),
+    ("dashboard", "WindowComparison"),
+    ("dashboard_sketches", "SketchBuilder"),
+    ("ivt_optimization", "IvtRecommender"),
+    ("rpm_optimization", "RpmProfitability"),
+    ("pubimps", "DiscrepancyAnalyzer"),
+    ("pubimps_funnel", "SupplyFunnel"),
+    ("trends", "DailySeriesBuilder"),
+    ("trends_forecast", "RevenueForecaster"),
+    ("floors", "FloorSimulator"),
+]
+MAX_WORKERS = 4
+MAX_VERSIONS = 3  # root data versions kept (default file, uploads, partitions share their root's slot)
+MAX_EXTRA_VIEWS = 32  # non-default views (user-tuned thresholds, days, ...) kept across all versions
+
+
+def _root(version):
+    return version.split("/")[0]
+
+
+class PrecomputeCache:
+    """Futures for computed views, keyed by (data version, view, engine).
+
+    The MAX_VERSIONS most recently used root versions are kept; evicting one also
+    forgets its claim, so it is warmed again if it comes back. Within them, the
+    warmed default views stay, while any other parameters share an LRU of
+    MAX_EXTRA_VIEWS keys. Failed futures are dropped as soon as they finish, so
+    the next request retries.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.warm_keys = set()
+        self.claimed = set()
+        self.versions = OrderedDict()
+        self.extra = OrderedDict()  # keys outside warm_keys, least recently used first
+
+    def _touch(self, version):
+        # Caller holds the lock
+        root = _root(version)
+        self.versions[root] = None
+        self.versions.move_to_end(root)
+        while len(self.versions) > MAX_VERSIONS:
+            evicted, _ = self.versions.popitem(last=False)
+            self.futures = {k: f for k, f in self.futures.items() if _root(k[0]) != evicted}
+            self.warm_keys = {k for k in self.warm_keys if _root(k[0]) != evicted}
+            self.claimed = {v for v in self.claimed if _root(v) != evicted}
+            self.extra = OrderedDict((k, None) for k in self.extra if _root(k[0]) != evicted)
+
+    def _touch_key(self, key):
+        # Caller holds the lock
+        if key in self.warm_keys:
+            return
+        self.extra[key] = None
+        self.extra.move_to_end(key)
+        while len(self.extra) > MAX_EXTRA_VIEWS:
+            evicted, _ = self.extra.popitem(last=False)
+            self.futures.pop(evicted, None)
+
+    def get(self, key):
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                self._touch(key[0])
+                self._touch_key(key)
+            return future
+
+    def put(self, key, future):
+        with self.lock:
+            self._touch(key[0])
+            kept = self.futures.setdefault(key, future)
+            self._touch_key(key)
+        if kept is future:
+            # Outside the lock: an already finished future runs the callback right away
+            future.add_done_callback(lambda f: self._drop_failed(key, f))
+        return kept
+
+    def _drop_failed(self, key, future):
+        if future.cancelled() or future.exception() is not None:
+            with self.lock:
+                if self.futures.get(key) is future:
+                    del self.futures[key]
+                    self.extra.pop(key, None)
+
+    def claim(self, version):
+        # True only for the first caller of a data version, so it is scheduled once
+        with self.lock:
+            self._touch(version)
+            if version in self.claimed:
+                return False
+            self.claimed.add(version)
+            return True
+
+    def mark_warm(self, key):
+        with self.lock:
+            self.warm_keys.add(key)
+            self.extra.pop(key, None)
+
+    def status(self, version):
+        with self.lock:
+            if version not in self.claimed:
+                return 0, 0
+            # A warm key without a future failed; the tab computes (and reports) it itself
+            done = sum(k not in self.futures or self.futures[k].done() for k in self.warm_keys if k[0] == version)
+        return done, len(DEFAULT_VIEWS)
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_cache():
+    return PrecomputeCache()
+
+
+@st.cache_resource(show_spinner=False)
+def _executor():
+    return ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="precompute")
+
+
+def _schedule(dataset):
+    # Runs on a worker so the analytics engines are imported off the rerun's critical path
+    analytics = importlib.import_module("analytics")
+    cache = _shared_cache()
+    executor = _executor()
+    for name, engine_name in DEFAULT_VIEWS:
+        try:
+            engine = getattr(analytics, engine_name).default(dataset)
+        except Exception:
+            # Leave the view to be computed (and its error shown) by the tab itself
+            cache.mark_warm((dataset.version, name, None))
+            continue
+        key = (dataset.version, name, engine)
+        if cache.get(key) is None:
+            cache.put(key, executor.submit(engine.run, dataset))
+        cache.mark_warm(key)
+
+
+def warm(dataset):
+    """Schedule every tab's default view for a newly loaded data version (idempotent)."""
+    if dataset is None:
+        return
+    cache = _shared_cache()
+    if not cache.claim(dataset.version):
+        return
+    _executor().submit(_schedule, dataset)
+
+
+def get_view(name, dataset, engine):
+    """Return `engine.run(dataset)`, waiting on an in-flight warm job or computing inline."""
+    key = (dataset.version, name, engine)
+    cache = _shared_cache()
+    future = cache.get(key)
+    if future is None:
+        # Errors propagate uncached, so the next rerun tries again
+        future = Future()
+        future.set_result(engine.run(dataset))
+        future = cache.put(key, future)
+    return future.result()
+
+
+def session_view(name, key, compute):
+    """Per-session memo of a tab's display frame; `compute()` reruns only when `key` (its inputs) changes."""
+    views = st.session_state.setdefault("session_views", {})
+    cached = views.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    value = compute()
+    views[name] = (key, value)
+    return value
+
+
+def render_status():
+    version = st.session_state.get("data_version")
+    if version is None:
+        return
+    done, total = _shared_cache().status(version)
+    if total and done < total:
+        st.caption(f"⏳ Warming tabs in background ({done}/{total})…")
+    elif total:
+        st.caption("✅ All tabs precomputed")
@@ -1,34 +1,116 @@
 import streamlit as st
 import pandas as pd
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+import numpy as np
+from analytics import DiscrepancyAnalyzer, SupplyFunnel
+from analytics.funnel import LOSSES
+from data_store import current_dataset, get_blocklist
+from perf import stage
+from precompute import get_view, session_view
+from tables import block_list_panel, render_table, selected_frame
+
+TABLE_COLS = ["Product", "Campaign ID", "Publisher Impressions", "Advertiser Impressions", "Gross Revenue", "Revenue cost", "Margin (%)", "Impression Gap"]
+
+def format_margin(df):
+    """Display copy of a margin table with the Margin fraction rendered as a percentage."""
+    return df.assign(**{"Margin (%)": df["Margin"].map("{:.1%}".format)})[TABLE_COLS]
+
+def format_negative(df_neg, blocklist):
+    neg_display = format_margin(df_neg)
+    neg_display.insert(0, "Blocked", np.where(blocklist.is_blocked(neg_display), "⛔", ""))
+    return neg_display
+
+@st.fragment
+def negative_margin_panel(df_neg, blocklist, version):
+    from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+
+    # Formatted here, not by the caller, so a block from this fragment shows up on its rerun
+    with stage("format negative table", len(df_neg)):
+        neg_display = session_view(
+            "pubimps_negative",
+            (version, blocklist.version()),
+            lambda: format_negative(df_neg, blocklist),
+        )
+
+    gb = GridOptionsBuilder.from_dataframe(neg_display)
+    gb.configure_selection('multiple', use_checkbox=True)
+    grid_options = gb.build()
+
+    with stage("aggrid serialize & render", len(neg_display)):
+        grid_response = AgGrid(
+            neg_display,
+            gridOptions=grid_options,
+            update_mode=GridUpdateMode.SELECTION_CHANGED,
+            fit_columns_on_grid_load=True,
+            height=350,
+            theme="streamlit",
+        )
+
+    selected = selected_frame(grid_response)
+    if not selected.empty:
+        selected = selected[selected["Product"].notna() & (selected["Product"].astype(str) != "")]
+
+    if st.button("Block Selected", use_container_width=True):
+        if not selected.empty:
+            added = blocklist.add(selected["Product"], selected["Campaign ID"], "Negative margin", "Pubimps/advimps discrepancy")
+            st.session_state["pubimps_block_notice"] = f"✅ Blocked {added} product(s); {len(selected) - added} were already on the block list. Product IDs: {', '.join(selected['Product'].astype(str))}"
+            st.rerun(scope="fragment")  # redraw the grid with the new Blocked markers
+        else:
+            st.info("Please select at least one product above to block.")
+    notice = st.session_state.pop("pubimps_block_notice", None)
+    if notice:
+        st.success(notice)
+
+def show_funnel(funnel):
+    st.subheader("Supply Funnel - Where Impressions Leak")
+    st.caption(
+        "Request NE → Requests AE (fill) → Advertiser Impressions (display) → Publisher Impressions (discrepancy). "
+        "Each product's loss at a stage is its shortfall against the catalogue-wide conversion, in publisher impressions."
+    )
+    summary = funnel.summary()
+    cols = st.columns(len(summary))
+    for col, row in zip(cols, summary.itertuples()):
+        delta = None if np.isnan(row.Conversion) else f"{row.Conversion:.2%} of previous"
+        col.metric(row.Stage, f"{row.Count:,.0f}", delta, delta_color="off")
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        render_table(funnel.by_leak_stage(), {'Groups': 'int', 'Impressions Lost': 'int'})
+    with col2:
+        leak_stage = st.selectbox("Worst leakers at stage", ["All"] + LOSSES)
+        with stage("worst leakers", len(funnel.table)):
+            worst = funnel.worst(50, None if leak_stage == "All" else leak_stage)
+        render_table(
+            worst[list(funnel.keys) + ['Leak Stage', 'Leak Impressions', 'Fill Conversion', 'Display Conversion',
+                                       'Discrepancy Conversion', 'Survival']],
+            {'Leak Impressions': 'int', 'Fill Conversion': 'share', 'Display Conversion': 'share',
+             'Discrepancy Conversion': 'share', 'Survival': 'share'},
+            height=300,
+        )
 
 def show_pubimps():
     st.set_page_config(layout="wide")
     st.markdown("<h2 style='display: flex; align-items: center;'>🔍 Pubimps/Advimps Discrepancy</h2>", unsafe_allow_html=True)
     st.caption("Analyze publisher and advertiser impression gaps and quickly spot products that are losing money.")
 
-    df = st.session_state.get("main_df")
-    if df is None or df.empty:
+    dataset = current_dataset()
+    if dataset is None or dataset.df.empty:
         st.warning("No data loaded. Please check your Excel file.")
         return
 
     # --- Calculated Columns ---
-    df = df.copy()
-    df["Impression Gap"] = df["Publisher Impressions"] - df["Advertiser Impressions"]
-    df["Margin"] = (df["Gross Revenue"] - df["Revenue cost"]) / df["Gross Revenue"]
-    df["Margin_pct"] = df["Margin"].apply(lambda x: f"{x:.1%}")
-    df["Margin_style"] = df["Margin"].apply(lambda x: "color:red;font-weight:bold" if x < 0 else "color:green;font-weight:bold")
+    with stage("margin leaks view", len(dataset)):
+        result = get_view("pubimps", dataset, DiscrepancyAnalyzer())
+    df, df_neg = result.table, result.negative
 
     # --- AI Insights Panel ---
-    top_loss = df.loc[df["Margin"] < 0].sort_values("Gross Revenue", ascending=False).head(1)
-    total_loss = df.loc[df["Margin"] < 0, "Gross Revenue"].sum() - df.loc[df["Margin"] < 0, "Revenue cost"].sum()
-    loss_products = df.loc[df["Margin"] < 0, "Product"].tolist()
+    top_loss = result.top_loss
+    total_loss = result.total_loss
 
     with st.expander("🤖 AI Highlights & Actions", expanded=True):
         st.markdown("**Quick Insights:**")
         if len(top_loss):
             row = top_loss.iloc[0]
-            st.write(f"- 🚩 **Highest Loss Product:** `{int(row['Product'])}` is losing **${int(row['Revenue cost'] - row['Gross Revenue']):,}** (margin: {row['Margin_pct']})")
+            st.write(f"- 🚩 **Highest Loss Product:** `{int(row['Product'])}` is losing **${int(row['Revenue cost'] - row['Gross Revenue']):,}** (margin: {row['Margin']:.1%})")
         st.write(f"- 💰 **Total Loss from Negative Margin Products:** <span style='color:red;font-size:1.3em;font-weight:bold;'>-${abs(int(total_loss)):,}</span>", unsafe_allow_html=True)
         st.write(f"- ✅ **Action:** Select & block products below with negative margin to reduce loss.")
 
@@ -45,65 +127,43 @@ def show_pubimps():
             search = st.text_input("Product Search (ID)")
 
     # --- Filtered Data ---
-    filtered = df.copy()
-    if campaign != "All":
-        filtered = filtered[filtered["Campaign ID"].astype(str) == campaign]
-    filtered = filtered[filtered["Margin"] <= margin_cut]
-    if search.strip():
-        filtered = filtered[filtered["Product"].astype(str).str.contains(search.strip())]
+    with stage("filter", len(df)):
+        filtered = df
+        if campaign != "All":
+            filtered = filtered[filtered["Campaign ID"].astype(str) == campaign]
+        filtered = filtered[filtered["Margin"] <= margin_cut]
+        if search.strip():
+            filtered = filtered[filtered["Product"].astype(str).str.contains(search.strip())]
 
     # --- Table of All Products (sortable) ---
     st.subheader("All Products - Sort & Filter")
-    st.dataframe(
-        filtered[
-            ["Product", "Campaign ID", "Publisher Impressions", "Advertiser Impressions", "Gross Revenue", "Revenue cost", "Margin_pct", "Impression Gap"]
-        ].rename(columns={"Margin_pct": "Margin (%)"}),
-        use_container_width=True,
-        hide_index=True,
-    )
+    with stage("render table", len(filtered)):
+        st.dataframe(
+            session_view("pubimps_all", (dataset.version, campaign, margin_cut, search.strip()), lambda: format_margin(filtered)),
+            use_container_width=True,
+            hide_index=True,
+        )
 
     st.divider()
 
+    # --- Supply Funnel: where each product loses impressions ---
+    with stage("supply funnel view", len(dataset)):
+        funnel = get_view("pubimps_funnel", dataset, SupplyFunnel.default(dataset))
+    if funnel is not None:
+        show_funnel(funnel)
+        st.divider()
+
     # --- Negative Margin Products Table with Select-to-Block ---
     st.subheader("Products with Negative Margin")
     st.caption("Below are products where the margin is negative. Select rows to block.")
 
-    df_neg = df[df["Margin"] < 0].copy()
     if df_neg.empty:
         st.success("No negative margin products found. Good job! 👍")
         return
 
-    # --- AG Grid with checkbox selection ---
-    gb = GridOptionsBuilder.from_dataframe(
-        df_neg[
-            ["Product", "Campaign ID", "Publisher Impressions", "Advertiser Impressions", "Gross Revenue", "Revenue cost", "Margin_pct", "Impression Gap"]
-        ].rename(columns={"Margin_pct": "Margin (%)"})
-    )
-    gb.configure_selection('multiple', use_checkbox=True)
-    grid_options = gb.build()
-
-    grid_response = AgGrid(
-        df_neg[
-            ["Product", "Campaign ID", "Publisher Impressions", "Advertiser Impressions", "Gross Revenue", "Revenue cost", "Margin_pct", "Impression Gap"]
-        ].rename(columns={"Margin_pct": "Margin (%)"}),
-        gridOptions=grid_options,
-        update_mode=GridUpdateMode.SELECTION_CHANGED,
-        fit_columns_on_grid_load=True,
-        height=350,
-        theme="streamlit",
-    )
-
-    # --- Defensive selection ---
-    selected = grid_response.get('selected_rows')
-    if selected is None:
-        selected = []
-
-    selected_ids = [str(x['Product']) for x in selected if isinstance(x, dict) and 'Product' in x and x['Product'] not in [None, ""]]
-
-    if st.button("Block Selected (demo)", use_container_width=True):
-        if selected_ids:
-            st.success(f"✅ These products would now be flagged for blocking (demo mode). Product IDs: {', '.join(selected_ids)}")
-        else:
-            st.info("Please select at least one product above to block.")
+    # --- AG Grid with checkbox selection (selections rerun only the fragment) ---
+    blocklist = get_blocklist()
+    negative_margin_panel(df_neg, blocklist, dataset.version)
+    block_list_panel(blocklist, key="pubimps_blocklist")
 
     st.caption("Tip: Use filters above to find the biggest negative margin leaks!")
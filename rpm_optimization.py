@@ -1,43 +1,33 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
-
-def show_rpm_optimization():
-    st.title("⚡ RPM Optimization")
-
-    df = st.session_state.get("main_df")
-    if df is None or df.empty:
-        st.warning("No data found. Please upload data in the AI Insights tab first.")
-        return
-
-    # --- Filters
-    rpm_threshold = st.number_input("Show products with RPM below:", min_value=0.0, value=0.05, step=0.01)
-    req_threshold = st.number_input("Show products with Requests NE higher than:", min_value=0, value=10_000_000, step=1_000_000)
-
-    # --- Column mapping (robust)
-    col_map = {col.lower(): col for col in df.columns}
-    filtered = df.copy()
-    filtered['Campaign ID'] = filtered[col_map['campaign id']]
-    filtered['RPM'] = filtered[col_map['rpm']]
-    filtered['Request NE'] = filtered[col_map['request ne']]
-    filtered['Gross Revenue'] = filtered[col_map['gross revenue']]
-    filtered['Revenue Cost'] = filtered[col_map['revenue cost']]
-
-    # --- Apply filters
-    filtered = filtered[(filtered['RPM'] < rpm_threshold) & (filtered['Request NE'] > req_threshold)].copy()
-    if filtered.empty:
-        st.info("No products match your filters.")
-        return
-
-    # --- Calculate serving costs & profitability
-    filtered['Serving Costs'] = np.round(filtered['Request NE'] / 1_000_000_000 * 200).astype(int)
-    filtered['Net Revenue After Serving Costs'] = filtered['Gross Revenue'] - filtered['Revenue Cost'] - filtered['Serving Costs']
-    filtered['Profit/Loss Status'] = filtered['Net Revenue After Serving Costs'].apply(
-        lambda x: "👍 Profitable" if x > 0 else "🚩 Losing money"
-    )
-
-    # --- Format columns for display
+from analytics import RpmProfitability
+from analytics.rpm import LOSING
+from data_store import current_dataset, get_blocklist
+from export import export_buttons
+from perf import stage
+from precompute import get_view, session_view
+from tables import block_list_panel, selected_frame
+
+DEFAULT_RPM_THRESHOLD = RpmProfitability.rpm_threshold
+DEFAULT_REQ_THRESHOLD = RpmProfitability.req_threshold
+DISPLAY_COLS = [
+    'Profit/Loss Status',
+    'Blocked',
+    'Campaign ID',
+    'Product',
+    'RPM',
+    'Request NE',
+    'Gross Revenue',
+    'Revenue Cost',
+    'Serving Costs',
+    'Net Revenue After Serving Costs',
+]
+EXPORT_COLS = [col for col in DISPLAY_COLS if col != 'Blocked']
+
+def format_rpm_table(table, blocklist):
+    """Display copy of the profitability table: money/requests as text plus the Blocked marker."""
+    filtered = table.copy()
     filtered['Gross Revenue'] = filtered['Gross Revenue'].apply(lambda x: f"${int(round(x))}")
     filtered['Revenue Cost'] = filtered['Revenue Cost'].apply(lambda x: f"${int(round(x))}")
     filtered['Serving Costs'] = filtered['Serving Costs'].apply(lambda x: f"${int(round(x))}")
@@ -45,22 +35,26 @@ def show_rpm_optimization():
         lambda x: f"${int(round(x))}" if x >= 0 else f"-${abs(int(round(x)))}"
     )
     filtered['Request NE'] = filtered['Request NE'].apply(lambda x: f"{int(x):,}")
-
-    display_cols = [
-        'Profit/Loss Status',
-        'Campaign ID',
-        'RPM',
-        'Request NE',
-        'Gross Revenue',
-        'Revenue Cost',
-        'Serving Costs',
-        'Net Revenue After Serving Costs',
-    ]
+    filtered['Blocked'] = np.where(blocklist.is_blocked(filtered), "⛔", "")
+    return filtered[DISPLAY_COLS]
+
+@st.fragment
+def rpm_grid_panel(result, blocklist, engine, dataset):
+    losing_count = len(result.losing)
+
+    # Formatted here, not by the caller, so a block from this fragment shows up on its rerun
+    with stage("format columns", len(result.table)):
+        filtered = session_view(
+            "rpm_display",
+            (dataset.version, engine, blocklist.version()),
+            lambda: format_rpm_table(result.table, blocklist),
+        )
+    from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
 
     # --- AgGrid for selection
-    gb = GridOptionsBuilder.from_dataframe(filtered[display_cols])
+    gb = GridOptionsBuilder.from_dataframe(filtered)
     gb.configure_selection('multiple', use_checkbox=True)
-    for col in display_cols:
+    for col in DISPLAY_COLS:
         gb.configure_column(
             col,
             cellStyle={'textAlign': 'center'},
@@ -71,37 +65,46 @@ def show_rpm_optimization():
         ".centered-header": {"justify-content": "center !important", "display": "flex !important"}
     }
 
-    grid_return = AgGrid(
-        filtered[display_cols],
-        gridOptions=grid_options,
-        update_mode=GridUpdateMode.SELECTION_CHANGED,
-        fit_columns_on_grid_load=True,
-        height=400,
-        enable_enterprise_modules=False,
-        custom_css=custom_css
-    )
-    selected_rows = grid_return['selected_rows']
+    with stage("aggrid serialize & render", len(filtered)):
+        grid_return = AgGrid(
+            filtered,
+            gridOptions=grid_options,
+            update_mode=GridUpdateMode.SELECTION_CHANGED,
+            fit_columns_on_grid_load=True,
+            height=400,
+            enable_enterprise_modules=False,
+            custom_css=custom_css
+        )
+    selected = selected_frame(grid_return)
 
     # --- Download & Bulk Block Buttons
     col1, col2 = st.columns(2)
     with col1:
-        st.download_button(
-            label="Download to Excel",
-            data=filtered[display_cols].to_csv(index=False),
-            file_name="rpm_optimization.csv",
-            mime="text/csv",
+        # Numeric rows, written only when the download is clicked
+        export_buttons(
+            {
+                "Rows matching filters": lambda: result.table[EXPORT_COLS],
+                "Losing money only": lambda: result.losing[EXPORT_COLS],
+                "Full result (no filters)": lambda: engine.unfiltered(dataset).table[EXPORT_COLS],
+            },
+            "rpm_optimization",
+            key="rpm_export",
         )
     with col2:
         if st.button("Block All Checked in Bulk"):
-            if selected_rows and len(selected_rows) > 0:
-                st.success(f"Blocking {len(selected_rows)} checked products.")
+            if not selected.empty:
+                added = blocklist.add(selected['Product'], selected['Campaign ID'], "Losing money after serving costs", "RPM Optimization")
+                st.session_state["rpm_block_notice"] = f"Blocked {added} checked products; {len(selected) - added} were already on the block list."
+                st.rerun(scope="fragment")  # redraw the grid with the new Blocked markers
             else:
                 st.warning("No products selected to block.")
+        notice = st.session_state.pop("rpm_block_notice", None)
+        if notice:
+            st.success(notice)
 
     st.markdown("---")
 
     # --- AI Cost Efficiency Insights
-    losing_count = (filtered['Profit/Loss Status'] == "🚩 Losing money").sum()
     st.subheader("🤖 AI Cost Efficiency Insights")
     st.write(f"• **{losing_count} products** are currently losing money due to high serving costs. Consider blocking them for better cost efficiency.")
     st.write("• **Serving Costs:** $200 per 1B Requests.")
@@ -124,22 +127,13 @@ def show_rpm_optimization():
         unsafe_allow_html=True
     )
 
-    # --- What-If Simulator Logic (bulletproof for all data types)
-    total_loss = 0
-    if selected_rows is not None and len(selected_rows) > 0:
-        for row in selected_rows:
-            net = None
-            for key in row:
-                if "Net Revenue After Serving Costs" in key:
-                    net = row[key]
-                    break
-            if net is None:
-                continue
-            net_str = str(net).replace('$', '').replace(',', '').strip()
-            is_negative = net_str.startswith('-')
-            net_int = int(net_str.replace('-', '')) if net_str.replace('-', '').isdigit() else 0
-            if is_negative and net_int > 0:
-                total_loss += net_int
+    # --- What-If Simulator Logic (net values come back formatted, e.g. "-$12")
+    if not selected.empty:
+        nets = pd.to_numeric(
+            selected['Net Revenue After Serving Costs'].astype(str).str.replace(r'[$,\s]', '', regex=True),
+            errors='coerce'
+        )
+        total_loss = int(-nets[nets < 0].sum())
         if total_loss > 0:
             st.markdown(
                 f"<span style='font-size:1.08rem;color:#991b1b;'>"
@@ -161,12 +155,35 @@ def show_rpm_optimization():
             unsafe_allow_html=True
         )
 
+def show_rpm_optimization():
+    st.title("⚡ RPM Optimization")
+
+    dataset = current_dataset()
+    if dataset is None or dataset.df.empty:
+        st.warning("No data found. Please upload data in the AI Insights tab first.")
+        return
+
+    # --- Filters
+    rpm_threshold = st.number_input("Show products with RPM below:", min_value=0.0, value=DEFAULT_RPM_THRESHOLD, step=0.01)
+    req_threshold = st.number_input("Show products with Requests NE higher than:", min_value=0, value=DEFAULT_REQ_THRESHOLD, step=1_000_000)
+
+    # --- Filter & profitability (default view precomputed in background)
+    with stage("rpm profitability view", len(dataset)):
+        engine = RpmProfitability(rpm_threshold, req_threshold)
+        result = get_view("rpm_optimization", dataset, engine)
+    if result.table.empty:
+        st.info("No products match your filters.")
+        return
+
+    # --- Display table, formatted once per filter / block-list change (not on every grid click).
+    # Grid selections and blocks rerun only this fragment
+    blocklist = get_blocklist()
+    rpm_grid_panel(result, blocklist, engine, dataset)
+    block_list_panel(blocklist, key="rpm_blocklist")
+
     # --- Show Total Loss (final footer)
-    total_negative_margin = 0
-    for val in filtered['Net Revenue After Serving Costs']:
-        val_str = str(val).replace('$','').replace(',','').replace('-','')
-        if '-' in str(val):
-            total_negative_margin += int(val_str) if val_str.isdigit() else 0
+    net = result.table['Net Revenue After Serving Costs']
+    total_negative_margin = int(np.round(-net[net < 0]).sum())
 
     st.markdown(
         f"<div style='margin-top:2em;font-size:1.25rem; font-weight:800; color:#d40000;'>"
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+# === Vectorized table styling ===
+# CSS is computed from the retained numeric columns in one array op per column and
+# applied with Styler.apply(axis=None), instead of parsing formatted strings per cell.
+
+
+def sign_css(values, positive="green", negative="red", missing="black", weight=700):
+    """One CSS string per value: `negative` below zero, `positive` otherwise, `missing` for NaN."""
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy()
+    colors = np.where(np.isnan(values), missing, np.where(values < 0, negative, positive))
+    return np.char.add(np.char.add("color: ", colors.astype(str)), f"; font-weight: {weight};")
+
+
+def style_columns(df, css, hide=()):
+    """Styler for `df` minus `hide`, with {column: css array} applied in a single Styler.apply(axis=None)."""
+    shown = df.drop(columns=list(hide))
+
+    def frame_css(frame):
+        out = pd.DataFrame("", index=frame.index, columns=frame.columns)
+        for col, values in css.items():
+            out[col] = values
+        return out
+
+    return shown.style.apply(frame_css, axis=None)
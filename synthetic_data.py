@@ -0,0 +1,156 @@
+"""Synthetic data matching the DemoAI.xlsx schema, for benchmarks at production scale.
+
+Usage: python synthetic_data.py --rows 1000000 --out synthetic.parquet
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from analytics.scoring import ScoringEngine
+
+# (Campaign, Campaign ID, Ad format) as they appear in DemoAI.xlsx
+CAMPAIGNS = [
+    ("Magnite_Android_RTB_Native", 5958489191, "RICH_TEXT"),
+    ("Magnite_Android_RTB_Interstitial", 3148542564, "INTERSTITIAL"),
+    ("DSP_Android_RTB_Video", 456651846, "VIDEO"),
+    ("Magnite_iOS_RTB_Interstitial", 65214554696, "INTERSTITIAL"),
+    ("Magnite_Android_RTB_Banner", 3188765416, "BANNER"),
+    ("Magnite_iOS_RTB_Video", 65568446685, "VIDEO"),
+    ("Magnite_iOS_RTB_Banner", 254597418, "BANNER"),
+]
+CAMPAIGN_WEIGHTS = [0.50, 0.20, 0.18, 0.06, 0.03, 0.02, 0.01]
+CHANNELS = [
+    "zmt", "lif", "pbn", "inr", "wbe", "alx", "tam", "ivs", "mob", "apx",
+    "dgn", "vng", "unt", "fyb", "chb", "adc", "ogy", "smt",
+]
+ADVERTISERS = ["Magnite", "Pubmatic", "OpenX", "TripleLift"]
+BUYERS = ["DV360", "Amazon DSP", "The Trade Desk", "Criteo", "LinkedIn"]
+# eCPM multiplier per ad format (video and interstitial clear higher)
+FORMAT_ECPM = {"RICH_TEXT": 1.0, "INTERSTITIAL": 1.6, "VIDEO": 2.4, "BANNER": 0.25}
+
+COLUMNS = [
+    "Date", "Advertiser", "Ad format", "Channel", "Product", "Package", "Campaign ID", "Campaign",
+    "Request NE", "FillRate", "Display Rate", "eCPM", "Gross Revenue", "Publisher Impressions",
+    "Survival rate", "Advertiser Impressions", "RPM", "AVG Bid Price", "AVG BidFloor", "Requests AE",
+    "Revenue cost", "IVT (%)", "Margin (%)", "Status", "Score", "Alert",
+]
+
+
+def _zipf_weights(n, a=1.1):
+    w = 1.0 / np.arange(1, n + 1) ** a
+    return w / w.sum()
+
+
+def generate(rows, days=30, advertisers=1, seed=0, start="2025-05-25"):
+    """Return a DemoAI-shaped DataFrame with `rows` rows spread over `days` days."""
+    rng = np.random.default_rng(seed)
+    n_packages = int(np.clip(rows // 10, 20, 200_000))
+    n_products = int(n_packages * 2.4)
+
+    # --- Dimensions (categoricals keep 10M+ row frames affordable) ---
+    package_names = np.array([f"com.synthetic.app{i:06d}" for i in range(n_packages)], dtype=object)
+    package_idx = rng.choice(n_packages, size=rows, p=_zipf_weights(n_packages))
+    # Each package owns a few products; products are stable per package
+    product_ids = rng.choice(np.arange(1_000_000, 9_999_999), size=n_products, replace=False)
+    product_idx = (package_idx * 2 + rng.integers(0, 3, size=rows)) % n_products
+    campaign_idx = rng.choice(len(CAMPAIGNS), size=rows, p=CAMPAIGN_WEIGHTS)
+    campaigns = np.array(CAMPAIGNS, dtype=object)
+    formats = campaigns[campaign_idx, 2]
+    dates = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, size=rows), unit="D")
+
+    # --- Funnel: requests -> fill -> display -> impressions -> revenue ---
+    request_ne = np.maximum(rng.lognormal(np.log(4_000_000), 1.6, size=rows), 10_000).astype(np.int64)
+    fill = np.clip(rng.lognormal(np.log(0.043), 1.2, size=rows), 3e-5, 0.72)
+    requests_ae = np.maximum((request_ne * fill * rng.uniform(0.85, 1.0, size=rows)).astype(np.int64), 1)
+    display = np.clip(rng.lognormal(np.log(0.06), 1.0, size=rows), 0.002, 0.96)
+    pub_imps = np.maximum((requests_ae * display).astype(np.int64), 50)
+    adv_imps = (pub_imps * rng.normal(1.04, 0.05, size=rows)).astype(np.int64)
+    ecpm = rng.lognormal(np.log(6.2), 0.8, size=rows) * pd.Series(formats).map(FORMAT_ECPM).to_numpy()
+    gross = pub_imps * ecpm / 1000
+
+    # --- Quality & economics ---
+    high_ivt = rng.random(rows) < 0.18
+    ivt = np.where(high_ivt, rng.uniform(8, 35, size=rows), rng.exponential(1.8, size=rows)).round(1)
+    margin = np.clip(rng.normal(34.6, 11.6, size=rows), -25, 90).round(2)
+    bid_price = ecpm * rng.uniform(0.45, 0.85, size=rows)
+    bid_floor = bid_price * np.clip(rng.lognormal(np.log(0.05), 1.0, size=rows), 0.001, 0.95)
+
+    df = pd.DataFrame({
+        "Date": dates,
+        "Advertiser": pd.Categorical.from_codes(rng.integers(0, advertisers, size=rows), ADVERTISERS[:advertisers]),
+        "Ad format": pd.Categorical(formats),
+        "Channel": pd.Categorical.from_codes(rng.choice(len(CHANNELS), size=rows, p=_zipf_weights(len(CHANNELS), 0.8)), CHANNELS),
+        "Product": product_ids[product_idx],
+        "Package": pd.Categorical.from_codes(package_idx, package_names),
+        "Campaign ID": campaigns[campaign_idx, 1].astype(np.int64),
+        "Campaign": pd.Categorical(campaigns[campaign_idx, 0]),
+        "Request NE": request_ne,
+        "FillRate": fill,
+        "Display Rate": display,
+        "eCPM": ecpm,
+        "Gross Revenue": gross,
+        "Publisher Impressions": pub_imps,
+        "Survival rate": pub_imps / request_ne,
+        "Advertiser Impressions": adv_imps,
+        "RPM": gross / request_ne * 1000,
+        "AVG Bid Price": bid_price,
+        "AVG BidFloor": bid_floor,
+        "Requests AE": requests_ae,
+        "Revenue cost": gross * (1 - margin / 100),
+        "IVT (%)": ivt,
+        "Margin (%)": margin,
+    })
+
+    df = df.join(ScoringEngine().score(df))
+    return df.sort_values("Date", kind="stable").reset_index(drop=True)[COLUMNS]
+
+
+def generate_buyers(df, buyers_per_row=3, seed=0):
+    """Split each row's revenue across DSP buyers (Date, Package, Buyer, Gross Revenue).
+
+    Every package has a preferred buyer that takes the largest share on most days.
+    """
+    rng = np.random.default_rng(seed)
+    codes, _ = pd.factorize(df["Package"])
+    primary = (codes * 7 + 3) % len(BUYERS)
+    shares = rng.dirichlet(np.arange(buyers_per_row, 0, -1) * 2.0, size=len(df))
+    parts = []
+    for i in range(buyers_per_row):
+        parts.append(pd.DataFrame({
+            "Date": df["Date"].to_numpy(),
+            "Package": df["Package"].to_numpy(),
+            "Buyer": np.asarray(BUYERS)[(primary + i) % len(BUYERS)],
+            "Gross Revenue": (df["Gross Revenue"].to_numpy() * shares[:, i]).round(4),
+        }))
+    out = pd.concat(parts, ignore_index=True)
+    return out.groupby(["Date", "Package", "Buyer"], as_index=False, observed=True, sort=True)["Gross Revenue"].sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic DemoAI-shaped dataset.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--advertisers", type=int, default=1, choices=range(1, len(ADVERTISERS) + 1))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="synthetic.parquet", help=".parquet, .csv or .xlsx")
+    parser.add_argument("--buyers-out", help="also write a buyer breakdown (.csv or .parquet)")
+    args = parser.parse_args()
+
+    df = generate(args.rows, args.days, args.advertisers, args.seed)
+    if args.out.endswith(".csv"):
+        df.to_csv(args.out, index=False)
+    elif args.out.endswith(".xlsx"):
+        df.to_excel(args.out, index=False)
+    else:
+        df.to_parquet(args.out, index=False)
+    print(f"Wrote {len(df):,} rows to {args.out}")
+    if args.buyers_out:
+        buyers = generate_buyers(df, seed=args.seed)
+        if args.buyers_out.endswith(".csv"):
+            buyers.to_csv(args.buyers_out, index=False)
+        else:
+            buyers.to_parquet(args.buyers_out, index=False)
+        print(f"Wrote {len(buyers):,} buyer rows to {args.buyers_out}")
+
+
+if __name__ == "__main__":
+    main()
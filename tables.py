@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# === Virtualized tables ===
+# st.dataframe ships the frame once as Arrow and only draws the visible rows in
+# the browser; formats live in column_config, so cells stay numeric and sortable.
+
+FORMATS = {
+    "money": lambda label: st.column_config.NumberColumn(label, format="dollar"),
+    "signed_money": lambda label: st.column_config.NumberColumn(label, format="accounting"),
+    "pct": lambda label: st.column_config.NumberColumn(label, format="%.1f%%"),
+    "share": lambda label: st.column_config.NumberColumn(label, format="percent"),
+    "signed_pct": lambda label: st.column_config.NumberColumn(label, format="%+.0f%%"),
+    "int": lambda label: st.column_config.NumberColumn(label, format="localized"),
+    "float": lambda label: st.column_config.NumberColumn(label, format="%.2f"),
+    "text": lambda label: st.column_config.TextColumn(label),
+    "flag": lambda label: st.column_config.TextColumn(label, width="small"),
+}
+
+
+def direction(values):
+    """🟢▲ / 🔴▼ per value, replacing the per-row colored HTML arrows."""
+    return pd.Series(np.select([values > 0, values < 0], ["🟢 ▲", "🔴 ▼"], ""), index=values.index)
+
+
+def threshold_flag(values, limit, good_above=True):
+    """🟢 when the value is on the good side of `limit`, 🟠 otherwise (blank for NaN)."""
+    good = values >= limit if good_above else values <= limit
+    return pd.Series(np.where(values.isna(), "", np.where(good, "🟢", "🟠")), index=values.index)
+
+
+def render_table(df, formats, labels=None, height="auto", key=None):
+    """Render `df` with per-column formats ({column: kind from FORMATS}) and optional header labels."""
+    labels = labels or {}
+    column_config = {col: FORMATS[kind](labels.get(col, col)) for col, kind in formats.items() if col in df.columns}
+    return st.dataframe(
+        df,
+        column_config=column_config,
+        hide_index=True,
+        use_container_width=True,
+        height=height,
+        key=key,
+    )
+
+
+def selected_frame(grid_return):
+    """AgGrid selection as a DataFrame (newer st_aggrid returns a frame or None, older a list of dicts)."""
+    selected = grid_return["selected_rows"]
+    if selected is None:
+        return pd.DataFrame()
+    if isinstance(selected, pd.DataFrame):
+        return selected
+    return pd.DataFrame([row for row in selected if isinstance(row, dict)])
+
+
+def block_list_panel(blocklist, key):
+    """Expander listing every blocked product/campaign pair, with an Unblock action."""
+    with st.expander(f"⛔ Block list ({len(blocklist):,} entries)"):
+        entries = blocklist.entries()
+        if entries.empty:
+            st.caption("Nothing is blocked yet.")
+            return
+        edited = st.data_editor(
+            entries.assign(Unblock=False),
+            column_config={"Unblock": st.column_config.CheckboxColumn("Unblock", help="Remove from the block list")},
+            disabled=list(entries.columns),
+            hide_index=True,
+            use_container_width=True,
+            key=f"{key}_editor",
+        )
+        checked = edited[edited["Unblock"]]
+        if st.button("Unblock checked", disabled=checked.empty, key=f"{key}_unblock"):
+            blocklist.remove(checked["Product"], checked["Campaign ID"])
+            st.rerun()  # every Blocked marker on the page changes
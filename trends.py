@@ -0,0 +1,111 @@
+import streamlit as st
+import pandas as pd
+from analytics import DailySeriesBuilder, RevenueForecaster
+from data_store import current_dataset
+from perf import stage
+from precompute import get_view
+from tables import render_table
+
+MAX_OPTIONS = 500
+DEFAULT_POINTS = 300
+
+
+def show_trends():
+    st.title("📉 Trend Explorer")
+    st.caption("Per-package daily trends. Long ranges are downsampled (LTTB) so each chart stays light.")
+
+    dataset = current_dataset()
+    if dataset is None or dataset.df.empty:
+        st.info("No data found. Please make sure the Excel file is loaded in the app.")
+        return
+
+    # --- Precomputed packages × days arrays (warmed in the background) ---
+    with stage("daily series view", len(dataset)):
+        series = get_view("trends", dataset, DailySeriesBuilder.default(dataset))
+    if not len(series.packages) or not len(series.dates):
+        st.warning("No dated package rows to plot.")
+        return
+
+    # --- Package picker (biggest earners first; search narrows the list) ---
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        search = st.text_input("Search package")
+    packages = series.packages
+    if search.strip():
+        packages = packages[pd.Series(packages).astype(str).str.contains(search.strip(), case=False, regex=False).to_numpy()]
+    if not len(packages):
+        st.info("No package matches your search.")
+        return
+    with col2:
+        package = st.selectbox(f"Package ({len(packages):,} matching, by revenue)", packages[:MAX_OPTIONS])
+
+    metrics = st.multiselect("Metrics", list(series.values), default=list(series.values))
+    first, last = series.dates[0].date(), series.dates[-1].date()
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        if first < last:
+            start, end = st.slider("Date range", min_value=first, max_value=last, value=(first, last))
+        else:
+            start, end = first, last
+    with col2:
+        max_points = st.number_input("Max points per chart", min_value=20, max_value=2000, value=DEFAULT_POINTS, step=50)
+    if not metrics:
+        return
+
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+
+    with stage("forecast view", len(dataset)):
+        forecast = get_view("trends_forecast", dataset, RevenueForecaster.default(dataset))
+    show_forecast = forecast is not None and package in forecast.row and "Gross Revenue" in metrics
+
+    with stage("downsample", len(series.dates) * len(metrics)):
+        traces = {metric: series.series(package, metric, start, end, max_points) for metric in metrics}
+
+    with stage("build chart", sum(len(y) for _, y in traces.values())):
+        fig = make_subplots(rows=len(metrics), cols=1, shared_xaxes=True, vertical_spacing=0.04, subplot_titles=metrics)
+        for i, (metric, (x, y)) in enumerate(traces.items(), start=1):
+            fig.add_trace(go.Scattergl(x=x, y=y, mode="lines+markers", name=metric, marker={"size": 4}), row=i, col=1)
+            if show_forecast and metric == "Gross Revenue":
+                future = forecast.frame(package)
+                band_x = list(future.index) + list(future.index[::-1])
+                band_y = list(future["Upper"]) + list(future["Lower"][::-1])
+                fig.add_trace(go.Scatter(x=band_x, y=band_y, fill="toself", line={"width": 0}, opacity=0.25,
+                                         name="Forecast interval", hoverinfo="skip"), row=i, col=1)
+                fig.add_trace(go.Scatter(x=future.index, y=future["Forecast"], mode="lines", line={"dash": "dash"},
+                                         name="Forecast"), row=i, col=1)
+        fig.update_layout(height=220 * len(metrics) + 60, showlegend=False, margin={"t": 40, "b": 20, "l": 20, "r": 20})
+
+    with stage("render chart"):
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"{len(series.packages):,} packages × {len(series.dates)} days precomputed "
+        f"({series.nbytes / 1e6:.1f} MB); showing ≤ {max_points} points per metric."
+    )
+    if show_forecast:
+        st.caption(f"Revenue forecast: {forecast.model}, next {len(forecast.future_dates)} days with a ~90% interval.")
+
+    # --- Packages that came in below their forecast on the last day ---
+    if forecast is not None:
+        show_below_forecast(forecast)
+
+
+def show_below_forecast(forecast):
+    st.divider()
+    below = forecast.table["Below Forecast"]
+    st.subheader("📉 Below Forecast")
+    st.caption(
+        f"{int(below.sum()):,} of {len(forecast.table):,} packages earned less on {forecast.dates[-1].date()} than the "
+        "lower bound forecast from the days before it."
+    )
+    with stage("below forecast", len(forecast.table)):
+        table = forecast.below(50)
+    if table.empty:
+        st.success("Every package landed within its forecast range.")
+        return
+    horizon_col = f"Next {len(forecast.future_dates)}d"
+    render_table(
+        table[["Package", "Actual", "Expected", "Lower", "Shortfall", horizon_col]],
+        {"Actual": "money", "Expected": "money", "Lower": "money", "Shortfall": "money", horizon_col: "money"},
+        labels={horizon_col: f"{horizon_col} forecast"},
+    )